@@ -0,0 +1,83 @@
+"""
+字幕图层合成
+把 RGBA 文字图层（及其投影）只在其不透明区域的包围盒内合成到帧张量上：
+图层先按 alpha 包围盒与画面可见范围裁剪，转换为预乘 alpha 的浮点块，
+再对帧张量中对应区域原地执行 over 合成。每帧的开销与文字区域大小成正比，而不是整帧。
+uint8 帧只把被覆盖的区域转换为浮点混合后写回，输出保持输入精度。
+"""
+
+from typing import Optional
+
+import numpy as np
+import torch
+from PIL import Image
+
+from .video_editing.frame_utils import from_unit_float, to_unit_float
+
+
+def premultiply(patch: Image.Image, opacity: float = 1.0) -> torch.Tensor:
+    """
+    RGBA 图像 -> 预乘 alpha 的 (h, w, 4) float32 张量（0-1）
+
+    Args:
+        patch: RGBA 图像
+        opacity: 额外的整体不透明度
+    """
+    rgba = torch.from_numpy(np.asarray(patch, dtype=np.float32) / 255.0)
+    alpha = rgba[..., 3:4]
+    if opacity < 1.0:
+        alpha = alpha * max(0.0, opacity)
+    return torch.cat([rgba[..., :3] * alpha, alpha], dim=-1)
+
+
+def blend_premultiplied(region: torch.Tensor, patch: torch.Tensor):
+    """对 region (h, w, 3) 原地执行 over 合成：dst = src_rgb + dst * (1 - src_a)"""
+    patch = patch.to(device=region.device, dtype=region.dtype)
+    region.mul_(1.0 - patch[..., 3:]).add_(patch[..., :3])
+
+
+def composite_rgba(
+    frame: torch.Tensor,
+    layer: Optional[Image.Image],
+    x: int,
+    y: int,
+    opacity: float = 1.0
+) -> bool:
+    """
+    把 RGBA 图层以左上角 (x, y) 合成到帧上（原地修改 frame）
+
+    Args:
+        frame: (H, W, 3) 的帧张量（0-1 浮点或 uint8，可以是输出张量中某一帧的视图）
+        layer: RGBA 图层，可以超出画面范围
+        x / y: 图层左上角在画面中的位置
+        opacity: 额外的整体不透明度
+
+    Returns:
+        是否有像素被合成
+    """
+    if layer is None or opacity <= 0:
+        return False
+    if layer.mode != "RGBA":
+        layer = layer.convert("RGBA")
+    bbox = layer.getchannel("A").getbbox()
+    if bbox is None:
+        return False
+
+    # alpha 包围盒与画面可见范围的交集（图层坐标）
+    height, width = frame.shape[0], frame.shape[1]
+    left = max(bbox[0], -x)
+    top = max(bbox[1], -y)
+    right = min(bbox[2], width - x)
+    bottom = min(bbox[3], height - y)
+    if right <= left or bottom <= top:
+        return False
+
+    patch = premultiply(layer.crop((left, top, right, bottom)), opacity)
+    region = frame[y + top:y + bottom, x + left:x + right]
+    if region.is_floating_point():
+        blend_premultiplied(region, patch)
+    else:
+        blended = to_unit_float(region)
+        blend_premultiplied(blended, patch)
+        region.copy_(from_unit_float(blended, region.dtype))
+    return True
@@ -41,6 +41,9 @@ from typing import Tuple, Dict, Any, Optional
 import folder_paths
 import torch.nn.functional as F
 
+from .subtitle_compositor import composite_rgba
+from .subtitle_text_raster import GLYPH_ATLAS, char_bbox, draw_glyphs, draw_text, text_canvas_size, text_margin
+
 class VideoSubtitleEnhancedNode:
     """视频字幕添加节点 - 增强版（v2.6.0-stable）
     
@@ -382,6 +385,7 @@ class VideoSubtitleEnhancedNode:
     def clear_cache(cls):
         """清空所有缓存，释放内存"""
         cls._font_cache.clear()
+        GLYPH_ATLAS.clear()
         gc.collect()
         print(f"[性能优化] 缓存已清空，内存已释放")
     
@@ -514,12 +518,8 @@ class VideoSubtitleEnhancedNode:
                            渐变效果: str, 开头颜色: str, 中间颜色: str, 末尾颜色: str, 
                            过渡强度: float, 排版方向: str = "横排", 字间距: int = 0,
                            字体粗细: str = "常规", align: str = "center",
-                           visible_chars: int = -1) -> Image.Image:
-        """创建渐变文字图像（全功能版 - 支持字体粗细、多行、Typing效果）"""
-        
-        # 计算文本尺寸
-        temp_img = Image.new('RGBA', (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
+                           visible_chars: int = -1, margin: int = 50) -> Image.Image:
+        """创建渐变文字图像（全功能版 - 支持字体粗细、多行、Typing效果；margin 为文字块四周边距）"""
         
         # 计算文本边界
         if 排版方向 == "竖排":
@@ -528,7 +528,7 @@ class VideoSubtitleEnhancedNode:
             max_width = 0
             total_height = 0
             for char in chars:
-                bbox = temp_draw.textbbox((0, 0), char, font=font)
+                bbox = char_bbox(font, char)
                 char_width = bbox[2] - bbox[0]
                 char_height = bbox[3] - bbox[1]
                 char_info.append((char, char_width, char_height))
@@ -542,7 +542,7 @@ class VideoSubtitleEnhancedNode:
             max_width = 0
             total_height = 0
             
-            bbox = temp_draw.textbbox((0, 0), "A", font=font)
+            bbox = char_bbox(font, "A")
             line_height_default = bbox[3] - bbox[1]
             line_gap = int(line_height_default * 0.2)
             
@@ -554,7 +554,7 @@ class VideoSubtitleEnhancedNode:
                     line_w = 0
                     line_h = 0
                     for char in chars:
-                        bbox = temp_draw.textbbox((0, 0), char, font=font)
+                        bbox = char_bbox(font, char)
                         cw = bbox[2] - bbox[0]
                         ch = bbox[3] - bbox[1]
                         line_w += cw
@@ -571,7 +571,7 @@ class VideoSubtitleEnhancedNode:
             text_height = total_height
         
         # 添加边距
-        padding = 50
+        padding = margin
         canvas_width = text_width + padding * 2
         canvas_height = text_height + padding * 2
         
@@ -613,20 +613,16 @@ class VideoSubtitleEnhancedNode:
     
     def create_vertical_text(self, text: str, font: ImageFont.FreeTypeFont, 
                            color: Tuple[int, int, int], 字间距: int = 0, 
-                           bold_level: str = "常规") -> Image.Image:
-        """创建竖排文字（支持字体粗细）"""
+                           bold_level: str = "常规", margin: Optional[int] = None) -> Image.Image:
+        """创建竖排文字（支持字体粗细；指定 margin 时文字块四周按该边距留白）"""
         chars = list(text.replace('\n', ''))
         
-        # 计算尺寸
-        temp_img = Image.new('RGBA', (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-        
         char_info = []
         max_width = 0
         total_height = 0
         
         for char in chars:
-            bbox = temp_draw.textbbox((0, 0), char, font=font)
+            bbox = char_bbox(font, char)
             char_width = bbox[2] - bbox[0]
             char_height = bbox[3] - bbox[1]
             char_info.append((char, char_width, char_height))
@@ -637,37 +633,22 @@ class VideoSubtitleEnhancedNode:
         
         # 根据粗细级别添加额外边距
         padding_map = {"常规": 20, "粗体": 25, "特粗": 30, "超粗": 35}
-        padding = padding_map.get(bold_level, 20)
+        padding = margin * 2 if margin is not None else padding_map.get(bold_level, 20)
         
         # 创建竖排文字图像
         vert_img = Image.new('RGBA', (max_width + padding, total_height + padding), (0, 0, 0, 0))
         vert_draw = ImageDraw.Draw(vert_img)
         
+        char_positions = []
         y_offset = padding // 2
         for char, char_width, char_height in char_info:
             x_offset = (max_width - char_width) // 2 + padding // 2
-            
-            # 使用字体粗细功能（竖排文字逐字绘制）
-            if bold_level == "常规":
-                vert_draw.text((x_offset, y_offset), char, font=font, fill=color + (255,))
-            elif bold_level == "粗体":
-                # 绘制2次，微调位置
-                offsets = [(0, 0), (1, 0), (0, 1), (1, 1)]
-                for dx, dy in offsets:
-                    vert_draw.text((x_offset + dx, y_offset + dy), char, font=font, fill=color + (255,))
-            elif bold_level == "特粗":
-                # 绘制4次，更大范围
-                offsets = [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2)]
-                for dx, dy in offsets:
-                    vert_draw.text((x_offset + dx, y_offset + dy), char, font=font, fill=color + (255,))
-            elif bold_level == "超粗":
-                # 绘制多次，环绕方式
-                offsets = [(dx, dy) for dx in range(-1, 3) for dy in range(-1, 3)]
-                for dx, dy in offsets:
-                    vert_draw.text((x_offset + dx, y_offset + dy), char, font=font, fill=color + (255,))
-            
+            char_positions.append((char, x_offset, y_offset))
             y_offset += char_height + max(0, 字间距)
         
+        # 竖排文字逐字绘制（粗细的多次偏移已合并在缓存字形中）
+        draw_glyphs(vert_draw, char_positions, font, color + (255,), bold_level, anchor='la')
+        
         return vert_img
     
     def apply_animation_enhanced(self, frame_idx: int, effect_type: str, 
@@ -942,24 +923,10 @@ class VideoSubtitleEnhancedNode:
     
     def create_bold_text(self, draw: ImageDraw.ImageDraw, position: Tuple[int, int], 
                         text: str, font: ImageFont.FreeTypeFont, 
-                        fill: Tuple[int, int, int, int], bold_level: str):
-        """创建加粗文字（优化版）"""
-        x, y = position
-        
-        if bold_level == "常规":
-            draw.text((x, y), text, font=font, fill=fill, anchor='mm')
-        elif bold_level == "粗体":
-            offsets = [(0, 0), (1, 0), (0, 1), (1, 1)]
-            for dx, dy in offsets:
-                draw.text((x + dx, y + dy), text, font=font, fill=fill, anchor='mm')
-        elif bold_level == "特粗":
-            offsets = [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2)]
-            for dx, dy in offsets:
-                draw.text((x + dx, y + dy), text, font=font, fill=fill, anchor='mm')
-        elif bold_level == "超粗":
-            offsets = [(dx, dy) for dx in range(-1, 3) for dy in range(-1, 3)]
-            for dx, dy in offsets:
-                draw.text((x + dx, y + dy), text, font=font, fill=fill, anchor='mm')
+                        fill: Tuple[int, int, int, int], bold_level: str,
+                        anchor: str = 'mm', align: str = 'left'):
+        """创建加粗文字（文字只绘制一次，加粗为对文字遮罩的小范围膨胀）"""
+        draw_text(draw, position, text, font, fill, bold_level, anchor=anchor, align=align)
     
     def create_stroke_text(self, text: str, font: ImageFont.FreeTypeFont, 
                           text_color: Tuple[int, int, int], 
@@ -996,32 +963,15 @@ class VideoSubtitleEnhancedNode:
         center_x = width // 2
         center_y = height // 2
         
-        # 动态采样密度
-        angle_step = 10 if stroke_size <= 5 else 15
-        
-        # 预计算偏移量
-        offsets = []
-        for angle in range(0, 360, int(angle_step)):
-            rad = math.radians(angle)
-            cos_val = math.cos(rad)
-            sin_val = math.sin(rad)
-            for distance in range(1, stroke_size + 1):
-                offset_x = int(cos_val * distance)
-                offset_y = int(sin_val * distance)
-                if (offset_x, offset_y) not in offsets:
-                    offsets.append((offset_x, offset_y))
-
         if 排版方向 == "竖排":
             # 竖排描边 - 逐字符绘制
             chars = list(text.replace('\n', ''))
-            temp_img = Image.new('RGBA', (1, 1))
-            temp_draw = ImageDraw.Draw(temp_img)
             
             # 计算竖排尺寸
             char_heights = []
             max_width = 0
             for char in chars:
-                bbox = temp_draw.textbbox((0, 0), char, font=font)
+                bbox = char_bbox(font, char)
                 char_width = bbox[2] - bbox[0]
                 char_height = bbox[3] - bbox[1]
                 char_heights.append(char_height)
@@ -1031,33 +981,18 @@ class VideoSubtitleEnhancedNode:
             start_y = (height - total_height) // 2
             y_offset = start_y
             
-            # 绘制竖排描边
-            for i, (char, char_height) in enumerate(zip(chars, char_heights)):
-                if visible_chars >= 0 and i >= visible_chars:
-                    break
-                for offset_x, offset_y in offsets:
-                    # 绘制描边（支持粗细）
-                    if 字体粗细 == "常规":
-                        stroke_draw.text((center_x + offset_x, y_offset + offset_y), 
-                                       char, font=font, fill=stroke_rgba, anchor='mm')
-                    else:
-                        self.create_bold_text(stroke_draw, (center_x + offset_x, y_offset + offset_y), 
-                                           char, font, stroke_rgba, 字体粗细, anchor='mm')
-                
+            # 与 _draw_text_with_bold 一致，以字符中心定位（紧凑画布下不会越过上边缘）
+            char_positions = []
+            for char, char_height in zip(chars, char_heights):
+                char_positions.append((char, center_x, y_offset + char_height // 2))
                 y_offset += char_height + max(0, 字间距)
         else:
             # 横排描边 (使用 _calculate_multiline_metrics 统一处理)
             char_positions, _, _ = self._calculate_multiline_metrics(stroke_draw, text, font, 字间距, pil_align, width, height)
-            
-            # 绘制描边
-            for offset_x, offset_y in offsets:
-                for i, (char, x, y) in enumerate(char_positions):
-                    if visible_chars >= 0 and i >= visible_chars:
-                        break
-                    if 字体粗细 == "常规":
-                        stroke_draw.text((x + offset_x, y + offset_y), char, font=font, fill=stroke_rgba, anchor='mm')
-                    else:
-                        self.create_bold_text(stroke_draw, (x + offset_x, y + offset_y), char, font, stroke_rgba, 字体粗细, anchor='mm')
+        
+        # 绘制描边：每个字符的描边遮罩（文字遮罩按描边大小膨胀）缓存为一个字形
+        draw_glyphs(stroke_draw, char_positions, font, stroke_rgba, 字体粗细,
+                    stroke_size, visible_chars=visible_chars)
         
         # 根据描边位置合成
         if stroke_position == "外部":
@@ -1089,7 +1024,7 @@ class VideoSubtitleEnhancedNode:
         max_block_width = 0
         total_text_height = 0
         
-        bbox = draw.textbbox((0, 0), "A", font=font)
+        bbox = char_bbox(font, "A")
         default_line_height = bbox[3] - bbox[1]
         line_gap = int(default_line_height * 0.2) # 行间距
         
@@ -1103,7 +1038,7 @@ class VideoSubtitleEnhancedNode:
                 char_widths = []
                 max_line_height = 0
                 for char in chars:
-                    bbox = draw.textbbox((0, 0), char, font=font)
+                    bbox = char_bbox(font, char)
                     char_widths.append(bbox[2] - bbox[0])
                     max_line_height = max(max_line_height, bbox[3] - bbox[1])
                 
@@ -1156,15 +1091,7 @@ class VideoSubtitleEnhancedNode:
     def _draw_multiline_text_with_spacing(self, draw, text, font, fill, width, height, spacing, align, bold_level, visible_chars=-1):
         """辅助函数：绘制多行带字间距文字"""
         char_positions, _, _ = self._calculate_multiline_metrics(draw, text, font, spacing, align, width, height)
-        
-        for i, (char, x, y) in enumerate(char_positions):
-            if visible_chars >= 0 and i >= visible_chars:
-                break
-                
-            if bold_level == "常规":
-                draw.text((x, y), char, font=font, fill=fill, anchor='mm')
-            else:
-                self.create_bold_text(draw, (x, y), char, font, fill, bold_level, anchor='mm')
+        draw_glyphs(draw, char_positions, font, fill, bold_level, visible_chars=visible_chars)
 
     def _draw_text_with_bold(self, layer, text: str, font: ImageFont.FreeTypeFont, 
                             fill, width: int, height: int, bold_level: str, 
@@ -1178,25 +1105,20 @@ class VideoSubtitleEnhancedNode:
         if direction == "竖排":
             # 竖排
             chars = list(text.replace('\n', ''))
-            temp_img = Image.new('RGBA', (1, 1))
-            temp_draw = ImageDraw.Draw(temp_img)
             
             char_heights = []
             for char in chars:
-                bbox = temp_draw.textbbox((0, 0), char, font=font)
+                bbox = char_bbox(font, char)
                 char_heights.append(bbox[3] - bbox[1])
             
             total_height = sum(char_heights) + (len(chars) - 1) * max(0, spacing)
             y_offset = (height - total_height) // 2
             
-            for i, (char, char_height) in enumerate(zip(chars, char_heights)):
-                if visible_chars >= 0 and i >= visible_chars:
-                    break
-                if bold_level == "常规":
-                    draw.text((center_x, y_offset + char_height//2), char, font=font, fill=fill, anchor='mm')
-                else:
-                    self.create_bold_text(draw, (center_x, y_offset + char_height//2), char, font, fill, bold_level, anchor='mm')
+            char_positions = []
+            for char, char_height in zip(chars, char_heights):
+                char_positions.append((char, center_x, y_offset + char_height//2))
                 y_offset += char_height + max(0, spacing)
+            draw_glyphs(draw, char_positions, font, fill, bold_level, visible_chars=visible_chars)
         else:
             # 横排
             if spacing != 0:
@@ -1217,20 +1139,10 @@ class VideoSubtitleEnhancedNode:
     
     def _draw_bold_char(self, draw, position: Tuple[int, int], char: str, 
                        font: ImageFont.FreeTypeFont, fill, bold_level: str):
-        """辅助函数：绘制单个粗体字符"""
-        x, y = position
-        
-        if bold_level == "粗体":
-            offsets = [(0, 0), (1, 0), (0, 1), (1, 1)]
-        elif bold_level == "特粗":
-            offsets = [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2)]
-        elif bold_level == "超粗":
-            offsets = [(dx, dy) for dx in range(-1, 3) for dy in range(-1, 3)]
-        else:
-            offsets = [(0, 0)]
-        
-        for dx, dy in offsets:
-            draw.text((x + dx, y + dy), char, font=font, fill=fill)
+        """辅助函数：绘制单个粗体字符（未知粗细按常规绘制）"""
+        if bold_level not in ("粗体", "特粗", "超粗"):
+            bold_level = "常规"
+        draw_text(draw, position, char, font, fill, bold_level)
     
     def calculate_optimal_font_size(self, text: str, font_name: str, initial_size: int,
                                     canvas_width: int, canvas_height: int, 
@@ -1272,7 +1184,7 @@ class VideoSubtitleEnhancedNode:
                 max_char_width = 0
                 total_height = 0
                 for char in chars:
-                    bbox = temp_draw.textbbox((0, 0), char, font=font)
+                    bbox = char_bbox(font, char)
                     char_width = bbox[2] - bbox[0]
                     char_height = bbox[3] - bbox[1]
                     max_char_width = max(max_char_width, char_width)
@@ -1286,7 +1198,7 @@ class VideoSubtitleEnhancedNode:
                     total_width = 0
                     max_height = 0
                     for char in chars:
-                        bbox = temp_draw.textbbox((0, 0), char, font=font)
+                        bbox = char_bbox(font, char)
                         total_width += bbox[2] - bbox[0]
                         max_height = max(max_height, bbox[3] - bbox[1])
                     total_width += (len(chars) - 1) * max(0, 字间距)
@@ -1615,8 +1527,6 @@ class VideoSubtitleEnhancedNode:
         text_color = self.parse_color(字体颜色)
         stroke_color = self.parse_color(描边颜色)
         
-        output_images = []
-        
         # 日志输出
         if 时间单位 == "秒数":
             print(f"[增强字幕] 秒数模式: 开始={开始时间:.2f}s(帧{start_frame}), "
@@ -1647,15 +1557,21 @@ class VideoSubtitleEnhancedNode:
         # GPU内存优化：批量处理前先移到CPU
         images_cpu = images.cpu()
         
-        canvas_width = width * 2
-        canvas_height = height * 2
+        # 预分配输出并整体复制输入：显示范围外（以及无可见文字）的帧直接沿用，不做 uint8 量化往返
+        output_tensor = images_cpu.clone()
+        
+        # 文字画布按文字块实际尺寸分配，四周留出描边、加粗、投影所需的边距；
+        # 文字居中于画布，canvas_margin 即文字块相对画布左上角的锚点偏移
+        canvas_margin = text_margin(font, 描边大小, 字体粗细, 投影距离 if 投影强度 > 0 else 0, 投影模糊)
+        canvas_width, canvas_height = text_canvas_size(字幕文本, font, 字间距, 排版方向, canvas_margin)
         base_text_img = None
         if 动效类型 != "打字机":
             display_text_base = 字幕文本
             if 描边大小 > 0 and 渐变效果 != "无":
                 base_text_img = self.create_gradient_text(
                     display_text_base, font, 渐变效果,
-                    渐变开头颜色, 渐变中间颜色, 渐变末尾颜色, 渐变过渡强度, 排版方向, 字间距, 字体粗细
+                    渐变开头颜色, 渐变中间颜色, 渐变末尾颜色, 渐变过渡强度, 排版方向, 字间距, 字体粗细,
+                    margin=canvas_margin
                 )
             elif 描边大小 > 0:
                 base_text_img = self.create_stroke_text(
@@ -1666,33 +1582,30 @@ class VideoSubtitleEnhancedNode:
             elif 渐变效果 != "无":
                 base_text_img = self.create_gradient_text(
                     display_text_base, font, 渐变效果,
-                    渐变开头颜色, 渐变中间颜色, 渐变末尾颜色, 渐变过渡强度, 排版方向, 字间距, 字体粗细
+                    渐变开头颜色, 渐变中间颜色, 渐变末尾颜色, 渐变过渡强度, 排版方向, 字间距, 字体粗细,
+                    margin=canvas_margin
                 )
             elif 排版方向 == "竖排":
-                base_text_img = self.create_vertical_text(display_text_base, font, text_color, 字间距, 字体粗细)
+                base_text_img = self.create_vertical_text(
+                    display_text_base, font, text_color, 字间距, 字体粗细, margin=canvas_margin
+                )
             else:
                 temp_img = Image.new('RGBA', (canvas_width, canvas_height), (0, 0, 0, 0))
                 temp_draw = ImageDraw.Draw(temp_img)
                 alpha_full = 255
                 if 字间距 != 0:
                     chars = list(display_text_base.replace('\n', ''))
-                    measure_img = Image.new('RGBA', (1, 1))
-                    measure_draw = ImageDraw.Draw(measure_img)
                     char_widths = []
                     for char in chars:
-                        bbox = measure_draw.textbbox((0, 0), char, font=font)
+                        bbox = char_bbox(font, char)
                         char_widths.append(bbox[2] - bbox[0])
                     total_width = sum(char_widths) + (len(chars) - 1) * max(0, 字间距)
                     x_offset = (canvas_width - total_width) // 2
+                    char_positions = []
                     for char, char_width in zip(chars, char_widths):
-                        char_x = x_offset + char_width // 2
-                        if 字体粗细 == "常规":
-                            temp_draw.text((char_x, canvas_height//2), char, 
-                                         font=font, fill=text_color + (alpha_full,), anchor='mm')
-                        else:
-                            self.create_bold_text(temp_draw, (char_x, canvas_height//2), 
-                                                char, font, text_color + (alpha_full,), 字体粗细)
+                        char_positions.append((char, x_offset + char_width // 2, canvas_height//2))
                         x_offset += char_width + max(0, 字间距)
+                    draw_glyphs(temp_draw, char_positions, font, text_color + (alpha_full,), 字体粗细)
                 else:
                     if 字体粗细 == "常规":
                         temp_draw.text((canvas_width//2, canvas_height//2), display_text_base, 
@@ -1702,23 +1615,12 @@ class VideoSubtitleEnhancedNode:
                                             display_text_base, font, text_color + (alpha_full,), 字体粗细, align=pil_align)
                 base_text_img = temp_img
         
-        for i in range(batch_size):
+        # 只处理显示范围内的帧，耗时与字幕时长成正比而非视频长度
+        for i in range(max(0, start_frame), end_frame):
             # 定期清理GPU显存（每100帧清理一次）
             if i > 0 and i % 100 == 0 and torch.cuda.is_available():
                 torch.cuda.empty_cache()
             
-            # 转换当前帧（从CPU tensor）
-            img_array = images_cpu[i].numpy()
-            img_array = (img_array * 255).astype(np.uint8)
-            img_pil = Image.fromarray(img_array)
-            
-            # 判断是否在显示范围
-            if i < start_frame or i >= end_frame:
-                result = img_pil.convert('RGB')
-                result_array = np.array(result).astype(np.float32) / 255.0
-                output_images.append(result_array)
-                continue
-            
             relative_frame = i - start_frame
             
             # 淡出特殊处理
@@ -1753,24 +1655,14 @@ class VideoSubtitleEnhancedNode:
                 if is_complex_style:
                     display_text = 字幕文本[:max(0, char_count)]
                     if not display_text:
-                        result = img_pil.convert('RGB')
-                        result_array = np.array(result).astype(np.float32) / 255.0
-                        output_images.append(result_array)
                         continue
                 else:
                     # 标准模式，传递完整文本和可见字符数
                     display_text = 字幕文本
                     visible_chars = max(0, char_count)
                     if visible_chars == 0:
-                        result = img_pil.convert('RGB')
-                        result_array = np.array(result).astype(np.float32) / 255.0
-                        output_images.append(result_array)
                         continue
             
-            # 创建文字图层
-            canvas_width = width * 2
-            canvas_height = height * 2
-            
             # 全功能渲染逻辑（支持所有组合）
             if base_text_img is not None and 动效类型 != "打字机":
                 text_img = base_text_img.copy()
@@ -1782,7 +1674,8 @@ class VideoSubtitleEnhancedNode:
                 if 描边大小 > 0 and 渐变效果 != "无":
                     text_img = self.create_gradient_text(
                         display_text, font, 渐变效果,
-                        渐变开头颜色, 渐变中间颜色, 渐变末尾颜色, 渐变过渡强度, 排版方向, 字间距, 字体粗细
+                        渐变开头颜色, 渐变中间颜色, 渐变末尾颜色, 渐变过渡强度, 排版方向, 字间距, 字体粗细,
+                        margin=canvas_margin
                     )
                     if 不透明度 < 1.0 or anim_params["opacity"] < 1.0:
                         combined_opacity = 不透明度 * anim_params["opacity"]
@@ -1801,14 +1694,17 @@ class VideoSubtitleEnhancedNode:
                 elif 渐变效果 != "无":
                     text_img = self.create_gradient_text(
                         display_text, font, 渐变效果,
-                        渐变开头颜色, 渐变中间颜色, 渐变末尾颜色, 渐变过渡强度, 排版方向, 字间距, 字体粗细
+                        渐变开头颜色, 渐变中间颜色, 渐变末尾颜色, 渐变过渡强度, 排版方向, 字间距, 字体粗细,
+                        margin=canvas_margin
                     )
                     if 不透明度 < 1.0 or anim_params["opacity"] < 1.0:
                         combined_opacity = 不透明度 * anim_params["opacity"]
                         alpha_mask = text_img.split()[3].point(lambda p: int(p * combined_opacity))
                         text_img.putalpha(alpha_mask)
                 elif 排版方向 == "竖排":
-                    text_img = self.create_vertical_text(display_text, font, text_color, 字间距, 字体粗细)
+                    text_img = self.create_vertical_text(
+                        display_text, font, text_color, 字间距, 字体粗细, margin=canvas_margin
+                    )
                     if 不透明度 < 1.0 or anim_params["opacity"] < 1.0:
                         combined_opacity = 不透明度 * anim_params["opacity"]
                         alpha_mask = text_img.split()[3].point(lambda p: int(p * combined_opacity))
@@ -1823,6 +1719,10 @@ class VideoSubtitleEnhancedNode:
                     )
                     text_img = temp_img
             
+            # 文字块居中于画布、四周各留 canvas_margin；其宽高随缩放与旋转一起变换，供左/右对齐定位
+            block_width = max(0, text_img.width - 2 * canvas_margin)
+            block_height = max(0, text_img.height - 2 * canvas_margin)
+            
             # 应用缩放（使用高质量LANCZOS算法）
             if anim_params["scale"] != 1.0 and anim_params["scale"] > 0:
                 new_size = (
@@ -1830,24 +1730,27 @@ class VideoSubtitleEnhancedNode:
                     max(1, int(text_img.height * anim_params["scale"]))
                 )
                 text_img = text_img.resize(new_size, Image.LANCZOS)
+                block_width *= anim_params["scale"]
+                block_height *= anim_params["scale"]
             
             # 应用旋转
             total_rotation = 字体角度 + anim_params["rotation"]
             if total_rotation != 0:
                 text_img = text_img.rotate(-total_rotation, expand=True, resample=Image.BICUBIC)
-            
-            # 创建最终图层
-            final_layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+                # 旋转后文字块包围盒的宽度（expand=True 时文字块仍居中于扩展后的画布）
+                radians = math.radians(total_rotation)
+                block_width = block_width * abs(math.cos(radians)) + block_height * abs(math.sin(radians))
             
             # 计算位置（根据对齐方式）
             text_x = int(width * 位置X百分比 / 100.0) + anim_params["offset_x"]
             text_y = int(height * 位置Y百分比 / 100.0) + anim_params["offset_y"]
             
-            # 根据文字对齐方式计算粘贴位置
+            # 根据文字对齐方式计算粘贴位置（左/右对齐时文字块包围盒的左/右边缘对齐到定位点）
+            block_left = (text_img.width - block_width) / 2
             if 文字对齐 == "左对齐":
-                paste_x = text_x
+                paste_x = text_x - int(round(block_left))
             elif 文字对齐 == "右对齐":
-                paste_x = text_x - text_img.width
+                paste_x = text_x - int(round(block_left + block_width))
             else:  # 居中对齐
                 paste_x = text_x - text_img.width // 2
             
@@ -1859,33 +1762,14 @@ class VideoSubtitleEnhancedNode:
                     text_img, paste_x, paste_y, width, height
                 )
             
-            # 添加投影
+            # 投影与文字只在各自的包围盒内原地合成到输出帧
+            frame = output_tensor[i]
             if 投影距离 > 0 and 投影强度 > 0:
                 projection = self.create_projection(text_img, 投影角度, 投影距离, 投影强度, 投影模糊)
-                try:
-                    final_layer.paste(projection, (paste_x, paste_y), projection)
-                except Exception as e:
-                    print(f"警告: 投影粘贴失败 - {e}")
-            
-            # 粘贴文字
-            try:
-                final_layer.paste(text_img, (paste_x, paste_y), text_img)
-            except Exception as e:
-                print(f"警告: 文字粘贴失败 - {e}")
-            
-            # 合成最终图像
-            img_pil = img_pil.convert('RGBA')
-            result = Image.alpha_composite(img_pil, final_layer)
-            result = result.convert('RGB')
-            
-            result_array = np.array(result).astype(np.float32) / 255.0
-            output_images.append(result_array)
-        
-        # 转换为tensor
-        output_tensor = torch.from_numpy(np.stack(output_images))
+                composite_rgba(frame, projection, paste_x, paste_y)
+            composite_rgba(frame, text_img, paste_x, paste_y)
         
         # 清理临时数据，释放内存
-        del output_images
         gc.collect()
         
         # 清理GPU显存
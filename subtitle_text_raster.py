@@ -0,0 +1,383 @@
+"""
+字幕文字栅格化工具
+- 按文字实际排版尺寸计算画布大小：文字块 + 描边、加粗、投影所需的边距，
+  取代按整帧两倍尺寸分配的画布。文字始终居中于画布，四周边距即文字块相对画布的锚点偏移。
+- 字形缓存（GlyphAtlas）：每个 (字体, 字号, 粗细, 描边) 下的字符只栅格化一次为 alpha 位图，
+  逐字排版时用 numpy 把缓存的字形叠加成整段遮罩，再一次性绘制到图层上；
+  每个 (字体, 字号) 下字符的测量框与步进宽度同样缓存，逐字排版不再每帧调用 textbbox。
+- 粗细与描边通过对文字遮罩做形态学膨胀（最大值滤波）实现：文字只绘制一次，
+  加粗为按偏移集合的小范围膨胀，描边为半径等于描边大小的圆盘膨胀，
+  取代按每个偏移重复调用 draw.text。
+"""
+
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# 各粗细级别多次绘制时的最大偏移（像素）
+BOLD_EXTENT = {"常规": 0, "粗体": 1, "特粗": 2, "超粗": 2}
+
+# 各粗细级别的膨胀结构元素（偏移集合）
+BOLD_OFFSETS = {
+    "常规": [(0, 0)],
+    "粗体": [(0, 0), (1, 0), (0, 1), (1, 1)],
+    "特粗": [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2)],
+    "超粗": [(dx, dy) for dx in range(-1, 3) for dy in range(-1, 3)],
+}
+
+_measure_draw = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+def measure_text_block(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    spacing: int = 0,
+    direction: str = "横排"
+) -> Tuple[int, int]:
+    """
+    计算文字块尺寸，与节点中逐字排版（_calculate_multiline_metrics / 竖排逐字绘制）的规则一致
+
+    Returns:
+        (宽, 高)
+    """
+    spacing = max(0, spacing)
+    if direction == "竖排":
+        chars = list(text.replace("\n", ""))
+        if not chars:
+            return 0, 0
+        max_width = 0
+        total_height = 0
+        for char in chars:
+            bbox = char_bbox(font, char)
+            max_width = max(max_width, bbox[2] - bbox[0])
+            total_height += bbox[3] - bbox[1]
+        return max_width, total_height + (len(chars) - 1) * spacing
+
+    bbox = _measure_draw.textbbox((0, 0), "A", font=font)
+    default_line_height = bbox[3] - bbox[1]
+    line_gap = int(default_line_height * 0.2)
+    lines = text.split("\n")
+    max_width = 0
+    total_height = 0
+    for i, line in enumerate(lines):
+        if not line:
+            total_height += default_line_height
+        else:
+            line_width = 0
+            line_height = 0
+            for char in line:
+                bbox = char_bbox(font, char)
+                line_width += bbox[2] - bbox[0]
+                line_height = max(line_height, bbox[3] - bbox[1])
+            line_width += (len(line) - 1) * spacing
+            # 整行绘制（无字间距）时字距调整可能使整行略宽于逐字累加
+            line_width = max(line_width, int(_measure_draw.textlength(line, font=font)))
+            max_width = max(max_width, line_width)
+            total_height += line_height
+        if i < len(lines) - 1:
+            total_height += line_gap
+    return max_width, total_height
+
+
+def text_margin(
+    font: ImageFont.FreeTypeFont,
+    stroke_size: int = 0,
+    bold_level: str = "常规",
+    shadow_distance: int = 0,
+    shadow_blur: int = 0
+) -> int:
+    """
+    文字块四周需要预留的边距
+
+    包括字形超出测量框的部分（按字号估算）、描边宽度、加粗偏移，
+    以及投影的偏移距离与模糊扩散（高斯模糊约 3 倍半径）
+    """
+    glyph_overhang = max(4, int(getattr(font, "size", 16)) // 4)
+    shadow = shadow_distance + shadow_blur * 3 if shadow_distance > 0 else 0
+    return glyph_overhang + max(0, stroke_size) + BOLD_EXTENT.get(bold_level, 2) + shadow
+
+
+def text_canvas_size(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    spacing: int,
+    direction: str,
+    margin: int
+) -> Tuple[int, int]:
+    """文字画布尺寸：文字块四周各加 margin"""
+    block_width, block_height = measure_text_block(text, font, spacing, direction)
+    return block_width + margin * 2, block_height + margin * 2
+
+
+def _shift_max(out: np.ndarray, src: np.ndarray, dx: int, dy: int):
+    """out = max(out, src 平移 (dx, dy))，移出边界的部分丢弃（原地修改 out）"""
+    height, width = src.shape
+    if abs(dx) >= width or abs(dy) >= height:
+        return
+    dst = out[max(0, dy):height + min(0, dy), max(0, dx):width + min(0, dx)]
+    np.maximum(dst, src[max(0, -dy):height - max(0, dy), max(0, -dx):width - max(0, dx)], out=dst)
+
+
+def dilate_offsets(mask: np.ndarray, offsets: List[Tuple[int, int]]) -> np.ndarray:
+    """按偏移集合做膨胀：结果为 mask 平移到各偏移后的逐像素最大值（用于加粗）"""
+    result = np.zeros_like(mask)
+    for dx, dy in offsets:
+        _shift_max(result, mask, dx, dy)
+    return result
+
+
+def dilate_disc(mask: np.ndarray, radius: int) -> np.ndarray:
+    """
+    按半径 radius 的圆盘做最大值滤波（用于描边）
+
+    圆盘按行分解：第 dy 行的半宽为 floor(sqrt(r² - dy²))。横向最大值随半宽递增逐步累积，
+    每达到某些行所需的半宽时，把横向结果按 ±dy 纵向平移合并到输出。
+    共 O(radius) 次整块数组运算，与描边采样角度无关。
+    """
+    if radius <= 0:
+        return mask.copy()
+    rows_by_half_width: Dict[int, List[int]] = {}
+    for dy in range(radius + 1):
+        half_width = math.isqrt(radius * radius - dy * dy)
+        rows_by_half_width.setdefault(half_width, []).append(dy)
+
+    result = np.zeros_like(mask)
+    row_max = mask.copy()
+    for half_width in range(radius + 1):
+        if half_width > 0:
+            _shift_max(row_max, mask, half_width, 0)
+            _shift_max(row_max, mask, -half_width, 0)
+        for dy in rows_by_half_width.get(half_width, ()):
+            _shift_max(result, row_max, 0, dy)
+            if dy:
+                _shift_max(result, row_max, 0, -dy)
+    return result
+
+
+class Glyph(NamedTuple):
+    """缓存的字形：alpha 位图及其左上角相对绘制锚点的偏移"""
+    image: Optional[Image.Image]
+    mask: Optional[np.ndarray]
+    left: int
+    top: int
+
+
+def rasterize_text(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    bold_level: str = "常规",
+    stroke_size: int = 0,
+    anchor: str = "la",
+    align: str = "left"
+) -> Glyph:
+    """
+    把文字绘制一次为 L 模式遮罩，再按粗细和描边做膨胀
+
+    Args:
+        bold_level: 粗细级别（未知级别不绘制任何像素）
+        stroke_size: 描边大小，> 0 时返回描边遮罩（覆盖文字本身及其外扩 stroke_size 像素）
+        anchor / align: 与 draw.text 相同
+
+    Returns:
+        Glyph，left/top 为遮罩左上角相对绘制锚点的偏移
+    """
+    footprint = BOLD_OFFSETS.get(bold_level, [])
+    left, top, right, bottom = _measure_draw.textbbox((0, 0), text, font=font, anchor=anchor, align=align)
+    if not footprint or right <= left or bottom <= top:
+        # 空白字符或未知粗细：不绘制任何像素
+        return Glyph(None, None, 0, 0)
+
+    pad = max(abs(v) for offset in footprint for v in offset) + max(0, stroke_size)
+    image = Image.new("L", (right - left + pad * 2, bottom - top + pad * 2), 0)
+    ImageDraw.Draw(image).text((pad - left, pad - top), text, font=font, fill=255, anchor=anchor, align=align)
+    if footprint == [(0, 0)] and stroke_size <= 0:
+        return Glyph(image, np.asarray(image), left - pad, top - pad)
+
+    mask = np.asarray(image)
+    if footprint != [(0, 0)]:
+        mask = dilate_offsets(mask, footprint)
+    if stroke_size > 0:
+        mask = dilate_disc(mask, stroke_size)
+    return Glyph(Image.fromarray(mask, "L"), mask, left - pad, top - pad)
+
+
+def draw_text(
+    draw: ImageDraw.ImageDraw,
+    position: Tuple[int, int],
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    fill,
+    bold_level: str = "常规",
+    stroke_size: int = 0,
+    anchor: str = "la",
+    align: str = "left"
+):
+    """整段文字（可多行）以给定粗细/描边绘制，效果对应按各偏移重复调用 draw.text"""
+    glyph = rasterize_text(text, font, bold_level, stroke_size, anchor, align)
+    if glyph.image is not None:
+        draw.bitmap((int(position[0]) + glyph.left, int(position[1]) + glyph.top), glyph.image, fill=fill)
+
+
+class GlyphMetrics(NamedTuple):
+    """字符的测量框（与 textbbox((0, 0), char) 相同）与步进宽度"""
+    bbox: Tuple[int, int, int, int]
+    advance: float
+
+
+def _font_key(font: ImageFont.FreeTypeFont) -> Optional[tuple]:
+    """
+    字体的稳定标识：字体文件、字体名称（族名, 样式）、字号、字体索引、排版引擎
+
+    不使用 id(font)：字体对象被回收后 id 可能被复用，会取到其他字体的缓存。
+    既没有文件路径也没有字体名称时返回 None（不缓存）。
+    """
+    path = getattr(font, "path", None)
+    path = os.fspath(path) if isinstance(path, (str, bytes, os.PathLike)) else None
+    getname = getattr(font, "getname", None)
+    name = getname() if callable(getname) else None
+    if path is None and name is None:
+        return None
+    return (
+        path,
+        name,
+        getattr(font, "size", 0),
+        getattr(font, "index", 0),
+        getattr(font, "layout_engine", None),
+    )
+
+
+class GlyphAtlas:
+    """
+    字形缓存（LRU）
+
+    字形键为 (字体, 字符, 粗细, 描边大小, 锚点)，粗细与描边的膨胀结果直接缓存在位图中，
+    之后每次排版只需取出位图叠加，不再逐字调用 draw.text。
+    描边位置（外部/居中/内部）在图层合成时处理，不影响字形本身。
+    度量键为 (字体, 字符)，与粗细、描边无关。
+    """
+
+    MAX_GLYPHS = 2048
+    MAX_METRICS = 8192
+
+    def __init__(self, max_glyphs: int = MAX_GLYPHS, max_metrics: int = MAX_METRICS):
+        self.max_glyphs = max_glyphs
+        self.max_metrics = max_metrics
+        self._glyphs: "OrderedDict[tuple, Glyph]" = OrderedDict()
+        self._metrics: "OrderedDict[tuple, GlyphMetrics]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._glyphs)
+
+    def clear(self):
+        with self._lock:
+            self._glyphs.clear()
+            self._metrics.clear()
+
+    def metrics(self, font: ImageFont.FreeTypeFont, char: str) -> GlyphMetrics:
+        """字符的测量框与步进宽度（按字体与字符缓存）"""
+        font_key = _font_key(font)
+        key = (font_key, char)
+        if font_key is not None:
+            with self._lock:
+                metrics = self._metrics.get(key)
+                if metrics is not None:
+                    self._metrics.move_to_end(key)
+                    return metrics
+        metrics = GlyphMetrics(
+            tuple(_measure_draw.textbbox((0, 0), char, font=font)),
+            _measure_draw.textlength(char, font=font),
+        )
+        if font_key is not None:
+            with self._lock:
+                self._metrics[key] = metrics
+                while len(self._metrics) > self.max_metrics:
+                    self._metrics.popitem(last=False)
+        return metrics
+
+    def get(
+        self,
+        font: ImageFont.FreeTypeFont,
+        char: str,
+        bold_level: str = "常规",
+        stroke_size: int = 0,
+        anchor: str = "mm"
+    ) -> Glyph:
+        font_key = _font_key(font)
+        if font_key is None:
+            return rasterize_text(char, font, bold_level, stroke_size, anchor)
+        key = (font_key, char, bold_level, max(0, stroke_size), anchor)
+        with self._lock:
+            glyph = self._glyphs.get(key)
+            if glyph is not None:
+                self._glyphs.move_to_end(key)
+                return glyph
+        glyph = rasterize_text(char, font, bold_level, stroke_size, anchor)
+        with self._lock:
+            self._glyphs[key] = glyph
+            while len(self._glyphs) > self.max_glyphs:
+                self._glyphs.popitem(last=False)
+        return glyph
+
+
+GLYPH_ATLAS = GlyphAtlas()
+
+
+def char_bbox(font: ImageFont.FreeTypeFont, char: str) -> Tuple[int, int, int, int]:
+    """缓存的单字符测量框，等价于 draw.textbbox((0, 0), char, font=font)"""
+    return GLYPH_ATLAS.metrics(font, char).bbox
+
+
+def draw_glyphs(
+    draw: ImageDraw.ImageDraw,
+    char_positions: Iterable[Tuple[str, int, int]],
+    font: ImageFont.FreeTypeFont,
+    fill,
+    bold_level: str = "常规",
+    stroke_size: int = 0,
+    anchor: str = "mm",
+    visible_chars: int = -1
+):
+    """
+    按 (字符, x, y) 列表绘制一段文字，等价于逐字调用 draw.text
+
+    字形取自 GLYPH_ATLAS，用 numpy 按与 draw.text 相同的叠加规则（a + (255 - a) * m / 255）
+    合并成整段遮罩后，通过 draw.bitmap 一次性以 fill 颜色绘制
+
+    Args:
+        draw: 目标图层的 ImageDraw
+        char_positions: (字符, x, y)，x/y 为 anchor 对应的锚点位置
+        fill: 填充颜色（与 draw.text 的 fill 相同）
+        bold_level / stroke_size: 粗细与描边（stroke_size > 0 时绘制描边遮罩）
+        visible_chars: 只绘制前 N 个字符（打字机效果），-1 表示全部
+    """
+    placed = []
+    for i, (char, x, y) in enumerate(char_positions):
+        if visible_chars >= 0 and i >= visible_chars:
+            break
+        glyph = GLYPH_ATLAS.get(font, char, bold_level, stroke_size, anchor)
+        if glyph.mask is not None:
+            placed.append((glyph, int(x) + glyph.left, int(y) + glyph.top))
+    if not placed:
+        return
+
+    run_left = min(x for _, x, _ in placed)
+    run_top = min(y for _, _, y in placed)
+    run_right = max(x + glyph.mask.shape[1] for glyph, x, _ in placed)
+    run_bottom = max(y + glyph.mask.shape[0] for glyph, _, y in placed)
+    if len(placed) == 1:
+        glyph, x, y = placed[0]
+        draw.bitmap((x, y), glyph.image, fill=fill)
+        return
+
+    run = np.zeros((run_bottom - run_top, run_right - run_left), dtype=np.uint16)
+    for glyph, x, y in placed:
+        height, width = glyph.mask.shape
+        region = run[y - run_top:y - run_top + height, x - run_left:x - run_left + width]
+        region += ((255 - region) * glyph.mask + 127) // 255
+    draw.bitmap((run_left, run_top), Image.fromarray(run.astype(np.uint8), "L"), fill=fill)
@@ -132,6 +132,9 @@ from typing import Tuple, Dict, Any, Optional, List
 import shutil
 import subprocess
 import folder_paths
+
+from .subtitle_compositor import composite_rgba
+from .subtitle_text_raster import GLYPH_ATLAS, char_bbox, draw_glyphs, draw_text, text_canvas_size, text_margin
 try:
     import cv2
 except ImportError:
@@ -453,8 +456,9 @@ class VideoSubtitleTimestampProNode:
     
     @classmethod
     def clear_font_cache(cls):
-        """清空字体缓存，释放内存"""
+        """清空字体缓存（及字形缓存），释放内存"""
         cls._font_cache.clear()
+        GLYPH_ATLAS.clear()
         gc.collect()
         print(f"[性能优化] 字体缓存已清空，内存已释放")
     
@@ -1054,23 +1058,8 @@ class VideoSubtitleTimestampProNode:
     def create_bold_text(self, draw: ImageDraw.ImageDraw, position: Tuple[int, int], 
                         text: str, font: ImageFont.FreeTypeFont, 
                         fill, bold_level: str, anchor: str = "mm", align: str = "left"):
-        """创建加粗文字（优化版）"""
-        x, y = position
-        
-        if bold_level == "常规":
-            draw.text((x, y), text, font=font, fill=fill, anchor=anchor, align=align)
-        elif bold_level == "粗体":
-            offsets = [(0, 0), (1, 0), (0, 1), (1, 1)]
-            for dx, dy in offsets:
-                draw.text((x + dx, y + dy), text, font=font, fill=fill, anchor=anchor, align=align)
-        elif bold_level == "特粗":
-            offsets = [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2)]
-            for dx, dy in offsets:
-                draw.text((x + dx, y + dy), text, font=font, fill=fill, anchor=anchor, align=align)
-        elif bold_level == "超粗":
-            offsets = [(dx, dy) for dx in range(-1, 3) for dy in range(-1, 3)]
-            for dx, dy in offsets:
-                draw.text((x + dx, y + dy), text, font=font, fill=fill, anchor=anchor, align=align)
+        """创建加粗文字（文字只绘制一次，加粗为对文字遮罩的小范围膨胀）"""
+        draw_text(draw, position, text, font, fill, bold_level, anchor=anchor, align=align)
     
     def create_projection(self, text_img: Image.Image, angle: int, 
                          distance: int, intensity: float, blur: int) -> Image.Image:
@@ -1139,70 +1128,31 @@ class VideoSubtitleTimestampProNode:
         if stroke_size > 0:
             stroke_rgba = stroke_color + (255,)
             
-            # 智能采样策略
-            if stroke_size <= 2:
-                angle_step = 45
-            elif stroke_size <= 5:
-                angle_step = 30
-            elif stroke_size <= 10:
-                angle_step = 22.5
-            else:
-                angle_step = 15
-            
-            # 优化：预计算偏移量
-            offsets = []
-            for angle in range(0, 360, int(angle_step)):
-                rad = math.radians(angle)
-                cos_val = math.cos(rad)
-                sin_val = math.sin(rad)
-                for distance in range(1, stroke_size + 1):
-                    offset_x = int(cos_val * distance)
-                    offset_y = int(sin_val * distance)
-                    if (offset_x, offset_y) not in offsets:
-                        offsets.append((offset_x, offset_y))
-            
-            # 批量绘制描边
-            for offset_x, offset_y in offsets:
-                for i, (char, x, y) in enumerate(char_positions):
-                    if visible_chars >= 0 and i >= visible_chars:
-                        break
-                    if bold_level == "常规":
-                        draw.text((x + offset_x, y + offset_y), char, font=font, fill=stroke_rgba, anchor='mm')
-                    else:
-                        self.create_bold_text(draw, (x + offset_x, y + offset_y), char, font, stroke_rgba, bold_level, anchor='mm')
+            # 批量绘制描边：每个字符的描边遮罩（文字遮罩按描边大小膨胀）缓存为一个字形
+            draw_glyphs(draw, char_positions, font, stroke_rgba, bold_level,
+                        stroke_size, visible_chars=visible_chars)
         
         # 创建渐变蒙版
         gradient_mask = Image.new('L', (width, height), 0)
         gradient_draw = ImageDraw.Draw(gradient_mask)
         
         # 绘制蒙版文字
-        for i, (char, x, y) in enumerate(char_positions):
-            if visible_chars >= 0 and i >= visible_chars:
-                break
-            if bold_level == "常规":
-                gradient_draw.text((x, y), char, font=font, fill=255, anchor='mm')
-            else:
-                self.create_bold_text(gradient_draw, (x, y), char, font, 255, bold_level, anchor='mm')
-        
-        # 创建渐变图层
-        gradient_layer = Image.new('RGB', (width, height))
-        pixels = gradient_layer.load()
+        draw_glyphs(gradient_draw, char_positions, font, 255, bold_level, visible_chars=visible_chars)
         
+        # 创建渐变图层（按像素位置向量化取色）
         num_colors = len(gradient_colors)
-        
-        for y in range(height):
-            for x in range(width):
-                if direction == "横向":
-                    ratio = x / width
-                elif direction == "竖向":
-                    ratio = y / height
-                else:  # 对角
-                    ratio = (x + y) / (width + height)
-                
-                color_idx = int(ratio * (num_colors - 1))
-                color_idx = max(0, min(num_colors - 1, color_idx))
-                
-                pixels[x, y] = gradient_colors[color_idx]
+        xs = np.arange(width, dtype=np.float64)[None, :]
+        ys = np.arange(height, dtype=np.float64)[:, None]
+        if direction == "横向":
+            ratio = np.broadcast_to(xs / width, (height, width))
+        elif direction == "竖向":
+            ratio = np.broadcast_to(ys / height, (height, width))
+        else:  # 对角
+            ratio = (xs + ys) / (width + height)
+        
+        color_idx = np.clip((ratio * (num_colors - 1)).astype(np.int64), 0, num_colors - 1)
+        palette = np.array(gradient_colors, dtype=np.uint8)
+        gradient_layer = Image.fromarray(palette[color_idx], 'RGB')
         
         # 应用蒙版
         text_layer.paste(gradient_layer, (0, 0), gradient_mask)
@@ -1216,7 +1166,7 @@ class VideoSubtitleTimestampProNode:
         max_block_width = 0
         total_text_height = 0
         
-        bbox = draw.textbbox((0, 0), "A", font=font)
+        bbox = char_bbox(font, "A")
         default_line_height = bbox[3] - bbox[1]
         line_gap = int(default_line_height * 0.2) # 行间距
         
@@ -1230,7 +1180,7 @@ class VideoSubtitleTimestampProNode:
                 char_widths = []
                 max_line_height = 0
                 for char in chars:
-                    bbox = draw.textbbox((0, 0), char, font=font)
+                    bbox = char_bbox(font, char)
                     char_widths.append(bbox[2] - bbox[0])
                     max_line_height = max(max_line_height, bbox[3] - bbox[1])
                 
@@ -1283,14 +1233,7 @@ class VideoSubtitleTimestampProNode:
     def _draw_multiline_text_with_spacing(self, draw, text, font, fill, width, height, spacing, align, bold_level, visible_chars=-1):
         """辅助函数：绘制多行带字间距文字"""
         char_positions, _, _ = self._calculate_multiline_metrics(draw, text, font, spacing, align, width, height)
-        
-        for i, (char, x, y) in enumerate(char_positions):
-            if visible_chars >= 0 and i >= visible_chars:
-                break
-            if bold_level == "常规":
-                draw.text((x, y), char, font=font, fill=fill, anchor='mm')
-            else:
-                self.create_bold_text(draw, (x, y), char, font, fill, bold_level, anchor='mm')
+        draw_glyphs(draw, char_positions, font, fill, bold_level, visible_chars=visible_chars)
 
     def create_stroke_text(self, text: str, font: ImageFont.FreeTypeFont, 
                           text_color: Tuple[int, int, int], stroke_color: Tuple[int, int, int], 
@@ -1318,49 +1261,15 @@ class VideoSubtitleTimestampProNode:
             # 有描边
             stroke_rgba = stroke_color + (255,)
             
-            # 智能采样策略
-            if stroke_size <= 2:
-                angle_step = 45
-            elif stroke_size <= 5:
-                angle_step = 30
-            elif stroke_size <= 10:
-                angle_step = 22.5
-            else:
-                angle_step = 15
-            
-            # 优化：预计算偏移量
-            offsets = []
-            for angle in range(0, 360, int(angle_step)):
-                rad = math.radians(angle)
-                cos_val = math.cos(rad)
-                sin_val = math.sin(rad)
-                for distance in range(1, stroke_size + 1):
-                    offset_x = int(cos_val * distance)
-                    offset_y = int(sin_val * distance)
-                    if (offset_x, offset_y) not in offsets:
-                        offsets.append((offset_x, offset_y))
-            
             # 计算文字位置
             char_positions, _, _ = self._calculate_multiline_metrics(draw, text, font, 0, pil_align, width, height)
             
-            # 批量绘制描边
-            for offset_x, offset_y in offsets:
-                for i, (char, x, y) in enumerate(char_positions):
-                    if visible_chars >= 0 and i >= visible_chars:
-                        break
-                    if bold_level == "常规":
-                        draw.text((x + offset_x, y + offset_y), char, font=font, fill=stroke_rgba, anchor='mm')
-                    else:
-                        self.create_bold_text(draw, (x + offset_x, y + offset_y), char, font, stroke_rgba, bold_level, anchor='mm')
+            # 批量绘制描边：每个字符的描边遮罩（文字遮罩按描边大小膨胀）缓存为一个字形
+            draw_glyphs(draw, char_positions, font, stroke_rgba, bold_level,
+                        stroke_size, visible_chars=visible_chars)
             
             # 绘制文字
-            for i, (char, x, y) in enumerate(char_positions):
-                if visible_chars >= 0 and i >= visible_chars:
-                    break
-                if bold_level == "常规":
-                    draw.text((x, y), char, font=font, fill=text_color + (255,), anchor='mm')
-                else:
-                    self.create_bold_text(draw, (x, y), char, font, text_color + (255,), bold_level, anchor='mm')
+            draw_glyphs(draw, char_positions, font, text_color + (255,), bold_level, visible_chars=visible_chars)
         
         return text_layer
     
@@ -1404,19 +1313,11 @@ class VideoSubtitleTimestampProNode:
             bbox = draw.textbbox((0, 0), line, font=font)
             text_width = bbox[2] - bbox[0]
             
-            # 绘制描边（支持字体粗细）
+            # 绘制描边（支持字体粗细）：整行绘制一次后按描边大小膨胀
             if stroke_size > 0:
                 stroke_rgba = stroke_color + (255,)
-                for angle in range(0, 360, 20):
-                    for distance in range(1, stroke_size + 1):
-                        offset_x = int(math.cos(math.radians(angle)) * distance)
-                        offset_y = int(math.sin(math.radians(angle)) * distance)
-                        if bold_level == "常规":
-                            draw.text((width // 2 + offset_x, y_offset + offset_y), 
-                                     line, font=font, fill=stroke_rgba, anchor='mm')
-                        else:
-                            self.create_bold_text(draw, (width // 2 + offset_x, y_offset + offset_y), 
-                                                line, font, stroke_rgba, bold_level, 'mm')
+                draw_text(draw, (width // 2, y_offset), line, font, stroke_rgba, 
+                          bold_level, stroke_size, anchor='mm')
             
             # 绘制文字（居中，支持字体粗细）
             if bold_level == "常规":
@@ -1893,8 +1794,6 @@ class VideoSubtitleTimestampProNode:
             x_percent = 位置X百分比
             y_percent = 位置Y百分比
         
-        output_images = []
-        
         # 滚动字幕模式
         if 动画特效 == "滚动字幕":
             print(f"[专业字幕] 滚动字幕模式")
@@ -1924,6 +1823,9 @@ class VideoSubtitleTimestampProNode:
             # GPU内存优化：批量处理前先移到CPU
             images_cpu = images.cpu()
             
+            # 预分配输出，字幕在各帧上原地合成
+            output_tensor = images_cpu.clone()
+            
             for i in range(batch_size):
                 # 定期清理GPU显存（每100帧清理一次）
                 if i > 0 and i % 100 == 0 and torch.cuda.is_available():
@@ -1934,10 +1836,6 @@ class VideoSubtitleTimestampProNode:
                     progress_pct = (i / batch_size) * 100
                     print(f"[滚动字幕] 进度: {i}/{batch_size} 帧 ({progress_pct:.1f}%)")
                 
-                img_array = images_cpu[i].numpy()
-                img_array = (img_array * 255).astype(np.uint8)
-                img_pil = Image.fromarray(img_array)
-                
                 # 计算滚动位置
                 current_time = i / 视频帧率
                 scroll_position = current_time * 滚动速度
@@ -1953,29 +1851,14 @@ class VideoSubtitleTimestampProNode:
                     alpha_mask = text_img.split()[3].point(lambda p: int(p * 不透明度))
                     text_img.putalpha(alpha_mask)
                 
-                # 添加投影效果（滚动字幕）
+                # 投影与文字只在各自的包围盒内原地合成到输出帧
+                frame = output_tensor[i]
                 if 投影距离 > 0 and 投影强度 > 0:
-                    final_layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
                     projection = self.create_projection(text_img, 投影角度, 投影距离, 投影强度, 投影模糊)
-                    try:
-                        final_layer = Image.alpha_composite(final_layer, projection)
-                        final_layer = Image.alpha_composite(final_layer, text_img)
-                        text_img = final_layer
-                    except Exception as e:
-                        print(f"警告: 滚动字幕投影合成失败 - {e}")
-                
-                # 合成
-                img_pil = img_pil.convert('RGBA')
-                result = Image.alpha_composite(img_pil, text_img)
-                result = result.convert('RGB')
-                
-                result_array = np.array(result).astype(np.float32) / 255.0
-                output_images.append(result_array)
-            
-            output_tensor = torch.from_numpy(np.stack(output_images))
+                    composite_rgba(frame, projection, 0, 0)
+                composite_rgba(frame, text_img, 0, 0)
             
             # 清理临时数据
-            del output_images
             gc.collect()
             
             # 清理GPU显存
@@ -2024,19 +1907,23 @@ class VideoSubtitleTimestampProNode:
                 else:
                     print(f"[画布限定] ✓ 统一字号: {字体大小}px → {unified_font_size}px（全视频一致）")
         
+        # 文字画布按文字块实际尺寸分配，四周留出描边、加粗、投影所需的边距（文字居中于画布）
+        canvas_margin = text_margin(font, 描边大小, 字体粗细, 投影距离 if 投影强度 > 0 else 0, 投影模糊)
+        
         segment_text_cache: Dict[int, Image.Image] = {}
         if 动画特效 != "打字机":
             for seg in segments:
                 display_text_cache = seg.text
+                canvas_width, canvas_height = text_canvas_size(display_text_cache, font, 0, "横排", canvas_margin)
                 if gradient_colors_list:
                     cached_img = self.create_gradient_text(
                         display_text_cache, font, gradient_colors_list, 渐变方向,
-                        stroke_color, 描边大小, width * 2, height * 2, 对齐方式, x_percent, 字体粗细
+                        stroke_color, 描边大小, canvas_width, canvas_height, 对齐方式, x_percent, 字体粗细
                     )
                 else:
                     cached_img = self.create_stroke_text(
                         display_text_cache, font, text_color, stroke_color, 
-                        描边大小, width * 2, height * 2, 对齐方式, x_percent, 字体粗细
+                        描边大小, canvas_width, canvas_height, 对齐方式, x_percent, 字体粗细
                     )
                 segment_text_cache[seg.index] = cached_img
         
@@ -2052,6 +1939,9 @@ class VideoSubtitleTimestampProNode:
         # GPU内存优化：批量处理前先移到CPU
         images_cpu = images.cpu()
         
+        # 预分配输出并整体复制输入：没有字幕的帧直接沿用，有字幕的帧原地合成
+        output_tensor = images_cpu.clone()
+        
         # 处理每一帧
         for i in range(batch_size):
             # 定期清理资源（每100帧清理一次）
@@ -2065,9 +1955,6 @@ class VideoSubtitleTimestampProNode:
             if batch_size > 100 and i % progress_interval == 0 and i > 0:
                 progress_pct = (i / batch_size) * 100
                 print(f"[专业字幕] 进度: {i}/{batch_size} 帧 ({progress_pct:.1f}%)")
-            img_array = images_cpu[i].numpy()
-            img_array = (img_array * 255).astype(np.uint8)
-            img_pil = Image.fromarray(img_array)
             
             current_time = i / 视频帧率
             
@@ -2079,10 +1966,6 @@ class VideoSubtitleTimestampProNode:
                     break
             
             if current_segment is None:
-                result = img_pil.convert('RGB')
-                result_array = np.array(result).astype(np.float32) / 255.0
-                output_images.append(result_array)
-                del img_pil, result  # 清理PIL对象
                 continue
             
             # 应用动画特效
@@ -2101,10 +1984,6 @@ class VideoSubtitleTimestampProNode:
                 
                 # 如果没有可见字符，输出空帧
                 if visible_chars == 0:
-                    result = img_pil.convert('RGB')
-                    result_array = np.array(result).astype(np.float32) / 255.0
-                    output_images.append(result_array)
-                    del img_pil, result  # 清理PIL对象
                     continue
             
             # 使用统一字号（如果启用了自动缩放，已在前面计算）
@@ -2112,16 +1991,17 @@ class VideoSubtitleTimestampProNode:
             if 动画特效 != "打字机" and current_segment.index in segment_text_cache:
                 text_img = segment_text_cache[current_segment.index].copy()
             else:
+                canvas_width, canvas_height = text_canvas_size(display_text, font, 0, "横排", canvas_margin)
                 if gradient_colors_list:
                     text_img = self.create_gradient_text(
                         display_text, font, gradient_colors_list, 渐变方向,
-                        stroke_color, 描边大小, width * 2, height * 2, 对齐方式, 50.0, 字体粗细,
+                        stroke_color, 描边大小, canvas_width, canvas_height, 对齐方式, 50.0, 字体粗细,
                         visible_chars=visible_chars
                     )
                 else:
                     text_img = self.create_stroke_text(
                         display_text, font, text_color, stroke_color, 
-                        描边大小, width * 2, height * 2, 对齐方式, 50.0, 字体粗细,
+                        描边大小, canvas_width, canvas_height, 对齐方式, 50.0, 字体粗细,
                         visible_chars=visible_chars
                     )
             
@@ -2143,9 +2023,6 @@ class VideoSubtitleTimestampProNode:
                 alpha_mask = text_img.split()[3].point(lambda p: int(p * combined_opacity))
                 text_img.putalpha(alpha_mask)
             
-            # 创建最终图层
-            final_layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-            
             # 计算位置
             text_x = int(width * x_percent / 100.0) + anim_params.get("offset_x", 0)
             text_y = int(height * y_percent / 100.0) + anim_params.get("offset_y", 0)
@@ -2159,40 +2036,21 @@ class VideoSubtitleTimestampProNode:
                     text_img, paste_x, paste_y, width, height
                 )
             
-            # 添加投影效果
+            # 投影与文字只在各自的包围盒内原地合成到输出帧
+            frame = output_tensor[i]
             if 投影距离 > 0 and 投影强度 > 0:
                 projection = self.create_projection(text_img, 投影角度, 投影距离, 投影强度, 投影模糊)
-                try:
-                    final_layer.paste(projection, (paste_x, paste_y), projection)
-                except Exception as e:
-                    print(f"警告: 投影粘贴失败 - {e}")
-            
-            # 粘贴文字
-            try:
-                final_layer.paste(text_img, (paste_x, paste_y), text_img)
-            except Exception as e:
-                print(f"警告: 文字粘贴失败 - {e}")
-            
-            # 合成最终图像
-            img_pil = img_pil.convert('RGBA')
-            result = Image.alpha_composite(img_pil, final_layer)
-            result = result.convert('RGB')
-            
-            result_array = np.array(result).astype(np.float32) / 255.0
-            output_images.append(result_array)
+                composite_rgba(frame, projection, paste_x, paste_y)
+            composite_rgba(frame, text_img, paste_x, paste_y)
             
             # 显式清理PIL对象，释放资源（防止Windows socket缓冲区耗尽）
-            del img_pil, text_img, final_layer, result
+            del text_img
             
             # 定期强制垃圾回收（每50帧）
             if i % 50 == 0:
                 gc.collect()
         
-        # 转换为tensor（使用stack直接从列表，更高效）
-        output_tensor = torch.from_numpy(np.stack(output_images))
-        
         # 清理临时数据，释放内存
-        del output_images
         gc.collect()
         
         # 清理GPU显存
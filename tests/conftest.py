@@ -0,0 +1,28 @@
+"""
+测试辅助
+包的 __init__ 会导入全部节点及 ComfyUI 运行时，测试通过 load_video_module 直接加载 video_editing 下的单个模块
+"""
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+VIDEO_PACKAGE = "haigc_video_editing"
+
+
+def _load_video_module(name: str):
+    """按模块名加载 video_editing 下的模块（模块内的相对导入照常解析）"""
+    if VIDEO_PACKAGE not in sys.modules:
+        package = types.ModuleType(VIDEO_PACKAGE)
+        package.__path__ = [str(REPO_ROOT / "video_editing")]
+        sys.modules[VIDEO_PACKAGE] = package
+    return importlib.import_module(f"{VIDEO_PACKAGE}.{name}")
+
+
+@pytest.fixture
+def load_video_module():
+    return _load_video_module
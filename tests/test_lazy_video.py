@@ -0,0 +1,76 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def make_video(load_video_module):
+    LazyVideo = load_video_module("lazy_video").LazyVideo
+
+    def make(length, actual=None):
+        """长度为 length 的延迟视频，源文件实际只有 actual 帧；每帧像素值等于源帧号"""
+        actual = length if actual is None else actual
+
+        def decode(start, end):
+            frames = torch.arange(start, min(end, actual), dtype=torch.float32)
+            return frames.view(-1, 1, 1, 1).expand(-1, 2, 2, 3).clone()
+
+        return LazyVideo("clip.mp4", 0, length, 1, 2, 2, 30.0, decode_fn=decode)
+
+    return make
+
+
+def frame_ids(frames):
+    return frames[:, 0, 0, 0].long().tolist()
+
+
+def test_negative_index(make_video):
+    video = make_video(100)
+    assert video[-1][0, 0, 0].item() == 99
+    assert video[-100][0, 0, 0].item() == 0
+    assert frame_ids(video[-3:]) == [97, 98, 99]
+    with pytest.raises(IndexError):
+        video[-101]
+    with pytest.raises(IndexError):
+        video[100]
+
+
+def test_integer_scalar_index(make_video):
+    video = make_video(100)
+    assert video[np.int64(5)][0, 0, 0].item() == 5
+    assert video[torch.tensor(-2)][0, 0, 0].item() == 98
+    assert frame_ids(video[np.int64(3):np.int64(6)]) == [3, 4, 5]
+    with pytest.raises(TypeError):
+        video[1.5]
+
+
+def test_tuple_index(make_video):
+    video = make_video(100)
+    channel = video[2:4, 0, :, 1]
+    assert channel.shape == (2, 2)
+    assert channel[:, 0].tolist() == [2.0, 3.0]
+    assert video[7, ..., 0].shape == (2, 2)
+    assert frame_ids(video[0:10:4, :, :, :]) == [0, 4, 8]
+
+
+def test_tail_range_shrinks_overestimated_length(make_video):
+    video = make_video(100, actual=90)
+    assert frame_ids(video[-1:]) == [89]
+    assert len(video) == 90
+    assert video.shape[0] == 90
+    assert video[-1][0, 0, 0].item() == 89
+
+
+def test_short_middle_chunk_raises(make_video):
+    video = make_video(100, actual=90)
+    # 第 64-96 帧的块不是结尾块，帧数不足时报错而不是返回不完整的帧
+    with pytest.raises(RuntimeError):
+        video[70:72]
+
+
+def test_failed_decode_raises(load_video_module):
+    LazyVideo = load_video_module("lazy_video").LazyVideo
+    video = LazyVideo("clip.mp4", 0, 10, 1, 2, 2, 30.0, decode_fn=lambda start, end: None)
+    with pytest.raises(RuntimeError):
+        video[-1]
@@ -0,0 +1,88 @@
+import sys
+import types
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def batch_writer(load_video_module, monkeypatch):
+    """加载批量保存节点；folder_paths 由 ComfyUI 提供，测试中用输出到临时目录的替身"""
+    if "folder_paths" not in sys.modules:
+        folder_paths = types.ModuleType("folder_paths")
+        folder_paths.get_output_directory = lambda: "."
+        monkeypatch.setitem(sys.modules, "folder_paths", folder_paths)
+    module = load_video_module("video_batch_writer_node")
+    # 不依赖本机是否安装 ffmpeg / OpenCV：编码本身由下面的替身完成
+    monkeypatch.setattr(module, "_cv2", object())
+    return module
+
+
+def fake_save_single_video(self, video_name, images, filename, video_path, format_config,
+                           fps, 视频编码, 视频质量, 编码档位, ffmpeg_path, threads, stats):
+    video_path.write_bytes(b"video")
+    stats.add("管道写入", 0.01)
+    stats.advance(images.shape[0])
+    return {"elapsed": 0.5, "encode_fps": images.shape[0] / 0.5}
+
+
+def save(node, output_dir, **videos):
+    return node.save_batch_videos(
+        视频帧率=24.0,
+        输出目录=str(output_dir),
+        文件名前缀="scene",
+        视频编码="H264",
+        视频质量="中",
+        输出格式="MP4 (H264)",
+        自动添加时间戳="否",
+        **videos,
+    )
+
+
+def test_report_and_timings_after_successful_saves(batch_writer, monkeypatch, tmp_path):
+    node = batch_writer.VideoBatchWriterNode()
+    monkeypatch.setattr(batch_writer.VideoBatchWriterNode, "_save_single_video", fake_save_single_video)
+
+    output = save(node, tmp_path, 视频1=torch.rand(4, 8, 8, 3), 视频2=torch.rand(6, 8, 8, 3))
+
+    output_dir, file_list, success_count, report = output["result"]
+    assert success_count == 2
+    assert file_list.splitlines() == [str(tmp_path / "scene_1.mp4"), str(tmp_path / "scene_2.mp4")]
+    assert "成功保存的文件" in report
+    assert "scene_2.mp4" in report
+
+    timings = output["ui"]["timings"][0]
+    assert timings["node"] == "批量视频保存"
+    assert timings["frames"] == 10
+    assert timings["phases"]["管道写入"] == pytest.approx(0.02)
+    assert set(timings["files"]) == {"scene_1.mp4", "scene_2.mp4"}
+    assert timings["files"]["scene_1.mp4"]["encode_fps"] == pytest.approx(8.0)
+
+
+def test_failed_save_is_reported(batch_writer, monkeypatch, tmp_path):
+    node = batch_writer.VideoBatchWriterNode()
+
+    def fail_second(self, video_name, *args):
+        if video_name == "视频2":
+            raise RuntimeError("ffmpeg 编码失败")
+        return fake_save_single_video(self, video_name, *args)
+
+    monkeypatch.setattr(batch_writer.VideoBatchWriterNode, "_save_single_video", fail_second)
+
+    output = save(node, tmp_path, 视频1=torch.rand(4, 8, 8, 3), 视频2=torch.rand(6, 8, 8, 3))
+
+    _, _, success_count, report = output["result"]
+    assert success_count == 1
+    assert "视频2 保存失败" in report
+    assert set(output["ui"]["timings"][0]["files"]) == {"scene_1.mp4"}
+
+
+def test_no_valid_input_returns_same_shape(batch_writer, tmp_path):
+    node = batch_writer.VideoBatchWriterNode()
+
+    output = save(node, tmp_path, 视频1=torch.zeros(0, 8, 8, 3))
+
+    assert output["ui"] == {"timings": []}
+    assert output["result"][:3] == ("", "", 0)
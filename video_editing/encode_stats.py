@@ -0,0 +1,138 @@
+"""
+编码进度与分阶段耗时统计
+保存节点用 EncodeStats 记录各阶段耗时（帧转换、管道写入、编码收尾、音频、比特率探测等），
+进度同时推送到 ComfyUI 的进度条；结束时汇总为 UI 数据并输出一条结构化日志（JSON）。
+
+注意：帧转换在后台线程中与管道写入并行进行，各阶段耗时之和可能大于总耗时。
+"""
+
+import contextlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+try:
+    from comfy.utils import ProgressBar as _ProgressBar
+except ImportError:
+    # 脱离 ComfyUI 运行时没有进度条
+    _ProgressBar = None
+
+logger = logging.getLogger("haigc.video")
+
+
+def timed_iter(iterable: Iterable, on_elapsed: Callable[[float], None]) -> Iterator:
+    """逐项迭代 iterable，把生成每一项所花的时间回调给 on_elapsed"""
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            on_elapsed(time.perf_counter() - started)
+            return
+        on_elapsed(time.perf_counter() - started)
+        yield item
+
+
+class EncodeStats:
+    """一次保存操作的进度与分阶段耗时（线程安全，可供并行编码的多个线程共用）"""
+
+    def __init__(self, node_name: str, total_frames: int):
+        """
+        Args:
+            node_name: 日志与打印使用的节点名称
+            total_frames: 进度条的总帧数
+        """
+        self.node_name = node_name
+        self.total_frames = max(0, int(total_frames))
+        self.done_frames = 0
+        self._phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._progress_bar = None
+        if _ProgressBar is not None and self.total_frames > 0:
+            try:
+                self._progress_bar = _ProgressBar(self.total_frames)
+            except Exception:
+                self._progress_bar = None
+
+    # ---- 阶段耗时 ----
+
+    def add(self, phase: str, seconds: float):
+        """累加某个阶段的耗时"""
+        with self._lock:
+            self._phases[phase] = self._phases.get(phase, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """with stats.phase("比特率探测"): ... 计时并累加到对应阶段"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    # ---- 进度 ----
+
+    def advance(self, frames: int):
+        """完成 frames 帧，更新进度条并打印进度"""
+        if frames <= 0:
+            return
+        with self._lock:
+            self.done_frames = min(self.total_frames, self.done_frames + int(frames))
+            done = self.done_frames
+            if self._progress_bar is not None:
+                self._progress_bar.update_absolute(done, self.total_frames)
+        progress = done / self.total_frames * 100 if self.total_frames else 100.0
+        print(f"  进度: {progress:.1f}% ({done}/{self.total_frames})")
+
+    def progress_callback(self) -> Callable[[int, int], None]:
+        """
+        返回 on_progress(已写入帧数, 总帧数) 回调（pipe_frames_to_ffmpeg 的进度格式）
+
+        每个回调独立记录自己上报过的帧数，因此并行编码的各段可以各用一个回调
+        """
+        reported = [0]
+
+        def on_progress(written: int, total: int):
+            delta = written - reported[0]
+            reported[0] = written
+            if delta > 0:
+                self.advance(delta)
+
+        return on_progress
+
+    # ---- 汇总 ----
+
+    def summary(self, frames: Optional[int] = None, **extra: Any) -> Dict[str, Any]:
+        """
+        汇总为可放入 UI / 日志的字典
+
+        Args:
+            frames: 计算帧/秒所用的帧数，默认为总帧数
+            extra: 附加字段（输出路径、格式等）
+        """
+        total_seconds = time.perf_counter() - self._started
+        frames = self.total_frames if frames is None else int(frames)
+        with self._lock:
+            phases = {name: round(seconds, 3) for name, seconds in self._phases.items()}
+        record = {
+            "node": self.node_name,
+            "frames": frames,
+            "total_seconds": round(total_seconds, 3),
+            "fps": round(frames / total_seconds, 2) if total_seconds > 0 else 0.0,
+            "phases": phases,
+        }
+        record.update(extra)
+        return record
+
+    def log(self, frames: Optional[int] = None, **extra: Any) -> Dict[str, Any]:
+        """打印分阶段耗时并输出结构化日志，返回汇总字典"""
+        record = self.summary(frames, **extra)
+        print(f"[{self.node_name}] 耗时统计: 共 {record['total_seconds']:.2f} 秒, {record['fps']:.1f} 帧/秒")
+        for name, seconds in record["phases"].items():
+            print(f"  {name}: {seconds:.3f} 秒")
+        logger.info(json.dumps(record, ensure_ascii=False))
+        return record
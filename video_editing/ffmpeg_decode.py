@@ -0,0 +1,243 @@
+"""
+FFmpeg 管道解码工具
+通过 ffmpeg 子进程输出 rawvideo rgb24 数据流，直接写入预分配的输出张量
+"""
+
+import shutil
+import subprocess
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+
+# 每批从管道读取并转换为 float 的帧数
+DECODE_CHUNK_FRAMES = 16
+
+
+def find_ffmpeg() -> Optional[str]:
+    """返回 ffmpeg 可执行文件路径，未安装时返回 None"""
+    return shutil.which("ffmpeg")
+
+
+def _read_exact(stream, view: memoryview) -> int:
+    """从管道读满 view，返回实际读取的字节数（EOF 时可能不足）"""
+    total = 0
+    size = len(view)
+    while total < size:
+        n = stream.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+
+def _build_decode_cmd(
+    ffmpeg_path: str,
+    video_path: str,
+    start_frame: int,
+    frame_count: int,
+    step: int,
+    source_fps: float,
+    scale: Optional[Tuple[int, int, str]] = None,
+) -> List[str]:
+    """
+    构建输出 rgb24 原始帧的 ffmpeg 命令
+
+    - 已知源帧率时把 -ss 放在 -i 之前做输入端定位：先跳到起始帧之前的关键帧，
+      再只解码关键帧到起始帧之间的少量帧，而不是从文件开头解码
+    - 跳帧交给 select 滤镜在解码器侧丢弃，被丢弃的帧不做色彩转换、也不经过管道
+    - 缩放与 rgb24 像素格式转换合并在同一个 scale 滤镜中完成，只有目标尺寸的数据进入 Python
+    """
+    cmd = [ffmpeg_path, "-v", "error", "-nostdin"]
+    filters = []
+    if start_frame > 0:
+        if source_fps and source_fps > 0:
+            # 向前偏移半帧，避免浮点误差把起始帧本身丢掉
+            seek_time = max(0.0, (start_frame - 0.5) / source_fps)
+            cmd += ["-ss", f"{seek_time:.6f}"]
+        else:
+            filters.append(f"trim=start_frame={int(start_frame)},setpts=PTS-STARTPTS")
+    cmd += ["-i", str(video_path), "-map", "0:v:0"]
+    if step > 1:
+        filters.append(f"select=not(mod(n\\,{int(step)}))")
+    if scale is not None:
+        out_w, out_h, flags = scale
+        filters.append(f"scale={int(out_w)}:{int(out_h)}:flags={flags}")
+    filters.append("format=rgb24")
+    cmd += ["-vf", ",".join(filters)]
+    cmd += [
+        "-frames:v", str(int(frame_count)),
+        "-vsync", "passthrough",
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "-",
+    ]
+    return cmd
+
+
+def decode_video_ffmpeg(
+    video_path: str,
+    width: int,
+    height: int,
+    start_frame: int,
+    end_frame: int,
+    step: int = 1,
+    source_fps: float = 0.0,
+    target_width: Optional[int] = None,
+    target_height: Optional[int] = None,
+    scale_flags: str = "area",
+    dtype: torch.dtype = torch.float32,
+    chunk_frames: int = DECODE_CHUNK_FRAMES,
+    ffmpeg_path: Optional[str] = None,
+) -> Optional[torch.Tensor]:
+    """
+    通过 ffmpeg 管道解码 [start_frame, end_frame) 范围内的帧
+
+    输出张量按探测到的帧数一次性分配 (N, H, W, 3)，精度由 dtype 指定
+    （浮点为 [0, 1]，uint8 保持 [0, 255]），
+    原始 uint8 数据以 chunk_frames 为单位批量读入并向量化转换，
+    避免逐帧 list + np.stack 带来的双倍内存峰值。
+    目标尺寸与源尺寸不同时由 ffmpeg 的 scale 滤镜（scale_flags 指定算法）在解码侧缩放。
+
+    Returns:
+        解码得到的张量；ffmpeg 不可用或未读到任何帧时返回 None
+    """
+    ffmpeg_path = ffmpeg_path or find_ffmpeg()
+    if ffmpeg_path is None:
+        return None
+
+    step = max(1, int(step))
+    expected = len(range(int(start_frame), int(end_frame), step))
+    if expected <= 0 or width <= 0 or height <= 0:
+        return None
+
+    out_w = int(target_width or width)
+    out_h = int(target_height or height)
+    scale = (out_w, out_h, scale_flags) if (out_w, out_h) != (width, height) else None
+
+    chunk_frames = max(1, min(int(chunk_frames), expected))
+    frame_bytes = out_w * out_h * 3
+
+    # 预分配输出张量与复用的 uint8 读取缓冲
+    images = torch.empty((expected, out_h, out_w, 3), dtype=dtype)
+    chunk = np.empty((chunk_frames, out_h, out_w, 3), dtype=np.uint8)
+    chunk_view = memoryview(chunk).cast("B")
+
+    cmd = _build_decode_cmd(ffmpeg_path, video_path, start_frame, expected, step, source_fps, scale)
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        bufsize=frame_bytes * 2,
+    )
+
+    written = 0
+    try:
+        slot = 0
+        while written + slot < expected:
+            offset = slot * frame_bytes
+            n = _read_exact(proc.stdout, chunk_view[offset:offset + frame_bytes])
+            if n < frame_bytes:
+                break
+            slot += 1
+
+            if slot == chunk_frames:
+                _flush_chunk(images, written, chunk, slot)
+                written += slot
+                slot = 0
+
+        if slot > 0:
+            _flush_chunk(images, written, chunk, slot)
+            written += slot
+    finally:
+        if proc.stdout:
+            proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+    if written == 0:
+        return None
+    if written < expected:
+        # 探测帧数偏大时截断，释放多余的预分配空间
+        images = images[:written].clone()
+    return images
+
+
+def _flush_chunk(images, offset, chunk, count):
+    """将一批 uint8 帧写入输出张量，浮点输出就地归一化到 [0, 1]"""
+    target = images[offset:offset + count]
+    target.copy_(torch.from_numpy(chunk[:count]))
+    if target.dtype != torch.uint8:
+        target.div_(255.0)
+
+
+def decode_audio_ffmpeg(
+    media_path: str,
+    start_time: float,
+    duration: float,
+    sample_rate: int = 44100,
+    channels: int = 2,
+    ffmpeg_path: Optional[str] = None,
+) -> Optional[torch.Tensor]:
+    """
+    通过 ffmpeg 管道提取音频，直接读取 stdout 上的 f32le PCM
+
+    -ss/-t 放在 -i 之前做输入端定位，长文件中截取几秒时无需从头解码。
+
+    Returns:
+        (1, channels, samples) float32 张量；ffmpeg 不可用或提取失败时返回 None
+    """
+    ffmpeg_path = ffmpeg_path or find_ffmpeg()
+    if ffmpeg_path is None:
+        return None
+
+    cmd = [ffmpeg_path, "-v", "error", "-nostdin"]
+    if start_time > 0:
+        cmd += ["-ss", f"{start_time:.6f}"]
+    if duration and duration > 0:
+        cmd += ["-t", f"{duration:.6f}"]
+    cmd += [
+        "-i", str(media_path),
+        "-map", "0:a:0",
+        "-vn",
+        "-f", "f32le",
+        "-acodec", "pcm_f32le",
+        "-ar", str(int(sample_rate)),
+        "-ac", str(int(channels)),
+        "-",
+    ]
+
+    frame_bytes = 4 * channels
+    if duration and duration > 0:
+        # 按时长预分配（多留一点余量），避免 bytes 拼接和二次拷贝
+        capacity = int(round(duration * sample_rate)) + sample_rate // 10 + 1
+    else:
+        capacity = sample_rate * 60
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    samples = np.empty((capacity, channels), dtype=np.float32)
+    filled = 0
+    try:
+        while True:
+            if filled == samples.shape[0]:
+                # 时长未知或探测偏短时按倍数扩容
+                grown = np.empty((samples.shape[0] * 2, channels), dtype=np.float32)
+                grown[:filled] = samples[:filled]
+                samples = grown
+            view = memoryview(samples[filled:]).cast("B")
+            n = _read_exact(proc.stdout, view)
+            filled += n // frame_bytes
+            if n < len(view):
+                break
+    finally:
+        if proc.stdout:
+            proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        returncode = proc.wait()
+
+    if returncode != 0 and filled == 0:
+        return None
+    # (samples, channels) -> (1, channels, samples)
+    return torch.from_numpy(np.ascontiguousarray(samples[:filled].T)).unsqueeze(0)
@@ -0,0 +1,264 @@
+"""
+FFmpeg 管道编码工具
+把 IMAGE 帧按块量化为 rgb24 原始数据，通过 stdin 送入 ffmpeg 编码；
+音频以 f32le PCM 经第二条管道送入同一个 ffmpeg 进程
+"""
+
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from .encode_stats import timed_iter
+from .frame_utils import iter_uint8_chunks, prefetch
+
+
+class AudioInput:
+    """
+    送入 ffmpeg 的 f32le PCM 音频输入
+
+    POSIX 系统上通过额外的管道 fd（pipe:N）传输，不落盘；
+    其他平台（Windows 不支持 pass_fds）回退为临时的原始 PCM 文件。
+    每个实例只能供一次 ffmpeg 调用使用，建议配合 with 语句。
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        """
+        Args:
+            samples: (samples, channels) float32 交错 PCM
+            sample_rate: 采样率
+        """
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sample_rate = int(sample_rate)
+        self._read_fd: Optional[int] = None
+        self._write_fd: Optional[int] = None
+        self._temp_path: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+        if os.name == "posix":
+            self._read_fd, self._write_fd = os.pipe()
+            source = f"pipe:{self._read_fd}"
+        else:
+            fd, self._temp_path = tempfile.mkstemp(prefix="haigc_audio_", suffix=".f32le")
+            with os.fdopen(fd, "wb") as f:
+                f.write(memoryview(self.samples).cast("B"))
+            source = self._temp_path
+        self.input_args = [
+            "-f", "f32le",
+            "-ar", str(self.sample_rate),
+            "-ac", str(self.samples.shape[1]),
+            "-i", source,
+        ]
+
+    @property
+    def pass_fds(self) -> tuple:
+        """需要传给 ffmpeg 子进程的 fd"""
+        return (self._read_fd,) if self._read_fd is not None else ()
+
+    def started(self):
+        """ffmpeg 进程启动后调用：关闭本进程持有的读端，并在后台线程写入 PCM"""
+        if self._read_fd is None:
+            return
+        os.close(self._read_fd)
+        self._read_fd = None
+        self._thread = threading.Thread(target=self._feed, name="haigc_audio_pipe", daemon=True)
+        self._thread.start()
+
+    def _feed(self):
+        write_fd, self._write_fd = self._write_fd, None
+        try:
+            with os.fdopen(write_fd, "wb") as f:
+                f.write(memoryview(self.samples).cast("B"))
+        except OSError:
+            # ffmpeg 提前退出（BrokenPipe），错误由调用方根据退出码处理
+            pass
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for fd in (self._read_fd, self._write_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._read_fd = self._write_fd = None
+        if self._temp_path:
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 编码吞吐档位：在编码速度与体积之间取舍，按编码器映射为对应的速度参数
+# x264 / x265 只使用 -preset（“实时”即 ultrafast，与拼接节点原先的固定参数一致）；
+# VP9 使用 -deadline / -cpu-used，并开启行级多线程与分块列
+ENCODER_PROFILES = {
+    "实时": {
+        "x264_preset": "ultrafast",
+        "x265_preset": "ultrafast",
+        "vp9_deadline": "realtime",
+        "vp9_cpu_used": 8,
+        "vp9_tile_columns": 2,
+    },
+    "均衡": {
+        "x264_preset": "medium",
+        "x265_preset": "medium",
+        "vp9_deadline": "good",
+        "vp9_cpu_used": 2,
+        "vp9_tile_columns": 2,
+    },
+    "归档": {
+        "x264_preset": "slow",
+        "x265_preset": "slow",
+        "vp9_deadline": "good",
+        "vp9_cpu_used": 1,
+        "vp9_tile_columns": 1,
+    },
+}
+DEFAULT_ENCODER_PROFILE = "均衡"
+
+
+def encoder_profile_args(codec: Optional[str], profile: str, threads: int = 0) -> List[str]:
+    """
+    生成编码档位对应的编码器参数（需放在 -c:v 之后）
+
+    Args:
+        codec: ffmpeg 编码器名称，非 x264 / x265 / VP9 时只设置线程数
+        profile: ENCODER_PROFILES 中的档位名称
+        threads: 编码线程数，0 表示由编码器自动决定
+    """
+    config = ENCODER_PROFILES.get(profile, ENCODER_PROFILES[DEFAULT_ENCODER_PROFILE])
+    args: List[str] = []
+    if codec in ("libx264", "libx265"):
+        args += ["-preset", config["x264_preset" if codec == "libx264" else "x265_preset"]]
+    elif codec == "libvpx-vp9":
+        args += [
+            "-deadline", config["vp9_deadline"],
+            "-cpu-used", str(config["vp9_cpu_used"]),
+            "-row-mt", "1",
+            "-tile-columns", str(config["vp9_tile_columns"]),
+        ]
+    if threads and threads > 0:
+        args += ["-threads", str(int(threads))]
+    return args
+
+
+def rawvideo_input_args(width: int, height: int, fps: float) -> List[str]:
+    """stdin 上 rgb24 原始帧输入的 ffmpeg 参数（需放在其余 -i 之前，作为第 0 路输入）"""
+    return [
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "-s", f"{int(width)}x{int(height)}",
+        "-r", str(fps),
+        "-i", "-",
+    ]
+
+
+def pipe_frames_to_ffmpeg(
+    cmd: List[str],
+    frames,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    error_label: str = "ffmpeg 编码失败",
+    audio_input: Optional[AudioInput] = None,
+    on_phase: Optional[Callable[[str, float], None]] = None,
+):
+    """
+    运行 cmd 并把 frames 写入其 stdin
+
+    帧转换在后台线程按块进行，当前线程只负责整块写入管道；
+    stderr 写入临时文件，避免管道写满后与 stdin 写入互相阻塞。
+
+    Args:
+        cmd: 完整的 ffmpeg 命令，第 0 路输入应为 rawvideo_input_args 生成的 stdin 输入
+        frames: (N, H, W, C) 帧张量（或 LazyVideo）
+        on_progress: on_progress(已写入帧数, 总帧数)，每写入一块调用一次
+        error_label: 失败时异常信息的前缀
+        audio_input: 命令中使用的音频输入（其 input_args 需已加入 cmd）
+        on_phase: on_phase(阶段名, 秒数)，上报“帧转换”“管道写入”“编码收尾”三个阶段的耗时
+
+    Raises:
+        RuntimeError: ffmpeg 返回非零退出码
+    """
+    total = frames.shape[0]
+    chunks = iter_uint8_chunks(frames)
+    if on_phase is not None:
+        chunks = timed_iter(chunks, lambda seconds: on_phase("帧转换", seconds))
+    write_seconds = 0.0
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stderr=stderr_file,
+            pass_fds=audio_input.pass_fds if audio_input else (),
+        )
+        if audio_input is not None:
+            audio_input.started()
+        try:
+            written = 0
+            for chunk in prefetch(chunks):
+                started = time.perf_counter()
+                proc.stdin.write(chunk.data)
+                write_seconds += time.perf_counter() - started
+                written += chunk.shape[0]
+                if on_progress is not None:
+                    on_progress(written, total)
+        except BrokenPipeError:
+            # ffmpeg 提前退出，错误信息在下面统一读取
+            pass
+        finally:
+            started = time.perf_counter()
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            returncode = proc.wait()
+            if audio_input is not None:
+                audio_input.close()
+            if on_phase is not None:
+                # 管道写入阻塞的时间主要取决于编码器吞吐；关闭 stdin 后等待编码器刷新剩余帧并封装
+                on_phase("管道写入", write_seconds)
+                on_phase("编码收尾", time.perf_counter() - started)
+
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors="ignore")
+            raise RuntimeError(f"{error_label}: {stderr or '未知错误'}")
+
+
+def run_ffmpeg(cmd: List[str], audio_input: Optional[AudioInput] = None, error_label: str = "ffmpeg 执行失败"):
+    """
+    运行不需要 stdin 帧输入的 ffmpeg 命令（可带管道音频输入）
+
+    Raises:
+        RuntimeError: ffmpeg 返回非零退出码
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        pass_fds=audio_input.pass_fds if audio_input else (),
+    )
+    if audio_input is not None:
+        audio_input.started()
+    try:
+        _, stderr = proc.communicate()
+    finally:
+        if audio_input is not None:
+            audio_input.close()
+    if proc.returncode != 0:
+        stderr = stderr.decode(errors="ignore")
+        raise RuntimeError(f"{error_label}: {stderr or '未知错误'}")
@@ -0,0 +1,184 @@
+"""
+解码帧磁盘缓存
+把解码后的帧按输出精度（uint8 / float16 / float32）以 .npy 文件保存在缓存目录中，
+命中时通过内存映射直接返回，无需重新解码，也不做精度转换拷贝。
+缓存键为 (源文件路径, 文件大小, 修改时间, 起始帧, 结束帧, 跳帧, 目标尺寸, 缩放算法, 精度)，
+按总字节预算做 LRU 淘汰（以文件修改时间作为最近使用时间）。
+"""
+
+import hashlib
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "haigc_toolkit", "frames")
+CACHE_EXTENSION = ".npy"
+WRITE_CHUNK_FRAMES = 32
+
+_cache_lock = threading.Lock()
+
+
+def _numpy_dtype(dtype: torch.dtype) -> np.dtype:
+    """torch 精度对应的 numpy 精度"""
+    return torch.empty(0, dtype=dtype).numpy().dtype
+
+
+def resolve_cache_dir(cache_dir: Optional[str]) -> str:
+    """返回实际使用的缓存目录（空字符串表示默认目录）"""
+    cache_dir = (cache_dir or "").strip()
+    return os.path.abspath(os.path.expanduser(cache_dir)) if cache_dir else DEFAULT_CACHE_DIR
+
+
+def make_cache_key(
+    video_path: str,
+    start_frame: int,
+    end_frame: int,
+    step: int,
+    width: int,
+    height: int,
+    variant: str = "",
+    dtype: torch.dtype = torch.uint8,
+    engine: str = "",
+) -> Optional[str]:
+    """
+    根据源文件状态与加载参数生成缓存键；源文件不存在时返回 None
+
+    engine 为实际使用的解码引擎：不同引擎的缩放与色彩转换不同，解码结果不能互相复用
+    """
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return None
+    raw = "|".join(str(v) for v in (
+        os.path.abspath(video_path),
+        stat.st_size,
+        stat.st_mtime_ns,
+        int(start_frame),
+        int(end_frame),
+        int(step),
+        int(width),
+        int(height),
+        variant,
+        str(dtype),
+        engine,
+    ))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _entry_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key + CACHE_EXTENSION)
+
+
+def load_cached_frames(
+    cache_dir: str,
+    key: str,
+    width: int,
+    height: int,
+    dtype: torch.dtype = torch.uint8,
+) -> Optional[torch.Tensor]:
+    """
+    读取缓存帧
+
+    Returns:
+        由 np.memmap 支撑的 (N, H, W, 3) dtype 张量；未命中或文件损坏时返回 None
+    """
+    path = _entry_path(cache_dir, key)
+    if not os.path.isfile(path):
+        return None
+    try:
+        # copy-on-write 映射：张量可写，但修改不会回写到缓存文件
+        frames = np.load(path, mmap_mode="c")
+    except (OSError, ValueError) as e:
+        print(f"[帧缓存] 警告：缓存文件损坏，已忽略: {e}")
+        _remove_quietly(path)
+        return None
+    if (
+        frames.dtype != _numpy_dtype(dtype)
+        or frames.ndim != 4
+        or frames.shape[0] == 0
+        or frames.shape[1:] != (height, width, 3)
+    ):
+        _remove_quietly(path)
+        return None
+    try:
+        # 更新修改时间，作为 LRU 的最近使用时间
+        os.utime(path, None)
+    except OSError:
+        pass
+    return torch.from_numpy(frames)
+
+
+def store_frames(cache_dir: str, key: str, images: torch.Tensor, max_bytes: int) -> bool:
+    """
+    按帧自身的精度写入缓存（读取时可直接映射返回），并按字节预算淘汰最久未使用的条目
+
+    Returns:
+        是否写入成功
+    """
+    frame_count, height, width, channels = images.shape
+    entry_bytes = images.numel() * images.element_size()
+    if max_bytes <= 0 or entry_bytes > max_bytes:
+        return False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(cache_dir, key)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        mapped = np.lib.format.open_memmap(
+            temp_path, mode="w+", dtype=_numpy_dtype(images.dtype), shape=(frame_count, height, width, channels)
+        )
+        for i in range(0, frame_count, WRITE_CHUNK_FRAMES):
+            mapped[i:i + WRITE_CHUNK_FRAMES] = images[i:i + WRITE_CHUNK_FRAMES].detach().cpu().numpy()
+        mapped.flush()
+        del mapped
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"[帧缓存] 警告：写入缓存失败: {e}")
+        _remove_quietly(temp_path)
+        return False
+
+    evict_to_budget(cache_dir, max_bytes, keep=path)
+    return True
+
+
+def _list_entries(cache_dir: str) -> List[Tuple[float, int, str]]:
+    entries = []
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return entries
+    for name in names:
+        if not name.endswith(CACHE_EXTENSION):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def evict_to_budget(cache_dir: str, max_bytes: int, keep: Optional[str] = None):
+    """删除最久未使用的缓存文件，直到总大小不超过 max_bytes"""
+    with _cache_lock:
+        entries = sorted(_list_entries(cache_dir))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            if path == keep:
+                continue
+            if _remove_quietly(path):
+                total -= size
+
+
+def _remove_quietly(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,154 @@
+"""
+帧张量转换工具
+视频加载器可输出 float32 / float16 / uint8 三种精度的帧序列：
+- 浮点帧取值范围为 [0, 1]
+- uint8 帧取值范围为 [0, 255]，需要浮点运算时再按块转换
+本模块的函数让各节点在不同精度之间转换时不产生整段视频的临时副本
+"""
+
+import queue
+import threading
+
+import numpy as np
+import torch
+
+# 每批转换的帧数
+CONVERT_CHUNK_FRAMES = 32
+# 后台预取队列中最多积压的块数
+PREFETCH_CHUNKS = 2
+
+# 加载器“输出精度”选项 -> torch dtype
+OUTPUT_DTYPES = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "uint8": torch.uint8,
+}
+
+
+def uint8_to_float_frames(
+    frames: torch.Tensor,
+    dtype: torch.dtype = torch.float32,
+    chunk_frames: int = CONVERT_CHUNK_FRAMES,
+) -> torch.Tensor:
+    """把 (N, H, W, C) uint8 帧按块转换为 [0, 1] 范围的浮点张量"""
+    result = torch.empty(frames.shape, dtype=dtype)
+    for i in range(0, frames.shape[0], chunk_frames):
+        target = result[i:i + chunk_frames]
+        target.copy_(frames[i:i + chunk_frames])
+        target.div_(255.0)
+    return result
+
+
+def convert_uint8_frames(frames: torch.Tensor, dtype: torch.dtype) -> torch.Tensor:
+    """把 uint8 帧转换为目标精度；目标为 uint8 时原样返回（不拷贝）"""
+    if dtype == torch.uint8:
+        return frames
+    return uint8_to_float_frames(frames, dtype)
+
+
+def frames_to_uint8(frames: torch.Tensor) -> torch.Tensor:
+    """把一批帧量化为 CPU 上的 uint8（uint8 输入直接返回，浮点输入按 [0, 1] 量化）"""
+    frames = frames.detach()
+    if frames.dtype == torch.uint8:
+        return frames.cpu()
+    return frames.to("cpu", torch.float32).mul(255.0).round_().clamp_(0, 255).to(torch.uint8)
+
+
+def iter_uint8_chunks(frames, chunk_frames: int = CONVERT_CHUNK_FRAMES, bgr: bool = False):
+    """
+    按块把 (N, H, W, C) 帧量化为内存连续的 uint8 numpy 数组
+
+    每块只做一次批量的 mul / round / clamp / 类型转换；bgr=True 时通过反向视图交换通道顺序，
+    与连续化合并为一次拷贝（供 OpenCV 写入）
+    """
+    for i in range(0, frames.shape[0], chunk_frames):
+        chunk = frames_to_uint8(frames[i:i + chunk_frames]).numpy()
+        if bgr:
+            chunk = chunk[..., ::-1]
+        yield np.ascontiguousarray(chunk)
+
+
+_PREFETCH_END = object()
+
+
+def prefetch(iterable, max_pending: int = PREFETCH_CHUNKS):
+    """
+    在后台线程中迭代 iterable，结果经有界队列交给调用方
+
+    用于让帧转换（生产者）与编码写入（消费者）并行执行；生产者抛出的异常在消费端重新抛出，
+    消费端提前结束时生产者随之停止
+    """
+    pending = queue.Queue(maxsize=max(1, int(max_pending)))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((None, item)):
+                    return
+        except BaseException as e:
+            put((e, None))
+            return
+        put((None, _PREFETCH_END))
+
+    worker = threading.Thread(target=produce, name="haigc_frame_prefetch", daemon=True)
+    worker.start()
+    try:
+        while True:
+            error, item = pending.get()
+            if error is not None:
+                raise error
+            if item is _PREFETCH_END:
+                return
+            yield item
+    finally:
+        stop.set()
+        worker.join()
+
+
+def to_unit_float(frames: torch.Tensor, dtype: torch.dtype = torch.float32) -> torch.Tensor:
+    """转换为 [0, 1] 范围的浮点张量（浮点输入仅在精度不同时转换）"""
+    if frames.dtype == torch.uint8:
+        return frames.to(dtype).div_(255.0)
+    return frames.to(dtype)
+
+
+def from_unit_float(frames: torch.Tensor, dtype: torch.dtype) -> torch.Tensor:
+    """把 [0, 1] 浮点结果转换回指定精度（uint8 时量化）"""
+    if dtype == torch.uint8:
+        return frames.mul(255.0).round_().clamp_(0, 255).to(torch.uint8)
+    return frames.to(dtype)
+
+
+def common_frame_dtype(*videos: torch.Tensor) -> torch.dtype:
+    """多段视频混合时的公共精度：全部为 uint8 时保持 uint8，否则取其中最高的浮点精度"""
+    float_dtypes = [v.dtype for v in videos if v.dtype != torch.uint8]
+    if not float_dtypes:
+        return torch.uint8
+    return torch.float32 if torch.float32 in float_dtypes else float_dtypes[0]
+
+
+def match_frame_dtype(frames: torch.Tensor, dtype: torch.dtype) -> torch.Tensor:
+    """把帧转换到指定精度，同时正确处理 uint8 与浮点之间的取值范围"""
+    if frames.dtype == dtype:
+        return frames
+    if dtype == torch.uint8:
+        return from_unit_float(frames.float(), dtype)
+    return to_unit_float(frames, dtype)
+
+
+def is_blank_frame(frame: torch.Tensor, tolerance: float = 0.01) -> bool:
+    """判断单帧是否全黑（兼容 uint8 与浮点帧）"""
+    peak = float(frame.detach().max()) if frame.numel() > 0 else 0.0
+    if frame.dtype == torch.uint8:
+        peak /= 255.0
+    return peak <= tolerance
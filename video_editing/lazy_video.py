@@ -0,0 +1,224 @@
+"""
+延迟解码视频序列
+LazyVideo 只记录源文件与帧范围，实现张量的切片协议（__len__ / __getitem__ / shape），
+被索引时才解码对应的帧，最近使用的帧块保存在 LRU 中。
+裁剪、取尾帧、分镜等只取部分帧的节点因此只需解码实际用到的帧。
+容器记录的帧数可能偏大：读到结尾时实际帧数不足，长度收缩为实际解码到的帧数；
+中间的帧块解码失败或帧数不足时抛出 RuntimeError，不会返回（或缓存）不完整的帧块。
+"""
+
+import operator
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import torch
+
+LAZY_VIDEO_TYPE = "HAIGC_LAZYVIDEO"
+
+
+class LazyVideo:
+    """延迟解码的帧序列，形状语义与 IMAGE 张量 (N, H, W, C) 一致"""
+
+    # 每个缓存块包含的输出帧数，以及 LRU 中最多保留的块数
+    CHUNK_FRAMES = 32
+    CACHE_CHUNKS = 8
+
+    def __init__(
+        self,
+        source_path: str,
+        start_frame: int,
+        end_frame: int,
+        step: int,
+        width: int,
+        height: int,
+        fps: float,
+        decode_fn: Callable[[int, int], Optional[torch.Tensor]],
+        dtype: torch.dtype = torch.float32,
+    ):
+        """
+        Args:
+            source_path: 源视频路径
+            start_frame / end_frame / step: 源视频中的帧范围 [start_frame, end_frame) 与跳帧
+            width / height: 输出帧尺寸
+            fps: 输出帧率
+            decode_fn: decode_fn(源起始帧, 源结束帧) -> 按 step 解码得到的帧张量（失败返回 None）
+            dtype: 输出帧精度
+        """
+        self.source_path = source_path
+        self.start_frame = int(start_frame)
+        self.end_frame = int(end_frame)
+        self.step = max(1, int(step))
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = float(fps)
+        self.dtype = dtype
+        self._decode_fn = decode_fn
+        self._length = len(range(self.start_frame, self.end_frame, self.step))
+        self._chunks: "OrderedDict[int, torch.Tensor]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ---- 张量协议 ----
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def shape(self) -> torch.Size:
+        return torch.Size((self._length, self.height, self.width, 3))
+
+    @property
+    def device(self) -> torch.device:
+        return torch.device("cpu")
+
+    def dim(self) -> int:
+        return 4
+
+    def numel(self) -> int:
+        return self._length * self.height * self.width * 3
+
+    def size(self, dim: Optional[int] = None):
+        return self.shape if dim is None else self.shape[dim]
+
+    def __getitem__(self, index):
+        """按帧维度索引时只解码所需的帧，其余维度的索引交给解码后的张量处理"""
+        rest = ()
+        if isinstance(index, tuple):
+            index, rest = index[0], index[1:]
+
+        if isinstance(index, slice):
+            frames = self._resolve(lambda length: self._get_slice(index, length))
+            return frames[(slice(None),) + rest] if rest else frames
+
+        try:
+            # 支持 numpy 整数与 0 维整数张量等整数类型
+            index = operator.index(index)
+        except TypeError:
+            raise TypeError(f"LazyVideo 不支持的索引类型: {type(index).__name__}") from None
+        frame = self._resolve(lambda length: self._get_frame(index, length))
+        return frame[rest] if rest else frame
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyVideo({self.source_path!r}, frames={self.start_frame}-{self.end_frame}, "
+            f"step={self.step}, shape={tuple(self.shape)})"
+        )
+
+    # ---- 延迟视频专用接口 ----
+
+    def materialize(self) -> torch.Tensor:
+        """解码全部帧并返回张量"""
+        return self._get_range(0, self._length)
+
+    def subrange(self, start: int, stop: int) -> "LazyVideo":
+        """返回输出帧 [start, stop) 对应的新 LazyVideo（不解码）"""
+        start, stop, _ = slice(start, stop).indices(self._length)
+        stop = max(start, stop)
+        return LazyVideo(
+            self.source_path,
+            self.start_frame + start * self.step,
+            self.start_frame + stop * self.step,
+            self.step,
+            self.width,
+            self.height,
+            self.fps,
+            self._decode_fn,
+            self.dtype,
+        )
+
+    # ---- 内部实现 ----
+
+    def _empty(self) -> torch.Tensor:
+        return torch.zeros((0, self.height, self.width, 3), dtype=self.dtype)
+
+    def _resolve(self, fetch: Callable[[int], torch.Tensor]) -> torch.Tensor:
+        """按当前长度解析索引并取帧；取帧过程中长度因尾部帧数不足而收缩时，按新长度重新解析"""
+        while True:
+            length = self._length
+            frames = fetch(length)
+            if self._length == length:
+                return frames
+
+    def _get_slice(self, index: slice, length: int) -> torch.Tensor:
+        start, stop, stride = index.indices(length)
+        if stride == 1:
+            return self._get_range(start, stop)
+        return self._gather(range(start, stop, stride))
+
+    def _get_frame(self, index: int, length: int) -> torch.Tensor:
+        position = index + length if index < 0 else index
+        if not 0 <= position < length:
+            raise IndexError(f"帧索引 {index} 超出范围（共 {length} 帧）")
+        frames = self._get_range(position, position + 1)
+        # 长度已收缩、该帧不存在时返回空批次，由 _resolve 按新长度重新解析
+        return frames[0] if frames.shape[0] else frames
+
+    def _decode(self, start: int, stop: int) -> torch.Tensor:
+        """
+        直接解码输出帧 [start, stop)
+
+        范围到达结尾而实际帧数不足时（容器记录的帧数偏大），长度收缩为实际解码到的帧数，
+        返回解码到的帧
+
+        Raises:
+            RuntimeError: 解码失败，或未到结尾的范围帧数不足（否则下游会静默得到比 len() 更短的批次）
+        """
+        if stop <= start:
+            return self._empty()
+        source_start = self.start_frame + start * self.step
+        source_end = min(self.end_frame, self.start_frame + stop * self.step)
+        frames = self._decode_fn(source_start, source_end)
+        decoded = 0 if frames is None else frames.shape[0]
+        if decoded < stop - start:
+            if frames is None or stop < self._length:
+                raise RuntimeError(
+                    f"[延迟视频] 解码 {self.source_path} 第 {source_start}-{source_end} 帧失败："
+                    f"需要 {stop - start} 帧，实际得到 {decoded} 帧"
+                )
+            with self._lock:
+                self._length = min(self._length, start + decoded)
+            print(f"[延迟视频] {self.source_path} 实际帧数少于预估，长度收缩为 {self._length} 帧")
+        return frames[:stop - start]
+
+    def _chunk(self, chunk_index: int) -> torch.Tensor:
+        with self._lock:
+            chunk = self._chunks.get(chunk_index)
+            if chunk is not None:
+                self._chunks.move_to_end(chunk_index)
+                return chunk
+        start = chunk_index * self.CHUNK_FRAMES
+        chunk = self._decode(start, min(self._length, start + self.CHUNK_FRAMES))
+        with self._lock:
+            self._chunks[chunk_index] = chunk
+            self._chunks.move_to_end(chunk_index)
+            while len(self._chunks) > self.CACHE_CHUNKS:
+                self._chunks.popitem(last=False)
+        return chunk
+
+    def _get_range(self, start: int, stop: int) -> torch.Tensor:
+        """返回输出帧 [start, stop)；结果是独立张量，修改它不会影响缓存"""
+        if stop <= start:
+            return self._empty()
+        first = start // self.CHUNK_FRAMES
+        last = (stop - 1) // self.CHUNK_FRAMES
+        if last - first + 1 > self.CACHE_CHUNKS:
+            # 大范围读取直接解码，不污染缓存
+            return self._decode(start, stop)
+        parts = [self._chunk(c) for c in range(first, last + 1)]
+        joined = parts[0] if len(parts) == 1 else torch.cat(parts, dim=0)
+        offset = first * self.CHUNK_FRAMES
+        return joined[start - offset:stop - offset].clone()
+
+    def _gather(self, positions) -> torch.Tensor:
+        frames = [self._get_range(p, p + 1) for p in positions]
+        frames = [f for f in frames if f.shape[0] > 0]
+        return torch.cat(frames, dim=0) if frames else self._empty()
+
+
+def resolve_frames(images, lazy_video: Optional[LazyVideo], node_name: str):
+    """优先使用延迟视频输入，否则使用 IMAGE 输入；两者都未连接时报错"""
+    if lazy_video is not None:
+        return lazy_video
+    if images is None:
+        raise ValueError(f"[{node_name}] 请连接 images 或 延迟视频 输入")
+    return images
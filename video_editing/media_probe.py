@@ -0,0 +1,226 @@
+"""
+媒体探测工具
+每个文件只运行一次 ffprobe（-show_streams -show_format -of json），
+解析结果按 (路径, 文件大小, 修改时间) 缓存在有界 LRU 中，供各视频节点共享
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# 缓存的最大文件数
+PROBE_CACHE_SIZE = 128
+PROBE_TIMEOUT = 10
+
+_probe_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_probe_lock = threading.Lock()
+# 正在探测中的文件：多个线程同时探测同一文件时只启动一次 ffprobe
+_inflight_locks: Dict[tuple, threading.Lock] = {}
+
+
+def find_ffprobe() -> Optional[str]:
+    """返回 ffprobe 可执行文件路径，未安装时返回 None"""
+    return shutil.which("ffprobe")
+
+
+def _cache_key(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def probe_media(path) -> Optional[Dict[str, Any]]:
+    """
+    探测媒体文件
+
+    Returns:
+        {"streams": [...], "format": {...}}；文件不存在、未安装 ffprobe 或探测失败时返回 None
+    """
+    path = str(path)
+    key = _cache_key(path)
+    if key is None:
+        return None
+
+    with _probe_lock:
+        cached = _probe_cache.get(key)
+        if cached is not None:
+            _probe_cache.move_to_end(key)
+            return cached
+        key_lock = _inflight_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _probe_lock:
+            cached = _probe_cache.get(key)
+        if cached is not None:
+            return cached
+        info = _run_ffprobe(path)
+        with _probe_lock:
+            if info is not None:
+                _probe_cache[key] = info
+                _probe_cache.move_to_end(key)
+                while len(_probe_cache) > PROBE_CACHE_SIZE:
+                    _probe_cache.popitem(last=False)
+            _inflight_locks.pop(key, None)
+    return info
+
+
+def _run_ffprobe(path: str) -> Optional[Dict[str, Any]]:
+    """运行 ffprobe 并解析 JSON 输出"""
+    ffprobe_path = find_ffprobe()
+    if ffprobe_path is None:
+        return None
+
+    cmd = [
+        ffprobe_path,
+        "-v", "error",
+        "-show_streams",
+        "-show_format",
+        "-of", "json",
+        path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+    except (subprocess.TimeoutExpired, OSError) as e:
+        print(f"[媒体探测] 警告：ffprobe 调用失败: {e}")
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        info = json.loads(result.stdout or "{}")
+    except json.JSONDecodeError:
+        return None
+    info.setdefault("streams", [])
+    info.setdefault("format", {})
+    return info
+
+
+def clear_probe_cache():
+    """清空探测缓存"""
+    with _probe_lock:
+        _probe_cache.clear()
+
+
+def get_stream(path, codec_type: str, index: int = 0) -> Optional[Dict[str, Any]]:
+    """获取指定类型的第 index 条流（codec_type: "video" / "audio"）"""
+    info = probe_media(path)
+    if not info:
+        return None
+    streams = [s for s in info["streams"] if s.get("codec_type") == codec_type]
+    if index < len(streams):
+        return streams[index]
+    return None
+
+
+def get_format(path) -> Dict[str, Any]:
+    """获取容器层信息，探测失败时返回空字典"""
+    info = probe_media(path)
+    return info["format"] if info else {}
+
+
+def has_audio_stream(path) -> bool:
+    """文件是否包含音频轨道"""
+    return get_stream(path, "audio") is not None
+
+
+def get_stream_bitrate_kbps(path, codec_type: str) -> int:
+    """获取第一条 video/audio 流的比特率（Kbps），未知时返回 0"""
+    stream = get_stream(path, codec_type)
+    if not stream:
+        return 0
+    try:
+        return int(stream.get("bit_rate")) // 1000
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_frame_rate(rate: Optional[str]) -> float:
+    """把 ffprobe 的 "30000/1001" 形式帧率转换为浮点数"""
+    if not rate:
+        return 0.0
+    try:
+        if "/" in rate:
+            num, den = rate.split("/", 1)
+            den_value = float(den)
+            return float(num) / den_value if den_value else 0.0
+        return float(rate)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def get_video_stream_info(path) -> Dict[str, Any]:
+    """
+    汇总第一条视频流的常用信息
+
+    Returns:
+        {"width", "height", "fps", "frame_count", "duration", "codec_name"}，探测失败时返回空字典
+    """
+    stream = get_stream(path, "video")
+    if not stream:
+        return {}
+    fps = parse_frame_rate(stream.get("avg_frame_rate")) or parse_frame_rate(stream.get("r_frame_rate"))
+    try:
+        duration = float(stream.get("duration") or get_format(path).get("duration") or 0.0)
+    except (TypeError, ValueError):
+        duration = 0.0
+    try:
+        frame_count = int(stream.get("nb_frames") or 0)
+    except (TypeError, ValueError):
+        frame_count = 0
+    if frame_count <= 0 and fps > 0 and duration > 0:
+        frame_count = int(round(duration * fps))
+    return {
+        "width": int(stream.get("width") or 0),
+        "height": int(stream.get("height") or 0),
+        "fps": fps,
+        "frame_count": frame_count,
+        "duration": duration,
+        "codec_name": stream.get("codec_name", ""),
+    }
+
+
+def is_keyframe_at(path, time_seconds: float, tolerance: float) -> bool:
+    """
+    第一条视频流在 time_seconds（相对流起点）附近 tolerance 秒内是否有关键帧
+
+    只读取目标时间点附近的数据包，不会扫描整个文件
+    """
+    ffprobe_path = find_ffprobe()
+    stream = get_stream(path, "video")
+    if ffprobe_path is None or stream is None:
+        return False
+    try:
+        stream_start = float(stream.get("start_time") or 0.0)
+    except (TypeError, ValueError):
+        stream_start = 0.0
+    target = stream_start + max(0.0, time_seconds)
+    interval = f"{max(0.0, target - 1.0):.6f}%{target + tolerance:.6f}"
+    cmd = [
+        ffprobe_path,
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-read_intervals", interval,
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        str(path),
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+    except (subprocess.TimeoutExpired, OSError):
+        return False
+    if result.returncode != 0:
+        return False
+    for line in result.stdout.splitlines():
+        pts_text, _, flags = line.partition(",")
+        try:
+            pts = float(pts_text)
+        except ValueError:
+            continue
+        if "K" in flags and abs(pts - target) <= tolerance:
+            return True
+    return False
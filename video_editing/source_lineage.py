@@ -0,0 +1,83 @@
+"""
+帧来源追踪
+视频加载器与裁剪节点在输出的帧张量上记录来源（源文件 + 连续帧范围），
+保存节点据此判断帧是否为未经修改的源帧，从而直接复制源视频流而不重新编码。
+
+记录以属性形式挂在张量对象上，并附带张量的版本号与数据指针：
+任何就地修改都会改变版本号，生成新张量的处理则不会带上来源信息，因此不会误判。
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+import torch
+
+_LINEAGE_ATTR = "_haigc_lineage"
+
+
+def _file_signature(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def attach_lineage(frames, source_path: str, start_frame: int, source_fps: float):
+    """
+    标记 frames 为源视频 [start_frame, start_frame + N) 的原始帧（原尺寸、未跳帧）
+
+    Returns:
+        frames 本身，便于链式调用
+    """
+    signature = _file_signature(source_path)
+    if signature is None or frames is None or source_fps <= 0:
+        return frames
+    lineage = {
+        "source_path": source_path,
+        "signature": signature,
+        "start_frame": int(start_frame),
+        "frame_count": int(frames.shape[0]),
+        "source_fps": float(source_fps),
+    }
+    if isinstance(frames, torch.Tensor):
+        lineage["fingerprint"] = _fingerprint(frames)
+    try:
+        setattr(frames, _LINEAGE_ATTR, lineage)
+    except AttributeError:
+        pass
+    return frames
+
+
+def narrow_lineage(source, result, start_idx: int):
+    """result 为 source[start_idx:start_idx + N] 时，把 source 的来源信息收窄后记录到 result 上"""
+    lineage = get_lineage(source)
+    if lineage is None:
+        return result
+    return attach_lineage(
+        result, lineage["source_path"], lineage["start_frame"] + int(start_idx), lineage["source_fps"]
+    )
+
+
+def get_lineage(frames) -> Optional[Dict[str, Any]]:
+    """
+    获取有效的来源信息
+
+    Returns:
+        {"source_path", "start_frame", "frame_count", "source_fps", ...}；
+        没有来源信息、帧已被就地修改或源文件已变化时返回 None
+    """
+    lineage = getattr(frames, _LINEAGE_ATTR, None)
+    if not lineage:
+        return None
+    if int(frames.shape[0]) != lineage["frame_count"]:
+        return None
+    if isinstance(frames, torch.Tensor) and lineage.get("fingerprint") != _fingerprint(frames):
+        return None
+    if _file_signature(lineage["source_path"]) != lineage["signature"]:
+        return None
+    return lineage
+
+
+def _fingerprint(frames: torch.Tensor) -> tuple:
+    return (frames._version, frames.data_ptr(), tuple(frames.shape), frames.stride())
@@ -8,6 +8,8 @@ import sys
 import shutil
 import subprocess
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -17,6 +19,16 @@ import torch
 
 import folder_paths
 
+from .encode_stats import EncodeStats, timed_iter
+from .ffmpeg_encode import (
+    DEFAULT_ENCODER_PROFILE,
+    ENCODER_PROFILES,
+    encoder_profile_args,
+    pipe_frames_to_ffmpeg,
+    rawvideo_input_args,
+)
+from .frame_utils import is_blank_frame, iter_uint8_chunks, prefetch
+
 def _cleanup_opencv_env():
     return
 
@@ -39,9 +51,17 @@ class VideoBatchWriterNode:
     """批量视频保存节点 - 一次性保存多个视频"""
     
     QUALITY_PRESETS = {
-        "高": {"crf": "18", "vp9": "28"},
-        "中": {"crf": "23", "vp9": "32"},
-        "低": {"crf": "28", "vp9": "38"},
+        "高": {"crf": "18", "vp9": "28", "qscale": "2"},
+        "中": {"crf": "23", "vp9": "32", "qscale": "4"},
+        "低": {"crf": "28", "vp9": "38", "qscale": "6"},
+    }
+    
+    # “视频编码”选项对应的 ffmpeg 编码器（格式表中为 -c:v copy 的格式使用）
+    STREAM_ENCODERS = {
+        "H264": "libx264",
+        "H265": "libx265",
+        "VP9": "libvpx-vp9",
+        "XVID": "mpeg4",
     }
     
     VIDEO_FORMATS = {
@@ -109,6 +129,17 @@ class VideoBatchWriterNode:
                 "视频3": ("IMAGE",),
                 "视频4": ("IMAGE",),
                 "视频5": ("IMAGE",),
+                "并行数": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 5,
+                    "step": 1,
+                    "tooltip": "同时编码的视频数，0 表示自动（按视频数与 CPU 核数决定）；每路编码器的线程数按核数平均分配，避免超额占用 CPU"
+                }),
+                "编码档位": (list(ENCODER_PROFILES.keys()), {
+                    "default": DEFAULT_ENCODER_PROFILE,
+                    "tooltip": "实时：最快、体积最大；均衡：默认；归档：最慢、体积最小（对应 x264/x265 的 preset、VP9 的 cpu-used）"
+                }),
             }
         }
     
@@ -131,8 +162,10 @@ class VideoBatchWriterNode:
         视频2: Optional[torch.Tensor] = None,
         视频3: Optional[torch.Tensor] = None,
         视频4: Optional[torch.Tensor] = None,
-        视频5: Optional[torch.Tensor] = None
-    ) -> Tuple[str, str, int, str]:
+        视频5: Optional[torch.Tensor] = None,
+        并行数: int = 0,
+        编码档位: str = DEFAULT_ENCODER_PROFILE
+    ) -> Dict[str, Any]:
         """
         批量保存多个视频
         
@@ -142,18 +175,18 @@ class VideoBatchWriterNode:
             输出目录: 保存目录
             文件名前缀: 文件名前缀
             其他参数: 视频编码和质量设置
+            并行数: 同时编码的视频数（0 为自动）
+            编码档位: ENCODER_PROFILES 中的编码吞吐档位
             
         Returns:
-            保存路径、文件列表、成功数量、报告
+            {"ui": {"timings": [...]}, "result": (保存路径, 文件列表, 成功数量, 报告)}，出错时 timings 为空
         """
-        # 检查 OpenCV 是否成功导入
-        if _cv2 is None:
+        # 有 ffmpeg 时通过管道直接编码；否则需要 OpenCV 写出视频，检查是否成功导入
+        ffmpeg_path = shutil.which("ffmpeg")
+        if ffmpeg_path is None and _cv2 is None:
             error_msg = f"错误：OpenCV 导入失败\n{_cv2_import_error or '未知错误'}\n\n解决方案:\n1. 卸载所有 OpenCV 版本: pip uninstall opencv-python opencv-contrib-python opencv-python-headless -y\n2. 重新安装: pip install opencv-python\n3. 重启 ComfyUI"
             print(f"[批量视频保存] {error_msg}")
-            return ("", "", 0, error_msg)
-        
-        # 使用模块级别导入的 cv2
-        cv2 = _cv2
+            return {"ui": {"timings": []}, "result": ("", "", 0, error_msg)}
         
         # 收集所有非空视频
         videos = []
@@ -173,7 +206,7 @@ class VideoBatchWriterNode:
         if len(videos) == 0:
             error_msg = "[批量视频保存] 错误: 没有有效的视频输入"
             print(error_msg)
-            return ("", "", 0, error_msg)
+            return {"ui": {"timings": []}, "result": ("", "", 0, error_msg)}
         
         print(f"[批量视频保存] 开始保存 {len(videos)} 个视频...")
         
@@ -197,102 +230,83 @@ class VideoBatchWriterNode:
         saved_files = []
         success_count = 0
         error_messages = []
+        file_stats = {}
         
-        # 保存每个视频
+        # 整理编码任务
+        jobs = []
         for idx, (video_name, images) in enumerate(videos, 1):
-            try:
-                batch_size, height, width, channels = images.shape
-                
-                # 生成文件名
-                if timestamp:
-                    filename = f"{文件名前缀}_{idx}_{timestamp}{extension}"
-                else:
-                    filename = f"{文件名前缀}_{idx}{extension}"
-                
-                video_path = output_dir / filename
-                
-                # 检查是否为空视频占位符（单帧黑色图像，通常是64x64）
-                # 更智能的检测：检查是否为全黑图像
-                is_empty = False
-                if batch_size == 1:
-                    # 检查是否为全黑或接近全黑
-                    frame = images[0].cpu().numpy()
-                    if np.allclose(frame, 0.0, atol=0.01):
-                        is_empty = True
-                
-                if is_empty:
-                    print(f"[批量视频保存] 跳过 {video_name}: 检测到空视频占位符")
-                    continue
-                
-                print(f"[批量视频保存] 正在保存 {video_name} -> {filename}")
-                print(f"  尺寸: {width}x{height}, 帧数: {batch_size}, 帧率: {视频帧率}")
-                
-                # 使用OpenCV保存视频
-                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                working_video_path = str(video_path).replace(extension, '_temp' + extension)
-                
-                out = cv2.VideoWriter(
-                    working_video_path,
-                    fourcc,
-                    视频帧率,
-                    (width, height)
-                )
-                
-                if not out.isOpened():
-                    raise Exception(f"无法创建视频文件: {working_video_path}")
-                
-                # 写入每一帧
-                for i in range(batch_size):
-                    frame = images[i].cpu().numpy()
-                    frame = (frame * 255).astype(np.uint8)
-                    frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                    out.write(frame_bgr)
-                
-                out.release()
-                
-                # 转码到最终格式（如果需要）
-                if working_video_path != str(video_path):
-                    self._transcode_video_simple(
-                        source_path=working_video_path,
-                        target_path=str(video_path),
-                        format_config=format_config,
-                        fps=视频帧率,
-                        视频质量=视频质量
-                    )
-                    # 删除临时文件
-                    if os.path.exists(working_video_path):
-                        os.remove(working_video_path)
-                
-                # 获取文件信息
-                file_size = os.path.getsize(video_path) / (1024 * 1024)  # MB
-                duration = batch_size / 视频帧率
-                
-                saved_files.append(str(video_path))
-                success_count += 1
-                
-                print(f"[批量视频保存] ✅ {video_name} 保存成功!")
-                print(f"  文件: {filename}")
-                print(f"  大小: {file_size:.2f} MB")
-                print(f"  时长: {duration:.2f} 秒")
-                
-            except Exception as e:
-                error_msg = f"{video_name} 保存失败: {str(e)}"
+            batch_size = images.shape[0]
+            
+            # 生成文件名
+            if timestamp:
+                filename = f"{文件名前缀}_{idx}_{timestamp}{extension}"
+            else:
+                filename = f"{文件名前缀}_{idx}{extension}"
+            
+            # 检查是否为空视频占位符（单帧黑色图像，通常是64x64）
+            # 更智能的检测：检查是否为全黑图像
+            if batch_size == 1 and is_blank_frame(images[0]):
+                print(f"[批量视频保存] 跳过 {video_name}: 检测到空视频占位符")
+                continue
+            
+            jobs.append((video_name, images, filename, output_dir / filename))
+        
+        workers, threads_per_job = self._plan_concurrency(并行数, len(jobs))
+        if jobs:
+            print(f"[批量视频保存] 并行编码: {workers} 路, 每路编码线程: {threads_per_job}, 编码: {视频编码}, 档位: {编码档位}")
+        
+        # 所有任务共用一个进度条；并行编码时各阶段耗时为各路累加
+        stats = EncodeStats("批量视频保存", sum(images.shape[0] for _, images, _, _ in jobs))
+        
+        # 并行保存每个视频，每路为独立的 ffmpeg 子进程
+        results = {}
+        batch_started = time.perf_counter()
+        if jobs:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="haigc_batch_writer") as executor:
+                futures = {
+                    executor.submit(
+                        self._save_single_video,
+                        video_name, images, filename, video_path, format_config,
+                        视频帧率, 视频编码, 视频质量, 编码档位, ffmpeg_path, threads_per_job, stats
+                    ): video_name
+                    for video_name, images, filename, video_path in jobs
+                }
+                for future in as_completed(futures):
+                    video_name = futures[future]
+                    try:
+                        results[video_name] = future.result()
+                    except Exception as e:
+                        results[video_name] = e
+        total_elapsed = time.perf_counter() - batch_started
+        
+        # 按输入顺序汇总结果
+        for video_name, images, filename, video_path in jobs:
+            outcome = results.get(video_name)
+            if isinstance(outcome, Exception):
+                error_msg = f"{video_name} 保存失败: {str(outcome)}"
                 error_messages.append(error_msg)
                 print(f"[批量视频保存] ❌ {error_msg}")
-                import traceback
-                traceback.print_exc()
+                continue
+            saved_files.append(str(video_path))
+            file_stats[str(video_path)] = outcome
+            success_count += 1
         
         # 生成报告
         report_lines = [
             f"批量保存完成: {success_count}/{len(videos)} 个视频",
             f"输出目录: {output_dir}",
+            f"总耗时: {total_elapsed:.2f} 秒（并行 {workers} 路）",
             ""
         ]
         
         if saved_files:
             report_lines.append("成功保存的文件:")
             for i, file_path in enumerate(saved_files, 1):
-                report_lines.append(f"  {i}. {Path(file_path).name}")
+                file_stat = file_stats[file_path]
+                report_lines.append(
+                    f"  {i}. {Path(file_path).name}  "
+                    f"耗时 {file_stat['elapsed']:.2f} 秒, {file_stat['encode_fps']:.1f} 帧/秒"
+                )
         
         if error_messages:
             report_lines.append("")
@@ -306,7 +320,165 @@ class VideoBatchWriterNode:
         print(f"[批量视频保存] 全部完成! 成功: {success_count}/{len(videos)}")
         print(report)
         
-        return (str(output_dir), file_list, success_count, report)
+        timings = stats.log(
+            output=str(output_dir),
+            format=输出格式,
+            encoder_profile=编码档位,
+            workers=workers,
+            files={Path(path).name: file_stat for path, file_stat in file_stats.items()}
+        )
+        
+        return {
+            "ui": {"timings": [timings]},
+            "result": (str(output_dir), file_list, success_count, report)
+        }
+    
+    def _plan_concurrency(self, requested: int, job_count: int) -> Tuple[int, int]:
+        """
+        确定并行编码路数与每路编码器线程数
+
+        Returns:
+            (并行路数, 每路线程数)
+        """
+        cpu_count = os.cpu_count() or 1
+        if job_count <= 0:
+            return 1, cpu_count
+        workers = requested if requested > 0 else min(job_count, max(1, cpu_count // 4))
+        workers = max(1, min(workers, job_count))
+        # 每路编码器的线程上限，所有编码器合计不超过 CPU 核数
+        return workers, max(1, cpu_count // workers)
+    
+    def _build_encode_args(
+        self,
+        format_config: Dict[str, Any],
+        视频编码: str,
+        视频质量: str,
+        profile: str = DEFAULT_ENCODER_PROFILE,
+        threads: int = 0
+    ) -> List[str]:
+        """
+        编码时的视频参数
+
+        格式表中为 -c:v copy 的格式（MP4 / MOV）按“视频编码”选项选择编码器，其余格式使用格式表中的编码器；
+        编码档位的速度参数与线程数由 encoder_profile_args 生成
+        """
+        quality_preset = self.QUALITY_PRESETS.get(视频质量, self.QUALITY_PRESETS["中"])
+        if "copy" in format_config.get("video_args", []):
+            codec = self.STREAM_ENCODERS.get(视频编码, "libx264")
+        else:
+            codec = format_config.get("bitrate_codec", "libx264")
+        if codec == "libvpx-vp9":
+            args = ["-c:v", codec, "-crf", quality_preset["vp9"], "-b:v", "0"]
+        elif codec == "mpeg4":
+            args = ["-c:v", codec, "-q:v", quality_preset["qscale"]]
+        else:
+            args = ["-c:v", codec, "-crf", quality_preset["crf"]]
+            if codec == "libx265":
+                # 让 Apple 播放器识别 HEVC
+                args += ["-tag:v", "hvc1"]
+        args += encoder_profile_args(codec, profile, threads)
+        return args + ["-pix_fmt", "yuv420p"]
+    
+    def _save_single_video(
+        self,
+        video_name: str,
+        images: torch.Tensor,
+        filename: str,
+        video_path: Path,
+        format_config: Dict[str, Any],
+        fps: float,
+        视频编码: str,
+        视频质量: str,
+        编码档位: str,
+        ffmpeg_path: Optional[str],
+        threads: int,
+        stats: EncodeStats
+    ) -> Dict[str, float]:
+        """
+        保存单个视频（在线程池中执行）
+
+        Returns:
+            {"elapsed": 耗时秒数, "encode_fps": 每秒编码帧数}
+        """
+        batch_size, height, width, channels = images.shape
+        extension = format_config["extension"]
+        print(f"[批量视频保存] 正在保存 {video_name} -> {filename}")
+        print(f"  尺寸: {width}x{height}, 帧数: {batch_size}, 帧率: {fps}")
+        
+        started = time.perf_counter()
+        if ffmpeg_path is not None:
+            # 原始帧经 stdin 送入 ffmpeg 单次编码
+            cmd = [ffmpeg_path, "-y", "-v", "error"] + rawvideo_input_args(width, height, fps)
+            if width % 2 or height % 2:
+                # yuv420p 要求宽高为偶数
+                cmd += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+            cmd += self._build_encode_args(format_config, 视频编码, 视频质量, 编码档位, threads)
+            if extension == ".mp4":
+                cmd += ["-movflags", "faststart"]
+            cmd.append(str(video_path))
+            pipe_frames_to_ffmpeg(
+                cmd,
+                images,
+                on_progress=stats.progress_callback(),
+                error_label="ffmpeg 编码失败",
+                on_phase=stats.add
+            )
+        else:
+            # 使用OpenCV保存视频
+            cv2 = _cv2
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            working_video_path = str(video_path).replace(extension, '_temp' + extension)
+            
+            out = cv2.VideoWriter(
+                working_video_path,
+                fourcc,
+                fps,
+                (width, height)
+            )
+            
+            if not out.isOpened():
+                raise Exception(f"无法创建视频文件: {working_video_path}")
+            
+            # 写入每一帧（后台线程按块转换为 BGR uint8，与写入并行）
+            chunks = timed_iter(iter_uint8_chunks(images, bgr=True), lambda seconds: stats.add("帧转换", seconds))
+            try:
+                with stats.phase("OpenCV写入"):
+                    for chunk in prefetch(chunks):
+                        for frame_bgr in chunk:
+                            out.write(frame_bgr)
+                        stats.advance(chunk.shape[0])
+            finally:
+                out.release()
+            
+            # 转码到最终格式（如果需要）
+            if working_video_path != str(video_path):
+                with stats.phase("转码"):
+                    self._transcode_video_simple(
+                        source_path=working_video_path,
+                        target_path=str(video_path),
+                        format_config=format_config,
+                        fps=fps,
+                        视频编码=视频编码,
+                        视频质量=视频质量,
+                        编码档位=编码档位
+                    )
+                # 删除临时文件
+                if os.path.exists(working_video_path):
+                    os.remove(working_video_path)
+        elapsed = time.perf_counter() - started
+        encode_fps = batch_size / elapsed if elapsed > 0 else 0.0
+        
+        # 获取文件信息
+        file_size = os.path.getsize(video_path) / (1024 * 1024)  # MB
+        duration = batch_size / fps
+        
+        print(f"[批量视频保存] ✅ {video_name} 保存成功!")
+        print(f"  文件: {filename}")
+        print(f"  大小: {file_size:.2f} MB")
+        print(f"  时长: {duration:.2f} 秒")
+        print(f"  耗时: {elapsed:.2f} 秒, 编码速度: {encode_fps:.1f} 帧/秒")
+        
+        return {"elapsed": elapsed, "encode_fps": encode_fps}
     
     def _transcode_video_simple(
         self,
@@ -314,7 +486,9 @@ class VideoBatchWriterNode:
         target_path: str,
         format_config: Dict[str, Any],
         fps: float,
-        视频质量: str
+        视频编码: str,
+        视频质量: str,
+        编码档位: str = DEFAULT_ENCODER_PROFILE
     ):
         """简单的视频转码"""
         try:
@@ -335,14 +509,10 @@ class VideoBatchWriterNode:
                 return
             
             # 构建ffmpeg命令
-            quality_preset = self.QUALITY_PRESETS.get(视频质量, self.QUALITY_PRESETS["中"])
-            
             cmd = [
                 "ffmpeg", "-y",
                 "-i", source_path,
-                "-c:v", format_config.get("bitrate_codec", "libx264"),
-                "-crf", quality_preset.get("crf", "23"),
-                "-preset", "medium",
+            ] + self._build_encode_args(format_config, 视频编码, 视频质量, 编码档位) + [
                 "-r", str(fps),
                 target_path
             ]
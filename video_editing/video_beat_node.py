@@ -7,6 +7,8 @@ import torch
 import torch.nn.functional as F
 import math
 
+from .frame_utils import from_unit_float, to_unit_float
+
 class VideoBeatNode:
     """卡点效果节点"""
     
@@ -53,7 +55,8 @@ class VideoBeatNode:
     def apply_beat_effect(self, images, 视频帧率, 卡点效果, 卡点间隔, 效果强度, 效果时长):
         """应用卡点效果"""
         batch_size, height, width, channels = images.shape
-        result = images.clone()
+        # 特效在 [0, 1] 浮点范围内计算，输出转换回输入精度（兼容 uint8 帧）
+        result = to_unit_float(images).clone()
         
         beat_interval_frames = int(卡点间隔 * 视频帧率)
         effect_duration_frames = int(效果时长 * 视频帧率)
@@ -680,6 +683,7 @@ class VideoBeatNode:
                             padded[0, :, y_start:y_start+new_h, x_start:x_start+new_w] = scaled[0]
                             result[j] = padded.squeeze(0).permute(1, 2, 0)
         
+        result = from_unit_float(result, images.dtype)
         output_frames = result.shape[0]
         output_duration = output_frames / 视频帧率
         
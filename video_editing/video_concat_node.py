@@ -8,6 +8,9 @@ import sys
 from pathlib import Path
 import folder_paths
 
+from .ffmpeg_encode import ENCODER_PROFILES, encoder_profile_args
+from .media_probe import has_audio_stream
+
 # 尝试导入 OpenCV
 try:
     import cv2
@@ -52,7 +55,19 @@ class VideoConcatNode:
                     "tooltip": "contain: 保持比例黑边填充; cover: 保持比例裁剪; stretch: 拉伸"
                 }),
             },
-            "optional": {}
+            "optional": {
+                "编码档位": (list(ENCODER_PROFILES.keys()), {
+                    "default": "实时",
+                    "tooltip": "实时（默认）：-preset ultrafast，与旧版输出一致；均衡：更小体积；归档：最慢、体积最小"
+                }),
+                "编码线程数": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 64,
+                    "step": 1,
+                    "tooltip": "ffmpeg 编码线程数，0 表示自动"
+                }),
+            }
         }
         
         # 添加 video_2 到 video_10
@@ -139,13 +154,15 @@ class VideoConcatNode:
             target_w, 
             target_h, 
             target_fps, 
-            缩放模式
+            缩放模式,
+            kwargs.get("编码档位", "实时"),
+            kwargs.get("编码线程数", 0)
         )
 
         # 4. 加载结果供后续节点使用
         return self._load_video_result(output_path)
 
-    def _run_ffmpeg_concat(self, videos, output_path, width, height, fps, scale_mode):
+    def _run_ffmpeg_concat(self, videos, output_path, width, height, fps, scale_mode, profile="实时", threads=0):
         ffmpeg_path = shutil.which("ffmpeg")
         if not ffmpeg_path:
             raise RuntimeError("未找到 ffmpeg，请先安装 ffmpeg")
@@ -228,7 +245,7 @@ class VideoConcatNode:
             "-c:v", "libx264",
             "-pix_fmt", "yuv420p",    # 指定像素格式
             "-movflags", "+faststart", # 优化 Web 播放
-            "-preset", "ultrafast",
+        ] + encoder_profile_args("libx264", profile, threads) + [
             "-crf", "23",
             "-c:a", "aac",
             "-b:a", "192k",
@@ -246,21 +263,7 @@ class VideoConcatNode:
             print(f"[视频拼接] 拼接成功: {output_path}")
 
     def _check_audio_track(self, video_path):
-        try:
-            ffprobe_path = shutil.which("ffprobe")
-            if not ffprobe_path: return False
-            
-            cmd = [
-                ffprobe_path, "-v", "error",
-                "-select_streams", "a:0",
-                "-show_entries", "stream=codec_type",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                str(video_path)
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            return result.returncode == 0 and result.stdout.strip() == "audio"
-        except:
-            return False
+        return has_audio_stream(video_path)
 
     def _load_video_result(self, video_path):
         # 复用 VideoLoader 的部分逻辑来加载结果
@@ -5,6 +5,8 @@
 
 import torch
 
+from .frame_utils import from_unit_float, to_unit_float
+
 class VideoFadeNode:
     """淡入淡出节点"""
     
@@ -65,8 +67,8 @@ class VideoFadeNode:
                 fade_out_curve = torch.linspace(1, 0, fade_out_frames, device=images.device)
                 alpha[-fade_out_frames:] = fade_out_curve.view(-1, 1, 1, 1)
             
-            # 应用淡化
-            result = images * alpha
+            # 应用淡化（在 [0, 1] 浮点范围内计算，再转换回输入精度，兼容 uint8 帧）
+            result = from_unit_float(to_unit_float(images) * alpha, images.dtype)
             print(f"[淡入淡出] 淡入:{淡入时长}s ({fade_in_frames}帧), 淡出:{淡出时长}s ({fade_out_frames}帧)")
         else:
             result = images
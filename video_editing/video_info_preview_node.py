@@ -6,8 +6,8 @@
 import os
 import folder_paths
 from pathlib import Path
-import shutil
-import subprocess
+
+from .media_probe import get_stream_bitrate_kbps, has_audio_stream
 
 class VideoInfoPreviewNode:
     """视频信息预览节点"""
@@ -134,66 +134,10 @@ class VideoInfoPreviewNode:
         return {"videos": [info]}
 
     def _get_video_bitrate(self, video_path: str) -> int:
-        try:
-            ffprobe_path = shutil.which("ffprobe")
-            if ffprobe_path is None:
-                return 0
-            
-            cmd = [
-                ffprobe_path,
-                "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=bit_rate",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                video_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                bitrate_bps = int(result.stdout.strip())
-                return bitrate_bps // 1000
-        except Exception:
-            pass
-        return 0
+        return get_stream_bitrate_kbps(video_path, "video")
     
     def _get_audio_bitrate(self, video_path: str) -> int:
-        try:
-            ffprobe_path = shutil.which("ffprobe")
-            if ffprobe_path is None:
-                return 0
-            
-            cmd = [
-                ffprobe_path,
-                "-v", "error",
-                "-select_streams", "a:0",
-                "-show_entries", "stream=bit_rate",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                video_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                bitrate_bps = int(result.stdout.strip())
-                return bitrate_bps // 1000
-        except Exception:
-            pass
-        return 0
+        return get_stream_bitrate_kbps(video_path, "audio")
     
     def _check_audio_track(self, video_path: str) -> bool:
-        try:
-            ffprobe_path = shutil.which("ffprobe")
-            if ffprobe_path is None:
-                return False
-            
-            cmd = [
-                ffprobe_path,
-                "-v", "error",
-                "-select_streams", "a:0",
-                "-show_entries", "stream=codec_type",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                str(video_path)
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            if result.returncode == 0 and result.stdout.strip() == "audio":
-                return True
-            return False
-        except Exception:
-            return False
+        return has_audio_stream(video_path)
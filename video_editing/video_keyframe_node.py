@@ -7,6 +7,8 @@ import torch
 import torch.nn.functional as F
 import math
 
+from .frame_utils import from_unit_float, to_unit_float
+
 class VideoKeyframeNode:
     """关键帧动画节点"""
     
@@ -112,7 +114,8 @@ class VideoKeyframeNode:
                                   缓动方式):
         """应用关键帧动画"""
         batch_size, height, width, channels = images.shape
-        result = images.clone()
+        # 动画在 [0, 1] 浮点范围内计算，输出转换回输入精度（兼容 uint8 帧）
+        result = to_unit_float(images).clone()
         
         for i in range(batch_size):
             # 计算当前帧的插值比例
@@ -165,7 +168,7 @@ class VideoKeyframeNode:
             result[i] = current_frame
         
         # 裁剪到有效范围
-        result = torch.clamp(result, 0, 1)
+        result = from_unit_float(torch.clamp(result, 0, 1), images.dtype)
         
         output_frames = result.shape[0]
         output_duration = output_frames / 视频帧率
@@ -8,6 +8,14 @@ import torch
 import os
 import sys
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from .ffmpeg_decode import decode_audio_ffmpeg, decode_video_ffmpeg, find_ffmpeg
+from .frame_cache import load_cached_frames, make_cache_key, resolve_cache_dir, store_frames
+from .frame_utils import OUTPUT_DTYPES, convert_uint8_frames
+from .lazy_video import LAZY_VIDEO_TYPE, LazyVideo
+from .media_probe import find_ffprobe, get_stream_bitrate_kbps, get_video_stream_info, has_audio_stream
+from .source_lineage import attach_lineage
 
 def _cleanup_opencv_env():
     return
@@ -27,9 +35,24 @@ except Exception as e:
     print("  2. 重新安装: pip install opencv-python")
     print("  3. 如果使用 conda: conda install -c conda-forge opencv")
 
+# 音频提取、元数据探测等与视频解码并行的后台任务
+_BACKGROUND_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="haigc_video_loader")
+
 class VideoLoaderNode:
     """视频加载器节点"""
     
+    # 缩放算法：名称 -> (ffmpeg scale 滤镜 flags, OpenCV 插值常量名)
+    SCALE_ALGORITHMS = {
+        "area": ("area", "INTER_AREA"),
+        "bilinear": ("bilinear", "INTER_LINEAR"),
+        "bicubic": ("bicubic", "INTER_CUBIC"),
+        "lanczos": ("lanczos", "INTER_LANCZOS4"),
+        "neighbor": ("neighbor", "INTER_NEAREST"),
+    }
+    
+    # 起始帧不超过该值时用 grab() 顺序前进，比随机跳转更快更准
+    OPENCV_GRAB_SEEK_LIMIT = 120
+    
     @classmethod
     def INPUT_TYPES(cls):
         # 获取input目录下的视频文件
@@ -99,11 +122,57 @@ class VideoLoaderNode:
                     "step": 1,
                     "tooltip": "0 表示保持原始高度"
                 }),
+                "缩放算法": (["自动", "area", "bilinear", "bicubic", "lanczos", "neighbor"], {
+                    "default": "自动",
+                    "tooltip": "FFmpeg 管道解码时在解码器内缩放；自动：缩小用 area，放大用 bilinear"
+                }),
+                "解码引擎": (["自动", "FFmpeg管道", "OpenCV"], {
+                    "default": "自动",
+                    "tooltip": "自动：优先使用 FFmpeg 管道解码（更快、内存峰值更低），未安装 ffmpeg 时回退到 OpenCV"
+                }),
+                "窗口大小": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 100000,
+                    "step": 1,
+                    "tooltip": "分窗加载每窗的帧数（按跳帧后的输出帧计），0 表示一次加载整个范围；用于超出内存的长视频"
+                }),
+                "窗口索引": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 100000,
+                    "step": 1,
+                    "tooltip": "要加载的窗口序号（从 0 开始），video_info 中的 frame_offset 为该窗口在源视频中的起始帧"
+                }),
+                "输出精度": (["float32", "float16", "uint8"], {
+                    "default": "float32",
+                    "tooltip": "float16 / uint8 分别减少约 1/2、3/4 内存；本工具集的视频与字幕节点在需要计算时自行转换为 0-1 浮点，并按输入精度输出；其他节点请使用 float32"
+                }),
+                "帧缓存": (["关闭", "开启"], {
+                    "default": "关闭",
+                    "tooltip": "开启后把解码结果按输出精度保存到磁盘缓存，相同文件、参数和精度再次加载时直接内存映射读取（float32 缓存占用为 uint8 的 4 倍）"
+                }),
+                "帧缓存目录": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "tooltip": "留空使用默认目录 ~/.cache/haigc_toolkit/frames"
+                }),
+                "帧缓存上限GB": ("FLOAT", {
+                    "default": 20.0,
+                    "min": 0.0,
+                    "max": 4096.0,
+                    "step": 1.0,
+                    "tooltip": "缓存目录总大小上限，超出时删除最久未使用的缓存"
+                }),
+                "加载模式": (["完整解码", "延迟解码"], {
+                    "default": "完整解码",
+                    "tooltip": "延迟解码：不解码整段视频，“视频”输出只包含第一帧；请把“延迟视频”输出连接到裁剪、取尾帧、分镜等节点，只解码实际用到的帧"
+                }),
             },
         }
     
-    RETURN_TYPES = ("IMAGE", "AUDIO", "HAIGC_VIDEOINFO")
-    RETURN_NAMES = ("视频", "音频", "video_info")
+    RETURN_TYPES = ("IMAGE", "AUDIO", "HAIGC_VIDEOINFO", LAZY_VIDEO_TYPE)
+    RETURN_NAMES = ("视频", "音频", "video_info", "延迟视频")
     FUNCTION = "load_video"
     CATEGORY = "HAIGC工具集/视频剪辑"
     
@@ -143,7 +212,16 @@ class VideoLoaderNode:
         跳帧,
         视频路径=None,
         目标宽度: int = 0,
-        目标高度: int = 0
+        目标高度: int = 0,
+        缩放算法: str = "自动",
+        解码引擎: str = "自动",
+        窗口大小: int = 0,
+        窗口索引: int = 0,
+        输出精度: str = "float32",
+        帧缓存: str = "关闭",
+        帧缓存目录: str = "",
+        帧缓存上限GB: float = 20.0,
+        加载模式: str = "完整解码"
     ):
         """加载视频文件"""
         
@@ -199,7 +277,7 @@ class VideoLoaderNode:
                 ui_info = {"videos": []}
             return {
                 "ui": ui_info,
-                "result": (dummy, dummy_audio, dummy_info)
+                "result": (dummy, dummy_audio, dummy_info, None)
             }
         
         try:
@@ -240,7 +318,7 @@ class VideoLoaderNode:
                     ui_info = {"videos": []}
                 return {
                     "ui": ui_info,
-                    "result": (dummy, dummy_audio, dummy_info)
+                    "result": (dummy, dummy_audio, dummy_info, None)
                 }
             
             # 使用模块级别导入的 cv2
@@ -252,10 +330,16 @@ class VideoLoaderNode:
                 raise Exception("无法打开视频文件")
             
             # 获取视频信息
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            # 帧数优先使用 ffprobe 探测结果：OpenCV 的 CAP_PROP_FRAME_COUNT 常常偏大，
+            # 延迟解码按帧数确定长度，偏大会让读到结尾的切片解码不到足够的帧
+            stream_info = get_video_stream_info(final_path)
+            total_frames = int(stream_info.get("frame_count", 0)) or int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             original_fps = cap.get(cv2.CAP_PROP_FPS)
+            if original_fps <= 0:
+                # 部分容器 OpenCV 读不到帧率，使用 ffprobe 探测结果补齐
+                original_fps = float(stream_info.get("fps", 0.0))
             target_width, target_height = self._determine_target_size(
                 width, height, 目标宽度, 目标高度
             )
@@ -271,41 +355,77 @@ class VideoLoaderNode:
             end = 结束帧 if 结束帧 > 0 else total_frames
             end = min(end, total_frames)
             
+            # 分窗加载：只解码所选范围中的第 窗口索引 个窗口
+            window_info = {}
+            if 窗口大小 > 0:
+                start, end, window_info = self._select_window(start, end, 跳帧, 窗口大小, 窗口索引)
+            
             print(f"[视频加载器] 文件: {os.path.basename(final_path)}")
             print(f"  总帧数: {total_frames}, FPS: {fps:.2f}, 分辨率: {width}x{height}")
-            if (target_width, target_height) != (width, height):
-                print(f"  调整分辨率 -> {target_width}x{target_height}")
+            output_dtype = OUTPUT_DTYPES.get(输出精度, torch.float32)
+            resized = (target_width, target_height) != (width, height)
+            scale_algorithm = self._resolve_scale_algorithm(缩放算法, width, target_width)
+            if resized:
+                print(f"  调整分辨率 -> {target_width}x{target_height} ({scale_algorithm})")
             print(f"  加载范围: 第{start}-{end}帧, 跳帧:{跳帧}")
+            if window_info:
+                print(f"  分窗: 第{window_info['window_index'] + 1}/{window_info['window_count']}窗, 每窗{window_info['window_size']}帧")
+            
+            # 音频提取与元数据探测放到后台线程，与视频解码并行执行
+            audio_future = _BACKGROUND_EXECUTOR.submit(self._extract_audio, final_path, start, end, fps)
+            metadata_future = _BACKGROUND_EXECUTOR.submit(self._probe_source_metadata, final_path)
+            
+            # 延迟视频只记录帧范围，被下游索引时才按需解码
+            lazy_video = LazyVideo(
+                final_path, start, end, 跳帧, target_width, target_height, fps,
+                decode_fn=lambda s, e: self._decode_frames(
+                    None, final_path, 解码引擎, s, e, 跳帧, original_fps,
+                    width, height, target_width, target_height, scale_algorithm, output_dtype
+                ),
+                dtype=output_dtype,
+            )
             
-            # 读取帧
-            frames = []
-            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
-            
-            for i in range(start, end, 跳帧):
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # OpenCV读取的是BGR，转换为RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                if (target_width, target_height) != (width, height):
-                    frame_rgb = cv2.resize(
-                        frame_rgb,
-                        (target_width, target_height),
-                        interpolation=cv2.INTER_AREA if target_width < width else cv2.INTER_LINEAR
-                    )
-                # 转换为[0, 1]范围的float
-                frame_normalized = frame_rgb.astype(np.float32) / 255.0
-                frames.append(frame_normalized)
-                
-                # 跳过额外的帧
-                if 跳帧 > 1:
-                    for _ in range(跳帧 - 1):
-                        cap.read()
-            
-            cap.release()
+            # 读取帧（开启帧缓存时优先从磁盘缓存映射，命中则无需解码）
+            images = None
+            cache_key = None
+            cache_dir = resolve_cache_dir(帧缓存目录) if 帧缓存 == "开启" else None
+            if 加载模式 == "延迟解码":
+                # 只解码第一帧作为 IMAGE 输出，完整帧序列由延迟视频提供
+                cap.release()
+                cache_dir = None
+                try:
+                    images = lazy_video[0:1]
+                    print(f"[视频加载器] 延迟解码: {len(lazy_video)} 帧，按需读取")
+                except RuntimeError as e:
+                    print(f"[视频加载器] 警告：{e}")
+                    images = None
+            if cache_dir:
+                cache_key = make_cache_key(
+                    final_path, start, end, 跳帧, target_width, target_height,
+                    variant=scale_algorithm if resized else "", dtype=output_dtype,
+                    engine=self._resolve_decode_engine(解码引擎)
+                )
+                cached = (
+                    load_cached_frames(cache_dir, cache_key, target_width, target_height, output_dtype)
+                    if cache_key else None
+                )
+                if cached is not None:
+                    # 缓存按输出精度保存，直接返回内存映射支撑的张量，不做拷贝
+                    print(f"[视频加载器] 帧缓存命中，跳过解码: {cached.shape[0]} 帧")
+                    images = cached
+                    cap.release()
+            
+            if images is None:
+                images = self._decode_frames(
+                    cap, final_path, 解码引擎, start, end, 跳帧, original_fps,
+                    width, height, target_width, target_height, scale_algorithm, output_dtype
+                )
+                if images is not None and cache_key:
+                    max_bytes = int(max(0.0, 帧缓存上限GB) * 1024 ** 3)
+                    if store_frames(cache_dir, cache_key, images, max_bytes):
+                        print(f"[视频加载器] 已写入帧缓存: {cache_dir}")
             
-            if len(frames) == 0:
+            if images is None:
                 print(f"[视频加载器] 警告：未读取到任何帧")
                 dummy = torch.zeros((1, height, width, 3))
                 dummy_audio = {"waveform": torch.zeros((1, 2, 0)), "sample_rate": 44100}
@@ -340,39 +460,30 @@ class VideoLoaderNode:
                     ui_info = {"videos": []}
                 return {
                     "ui": ui_info,
-                    "result": (dummy, dummy_audio, dummy_info)
+                    "result": (dummy, dummy_audio, dummy_info, None)
                 }
             
-            # 转换为tensor
-            images = torch.from_numpy(np.stack(frames, axis=0))
+            # 原尺寸、未跳帧的帧与源视频的连续帧范围一一对应，记录来源供保存节点直接复制视频流
+            if 跳帧 == 1 and not resized and original_fps > 0:
+                attach_lineage(lazy_video, final_path, start, original_fps)
+                if 加载模式 != "延迟解码":
+                    attach_lineage(images, final_path, start, original_fps)
             
-            output_frames = images.shape[0]
+            output_frames = len(lazy_video) if 加载模式 == "延迟解码" else images.shape[0]
             output_duration = output_frames / fps
             
             print(f"[视频加载器] 成功加载 {output_frames} 帧, 时长: {output_duration:.2f}秒")
             
-            # 提取音频
-            audio_data = self._extract_audio(final_path, start, end, fps)
+            # 等待后台的音频提取与元数据探测完成
+            audio_data = audio_future.result()
+            has_audio, video_bitrate_kbps, audio_bitrate_kbps = metadata_future.result()
             
             # 获取文件大小
             file_size_mb = os.path.getsize(final_path) / (1024 * 1024)  # MB
             
-            # 检查是否有音频（检查原始视频文件）
-            has_audio = self._check_audio_track(final_path)
-            
             # 计算原始视频时长
             original_duration = total_frames / (original_fps if original_fps and original_fps > 0 else fps)
             
-            # 获取视频比特率（失败不影响预览显示）
-            video_bitrate_kbps = 0
-            audio_bitrate_kbps = 0
-            try:
-                video_bitrate_kbps = self._get_video_bitrate(final_path)
-                if has_audio:
-                    audio_bitrate_kbps = self._get_audio_bitrate(final_path)
-            except Exception as e:
-                print(f"[视频加载器] 警告：无法获取比特率信息: {str(e)}")
-            
             # 构建UI预览信息（使用原始视频信息，而不是处理后的）
             try:
                 ui_info = self._build_video_preview(
@@ -420,7 +531,10 @@ class VideoLoaderNode:
                     "file_size_mb": round(file_size_mb, 2),
                     "video_bitrate_kbps": int(video_bitrate_kbps) if video_bitrate_kbps else 0,
                     "audio_bitrate_kbps": int(audio_bitrate_kbps) if audio_bitrate_kbps else 0,
-                })
+                    "frame_offset": start,
+                    "precision": 输出精度,
+                    **window_info,
+                }, lazy_video)
             }
             
         except ImportError:
@@ -459,7 +573,7 @@ class VideoLoaderNode:
                 ui_info = {"videos": []}
             return {
                 "ui": ui_info,
-                "result": (dummy, dummy_audio, dummy_info)
+                "result": (dummy, dummy_audio, dummy_info, None)
             }
             
         except Exception as e:
@@ -497,9 +611,172 @@ class VideoLoaderNode:
                 ui_info = {"videos": []}
             return {
                 "ui": ui_info,
-                "result": (dummy, dummy_audio, dummy_info)
+                "result": (dummy, dummy_audio, dummy_info, None)
             }
     
+    def _select_window(self, start: int, end: int, step: int, window_size: int, window_index: int):
+        """
+        把 [start, end) 按跳帧后的输出帧切分为每窗 window_size 帧，返回所选窗口的源帧范围
+
+        Returns:
+            (窗口起始帧, 窗口结束帧, 窗口信息字典)
+        """
+        total_output = len(range(start, end, step))
+        window_count = max(1, -(-total_output // window_size))
+        index = max(0, min(window_index, window_count - 1))
+        if index != window_index:
+            print(f"[视频加载器] 提示：窗口索引 {window_index} 超出范围（共{window_count}窗），已调整为 {index}")
+        window_start = start + index * window_size * step
+        window_end = min(end, window_start + window_size * step)
+        return window_start, window_end, {
+            "window_index": index,
+            "window_count": window_count,
+            "window_size": window_size,
+            "window_output_offset": index * window_size,
+        }
+    
+    def _decode_frames(
+        self,
+        cap,
+        video_path: str,
+        engine_option: str,
+        start: int,
+        end: int,
+        step: int,
+        source_fps: float,
+        width: int,
+        height: int,
+        target_width: int,
+        target_height: int,
+        scale_algorithm: str = "area",
+        output_dtype: torch.dtype = torch.float32
+    ):
+        """按所选引擎解码帧（FFmpeg 管道失败时回退 OpenCV），结束后释放 cap（cap 为 None 时按需打开）"""
+        images = None
+        engine = self._resolve_decode_engine(engine_option)
+        print(f"  解码引擎: {'FFmpeg管道' if engine == 'ffmpeg' else 'OpenCV'}")
+        if engine == "ffmpeg":
+            if cap is not None:
+                cap.release()
+            try:
+                images = decode_video_ffmpeg(
+                    video_path,
+                    width=width,
+                    height=height,
+                    start_frame=start,
+                    end_frame=end,
+                    step=step,
+                    source_fps=source_fps,
+                    target_width=target_width,
+                    target_height=target_height,
+                    scale_flags=self.SCALE_ALGORITHMS[scale_algorithm][0],
+                    dtype=output_dtype,
+                )
+            except Exception as e:
+                print(f"[视频加载器] 警告：FFmpeg 管道解码失败: {str(e)}")
+                images = None
+            if images is None:
+                print(f"[视频加载器] 提示：FFmpeg 管道未返回帧，回退到 OpenCV 解码")
+                cap = _cv2.VideoCapture(video_path)
+                engine = "opencv"
+        
+        if engine == "opencv":
+            if cap is None:
+                cap = _cv2.VideoCapture(video_path)
+            images = self._decode_opencv(
+                cap, start, end, step, width, height, target_width, target_height, scale_algorithm
+            )
+            cap.release()
+            if images is not None:
+                images = convert_uint8_frames(images, output_dtype)
+        return images
+    
+    def _resolve_decode_engine(self, engine_option: str) -> str:
+        """根据用户选择和环境确定实际使用的解码引擎"""
+        if engine_option == "OpenCV":
+            return "opencv"
+        if find_ffmpeg() is None:
+            if engine_option == "FFmpeg管道":
+                print("[视频加载器] 警告：未找到 ffmpeg，回退到 OpenCV 解码")
+            return "opencv"
+        return "ffmpeg"
+    
+    def _resolve_scale_algorithm(self, option: str, source_width: int, target_width: int) -> str:
+        """解析缩放算法（自动：缩小用 area，放大用 bilinear）"""
+        if option in self.SCALE_ALGORITHMS:
+            return option
+        return "area" if target_width < source_width else "bilinear"
+    
+    def _resize_frame(self, frame_rgb, target_width: int, target_height: int, scale_algorithm: str = "area"):
+        """按目标尺寸和缩放算法缩放单帧（OpenCV 解码路径使用）"""
+        cv2 = _cv2
+        interpolation = getattr(cv2, self.SCALE_ALGORITHMS[scale_algorithm][1])
+        return cv2.resize(frame_rgb, (target_width, target_height), interpolation=interpolation)
+    
+    def _decode_opencv(
+        self,
+        cap,
+        start: int,
+        end: int,
+        step: int,
+        width: int,
+        height: int,
+        target_width: int,
+        target_height: int,
+        scale_algorithm: str = "area"
+    ):
+        """使用 OpenCV 逐帧解码，返回 uint8 张量；未读取到帧时返回 None"""
+        cv2 = _cv2
+        frames = []
+        self._seek_opencv(cap, start)
+        
+        for i in range(start, end, step):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            
+            # OpenCV读取的是BGR，转换为RGB
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if (target_width, target_height) != (width, height):
+                frame_rgb = self._resize_frame(frame_rgb, target_width, target_height, scale_algorithm)
+            # 保持 uint8，最后按输出精度统一转换
+            frames.append(frame_rgb)
+            
+            # 跳过额外的帧：grab() 只推进解码位置，不做 retrieve 和色彩转换
+            if step > 1:
+                for _ in range(step - 1):
+                    if not cap.grab():
+                        break
+        
+        if len(frames) == 0:
+            return None
+        return torch.from_numpy(np.stack(frames, axis=0))
+    
+    def _seek_opencv(self, cap, start: int):
+        """
+        定位到起始帧
+        近距离直接 grab() 前进；远距离先按帧号跳转（后端会回到之前的关键帧再解码），
+        跳转落点不准时再用 grab() 补齐
+        """
+        if start <= 0:
+            return
+        cv2 = _cv2
+        if start <= self.OPENCV_GRAB_SEEK_LIMIT:
+            for _ in range(start):
+                if not cap.grab():
+                    break
+            return
+        
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if position > start:
+            # 跳过了目标帧：重新从头定位
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            position = 0
+        for _ in range(max(0, start - position)):
+            if not cap.grab():
+                break
+    
     def _determine_target_size(
         self,
         original_width: int,
@@ -532,88 +809,33 @@ class VideoLoaderNode:
     
     def _get_video_bitrate(self, video_path: str) -> int:
         """获取视频比特率（Kbps）"""
-        try:
-            import subprocess
-            import shutil
-            ffprobe_path = shutil.which("ffprobe")
-            if ffprobe_path is None:
-                return 0
-            
-            cmd = [
-                ffprobe_path,
-                "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=bit_rate",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                video_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                bitrate_bps = int(result.stdout.strip())
-                return bitrate_bps // 1000  # 转换为 Kbps
-        except Exception:
-            pass
-        return 0
+        return get_stream_bitrate_kbps(video_path, "video")
     
     def _get_audio_bitrate(self, video_path: str) -> int:
         """获取音频比特率（Kbps）"""
+        return get_stream_bitrate_kbps(video_path, "audio")
+    
+    def _probe_source_metadata(self, video_path: str):
+        """探测音轨和比特率（失败不影响预览显示），返回 (has_audio, 视频Kbps, 音频Kbps)"""
+        # 检查是否有音频（检查原始视频文件）
+        has_audio = self._check_audio_track(video_path)
+        video_bitrate_kbps = 0
+        audio_bitrate_kbps = 0
         try:
-            import subprocess
-            import shutil
-            ffprobe_path = shutil.which("ffprobe")
-            if ffprobe_path is None:
-                return 0
-            
-            cmd = [
-                ffprobe_path,
-                "-v", "error",
-                "-select_streams", "a:0",
-                "-show_entries", "stream=bit_rate",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                video_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                bitrate_bps = int(result.stdout.strip())
-                return bitrate_bps // 1000  # 转换为 Kbps
-        except Exception:
-            pass
-        return 0
+            video_bitrate_kbps = self._get_video_bitrate(video_path)
+            if has_audio:
+                audio_bitrate_kbps = self._get_audio_bitrate(video_path)
+        except Exception as e:
+            print(f"[视频加载器] 警告：无法获取比特率信息: {str(e)}")
+        return has_audio, video_bitrate_kbps, audio_bitrate_kbps
     
     def _check_audio_track(self, video_path: str) -> bool:
         """检查视频文件是否包含音频轨道"""
-        try:
-            import subprocess
-            import shutil
-            ffprobe_path = shutil.which("ffprobe")
-            if ffprobe_path is None:
-                # 如果没有 ffprobe，返回 False（更保守）
-                print(f"[视频加载器] 警告：未找到 ffprobe，无法准确检测音频轨道")
-                return False
-            
-            # 使用 ffprobe 检查音频流
-            cmd = [
-                ffprobe_path,
-                "-v", "error",
-                "-select_streams", "a:0",
-                "-show_entries", "stream=codec_type",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                str(video_path)
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            
-            # 如果返回 "audio" 说明有音频轨道
-            if result.returncode == 0 and result.stdout.strip() == "audio":
-                return True
-            
-            # 如果命令失败或返回空，说明没有音频轨道
+        if find_ffprobe() is None:
+            # 如果没有 ffprobe，返回 False（更保守）
+            print(f"[视频加载器] 警告：未找到 ffprobe，无法准确检测音频轨道")
             return False
-        except subprocess.TimeoutExpired:
-            print(f"[视频加载器] 警告：音频检测超时")
-            return False
-        except Exception as e:
-            print(f"[视频加载器] 警告：音频检测失败: {str(e)}")
-            return False  # 默认假设无音频，更保守
+        return has_audio_stream(video_path)
     
     def _build_video_preview(
         self,
@@ -664,12 +886,8 @@ class VideoLoaderNode:
         return {"videos": [video_info]}
     
     def _extract_audio(self, video_path, start_frame, end_frame, fps):
-        """从视频中提取音频"""
+        """从视频中提取音频（ffmpeg 管道直接输出 PCM，不经过临时文件）"""
         try:
-            import subprocess
-            import shutil
-            import tempfile
-            
             # 计算时间范围
             start_time = start_frame / max(fps, 1e-6)
             duration = (end_frame - start_frame) / max(fps, 1e-6)
@@ -685,154 +903,18 @@ class VideoLoaderNode:
                 # 检测失败不影响后续流程
                 pass
             
-            ffmpeg_path = shutil.which("ffmpeg")
-            if ffmpeg_path is None:
+            if find_ffmpeg() is None:
                 print("[视频加载器] 警告：未安装 ffmpeg，无法提取音频")
                 return {"waveform": torch.zeros((1, 2, 0)), "sample_rate": 44100}
             
-            # 创建临时文件保存音频
-            temp_audio = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-            temp_audio_path = temp_audio.name
-            temp_audio.close()
-            
-            # 使用ffmpeg提取音频
-            cmd = [
-                ffmpeg_path,
-                '-i', video_path,
-                '-ss', str(start_time),
-                '-t', str(duration),
-                '-vn',  # 不要视频
-                '-acodec', 'pcm_s16le',  # PCM 16位
-                '-ar', '44100',  # 采样率
-                '-ac', '2',  # 双声道
-                '-y',  # 覆盖输出文件
-                temp_audio_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0 and os.path.exists(temp_audio_path):
-                # 读取音频文件（优先使用 torchaudio，缺失时回退到 wave）
-                try:
-                    import torchaudio
-                    waveform, sample_rate = torchaudio.load(temp_audio_path)
-                except ImportError:
-                    import wave
-                    with wave.open(temp_audio_path, 'rb') as wf:
-                        sample_rate = wf.getframerate()
-                        channels = wf.getnchannels()
-                        sampwidth = wf.getsampwidth()
-                        frames = wf.getnframes()
-                        audio_bytes = wf.readframes(frames)
-                    import numpy as np
-                    dtype = np.int16 if sampwidth == 2 else np.int8
-                    audio_np = np.frombuffer(audio_bytes, dtype=dtype)
-                    if channels > 1:
-                        audio_np = audio_np.reshape(-1, channels).T
-                    else:
-                        audio_np = audio_np.reshape(1, -1)
-                    audio_np = (audio_np.astype(np.float32) / 32768.0)
-                    import torch as _torch
-                    waveform = _torch.from_numpy(audio_np).unsqueeze(0)
-                finally:
-                    try:
-                        os.unlink(temp_audio_path)
-                    except:
-                        pass
-                
-                # 统一为 (1, 2, samples)
-                if waveform.dim() == 2:
-                    waveform = waveform.unsqueeze(0)
-                elif waveform.dim() == 1:
-                    waveform = waveform.view(1, 1, -1)
-                if waveform.shape[1] == 1:
-                    waveform = waveform.repeat(1, 2, 1)
-                
-                # 如果提取到的音频为空，尝试全音轨提取后再切片
-                if waveform.shape[-1] == 0:
-                    try:
-                        # 提取整段音频
-                        fallback_audio = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-                        fallback_audio_path = fallback_audio.name
-                        fallback_audio.close()
-                        
-                        full_cmd = [
-                            ffmpeg_path,
-                            '-i', video_path,
-                            '-vn',
-                            '-acodec', 'pcm_s16le',
-                            '-ar', '44100',
-                            '-ac', '2',
-                            '-y',
-                            fallback_audio_path
-                        ]
-                        full_res = subprocess.run(full_cmd, capture_output=True, text=True)
-                        if full_res.returncode == 0 and os.path.exists(fallback_audio_path):
-                            try:
-                                # 读取整段音频
-                                try:
-                                    import torchaudio as _ta
-                                    full_wav, full_sr = _ta.load(fallback_audio_path)
-                                except ImportError:
-                                    import wave
-                                    with wave.open(fallback_audio_path, 'rb') as wf:
-                                        full_sr = wf.getframerate()
-                                        channels = wf.getnchannels()
-                                        sampwidth = wf.getsampwidth()
-                                        frames = wf.getnframes()
-                                        audio_bytes = wf.readframes(frames)
-                                    import numpy as _np
-                                    dtype = np.int16 if sampwidth == 2 else np.int8
-                                    audio_np = _np.frombuffer(audio_bytes, dtype=dtype)
-                                    if channels > 1:
-                                        audio_np = audio_np.reshape(-1, channels).T
-                                    else:
-                                        audio_np = audio_np.reshape(1, -1)
-                                    audio_np = (audio_np.astype(np.float32) / 32768.0)
-                                    import torch as _torch2
-                                    full_wav = _torch2.from_numpy(audio_np).unsqueeze(0)
-                            finally:
-                                try:
-                                    os.unlink(fallback_audio_path)
-                                except:
-                                    pass
-                            
-                            # 统一形状
-                            if full_wav.dim() == 2:
-                                full_wav = full_wav.unsqueeze(0)
-                            elif full_wav.dim() == 1:
-                                full_wav = full_wav.view(1, 1, -1)
-                            if full_wav.shape[1] == 1:
-                                full_wav = full_wav.repeat(1, 2, 1)
-                            
-                            # 根据时间范围切片整段音频
-                            sr = int(full_sr or 44100)
-                            total_samples = full_wav.shape[-1]
-                            start_sample = int(round(start_time * sr))
-                            end_sample = int(round((start_time + duration) * sr))
-                            start_sample = min(max(start_sample, 0), total_samples)
-                            end_sample = min(max(end_sample, start_sample + 1), total_samples)
-                            sliced = full_wav[..., start_sample:end_sample].clone()
-                            
-                            if sliced.shape[-1] > 0:
-                                return {"waveform": sliced, "sample_rate": sr}
-                    except Exception as _fallback_err:
-                        print(f"[视频加载器] 警告：音频全轨回退失败: {_fallback_err}")
-                    
-                    # 仍为空则返回空音频
-                    return {"waveform": torch.zeros((1, 2, 0)), "sample_rate": int(sample_rate or 44100)}
-                
-                audio_data = {"waveform": waveform, "sample_rate": int(sample_rate or 44100)}
-                print(f"[视频加载器] 成功提取音频: {waveform.shape}, 采样率: {sample_rate}")
-                return audio_data
-            else:
+            waveform = decode_audio_ffmpeg(video_path, start_time, duration, sample_rate=44100, channels=2)
+            if waveform is None or waveform.shape[-1] == 0:
                 print(f"[视频加载器] 警告：无法提取音频，视频可能不包含音轨")
                 return {"waveform": torch.zeros((1, 2, 0)), "sample_rate": 44100}
-                
-        except ImportError as e:
-            print(f"[视频加载器] 警告：缺少音频处理库，跳过音频提取")
-            print(f"  请安装: pip install torchaudio")
-            return {"waveform": torch.zeros((1, 2, 0)), "sample_rate": 44100}
+            
+            print(f"[视频加载器] 成功提取音频: {waveform.shape}, 采样率: 44100")
+            return {"waveform": waveform, "sample_rate": 44100}
+            
         except Exception as e:
             print(f"[视频加载器] 警告：音频提取失败: {str(e)}")
             return {"waveform": torch.zeros((1, 2, 0)), "sample_rate": 44100}
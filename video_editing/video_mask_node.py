@@ -7,6 +7,8 @@ import torch
 import torch.nn.functional as F
 import math
 
+from .frame_utils import from_unit_float, to_unit_float
+
 class VideoMaskNode:
     """蒙版功能节点 - 增强版"""
     
@@ -235,12 +237,16 @@ class VideoMaskNode:
                    video2=None, video3=None):
         """应用蒙版 - 增强版（支持多视频）"""
         
+        # 蒙版与混合在 [0, 1] 浮点范围内计算，输出转换回 video1 的精度（兼容 uint8 帧）
+        output_dtype = video1.dtype
+        
         # 收集所有视频
-        videos = [video1]
+        videos = [to_unit_float(video1)]
         if video2 is not None and 多视频模式 != "单视频":
-            videos.append(video2)
+            videos.append(to_unit_float(video2))
         if video3 is not None and 多视频模式 == "三视频叠加":
-            videos.append(video3)
+            videos.append(to_unit_float(video3))
+        video1 = videos[0]
         
         # 处理多视频模式
         if 多视频模式 == "视频拼接" and len(videos) > 1:
@@ -334,6 +340,7 @@ class VideoMaskNode:
                 video2权重, video3权重, 多视频模式
             )
         
+        result = from_unit_float(result, output_dtype)
         output_frames = result.shape[0]
         output_duration = output_frames / 视频帧率
         
@@ -6,6 +6,8 @@
 import torch
 import random
 
+from .frame_utils import common_frame_dtype, match_frame_dtype
+
 class VideoMontageNode:
     """视频混剪节点"""
     
@@ -51,6 +53,10 @@ class VideoMontageNode:
         if video4 is not None:
             videos.append(video4)
         
+        # 统一精度：全部为 uint8 时保持 uint8，混合时按取值范围转换，避免拼接时被错误提升
+        dtype = common_frame_dtype(*videos)
+        videos = [match_frame_dtype(v, dtype) for v in videos]
+        
         segment_frames = int(每段时长 * 视频帧率)
         
         if 混剪模式 == "顺序拼接":
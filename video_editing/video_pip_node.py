@@ -6,6 +6,8 @@
 import torch
 import torch.nn.functional as F
 
+from .frame_utils import CONVERT_CHUNK_FRAMES, from_unit_float, to_unit_float
+
 class VideoPiPNode:
     """画中画节点"""
     
@@ -77,15 +79,16 @@ class VideoPiPNode:
         pip_w = int(main_w * 副画面大小)
         pip_h = int(pip_w * sub_h / sub_w)  # 保持副视频的宽高比
         
-        # 缩放副视频
-        sub_permuted = 副视频.permute(0, 3, 1, 2)
-        pip_resized = F.interpolate(
-            sub_permuted,
-            size=(pip_h, pip_w),
-            mode='bilinear',
-            align_corners=False
-        )
-        pip_resized = pip_resized.permute(0, 2, 3, 1)
+        # 缩放副视频（插值需要浮点：按块转换后立即缩放，只保留副画面尺寸的浮点结果）
+        pip_resized = torch.cat([
+            F.interpolate(
+                to_unit_float(副视频[i:i + CONVERT_CHUNK_FRAMES]).permute(0, 3, 1, 2),
+                size=(pip_h, pip_w),
+                mode='bilinear',
+                align_corners=False
+            ).permute(0, 2, 3, 1)
+            for i in range(0, min_batch, CONVERT_CHUNK_FRAMES)
+        ])
         
         # 添加边框
         if 添加边框 == "是":
@@ -99,8 +102,8 @@ class VideoPiPNode:
             # 创建带边框的画面
             bordered_h = pip_h + 2 * 边框宽度
             bordered_w = pip_w + 2 * 边框宽度
-            bordered = torch.ones(min_batch, bordered_h, bordered_w, main_c, 
-                                 device=主视频.device) * border_color
+            bordered = torch.full((min_batch, bordered_h, bordered_w, main_c), border_color,
+                                  dtype=pip_resized.dtype, device=主视频.device)
             bordered[:, 边框宽度:边框宽度+pip_h, 边框宽度:边框宽度+pip_w, :] = pip_resized
             pip_resized = bordered
             pip_h, pip_w = bordered_h, bordered_w
@@ -128,14 +131,14 @@ class VideoPiPNode:
         y_pos = max(0, min(y_pos, main_h - pip_h))
         x_pos = max(0, min(x_pos, main_w - pip_w))
         
-        # 合成画中画
+        # 合成画中画（保持主视频精度，只对副画面区域做浮点混合）
         result = 主视频.clone()
         
         # 混合副画面（支持透明度）
-        for i in range(min_batch):
-            result[i, y_pos:y_pos+pip_h, x_pos:x_pos+pip_w, :] = \
-                result[i, y_pos:y_pos+pip_h, x_pos:x_pos+pip_w, :] * (1 - 副画面不透明度) + \
-                pip_resized[i] * 副画面不透明度
+        region = result[:, y_pos:y_pos+pip_h, x_pos:x_pos+pip_w, :]
+        blended = to_unit_float(region) * (1 - 副画面不透明度) + \
+            pip_resized.to(region.device) * 副画面不透明度
+        region.copy_(from_unit_float(blended, result.dtype))
         
         output_frames = result.shape[0]
         output_duration = output_frames / 视频帧率
@@ -171,7 +171,7 @@ class VideoPreviewNode:
                 目标高度=0
             )
             
-            res_images, res_audio, res_info = load_result["result"]
+            res_images, res_audio, res_info = load_result["result"][:3]
             
             # 检查是否是错误占位符 (通过 info 中的 error 判断)
             if res_info and "error" in res_info:
@@ -6,6 +6,8 @@
 import torch
 import torch.nn.functional as F
 
+from .frame_utils import from_unit_float, to_unit_float
+
 class VideoResizeNode:
     """视频缩放节点"""
     
@@ -55,8 +57,8 @@ class VideoResizeNode:
         }
         mode = mode_map.get(缩放算法, "bicubic")
         
-        # [B, H, W, C] -> [B, C, H, W]
-        images_permuted = images.permute(0, 3, 1, 2)
+        # [B, H, W, C] -> [B, C, H, W]（插值在 [0, 1] 浮点范围内进行，兼容 uint8 帧）
+        images_permuted = to_unit_float(images).permute(0, 3, 1, 2)
         
         # 缩放
         resized = F.interpolate(
@@ -67,7 +69,7 @@ class VideoResizeNode:
         )
         
         # [B, C, H, W] -> [B, H, W, C]
-        result = resized.permute(0, 2, 3, 1)
+        result = from_unit_float(resized.permute(0, 2, 3, 1), images.dtype)
         output_frames = result.shape[0]
         output_duration = output_frames / 视频帧率
         
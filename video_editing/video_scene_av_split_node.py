@@ -8,6 +8,8 @@ from typing import Dict, Tuple
 
 import torch
 
+from .lazy_video import LAZY_VIDEO_TYPE, resolve_frames
+
 
 class VideoSceneAVSplitNode:
     """
@@ -23,7 +25,6 @@ class VideoSceneAVSplitNode:
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "images": ("IMAGE",),
                 "audio": ("AUDIO",),
                 "场景数据": ("STRING",),
                 "场景序号": ("INT", {
@@ -34,6 +35,12 @@ class VideoSceneAVSplitNode:
                     "tooltip": "选择需要裁剪的场景（从 1 开始）"
                 }),
             },
+            "optional": {
+                "images": ("IMAGE",),
+                "延迟视频": (LAZY_VIDEO_TYPE, {
+                    "tooltip": "连接视频加载器的延迟视频输出时只解码所选场景的帧（优先于 images）"
+                }),
+            },
         }
 
     RETURN_TYPES = ("IMAGE", "AUDIO", "STRING")
@@ -43,12 +50,14 @@ class VideoSceneAVSplitNode:
 
     def split_scene_av(
         self,
-        images: torch.Tensor,
         audio: Dict[str, torch.Tensor],
         场景数据: str,
         场景序号: int,
+        images: torch.Tensor = None,
+        延迟视频=None,
     ) -> Tuple[torch.Tensor, Dict[str, torch.Tensor], str]:
         """同步裁剪分镜的视频与音频"""
+        images = resolve_frames(images, 延迟视频, "分镜音视频裁剪")
         try:
             if images.dim() != 4:
                 raise ValueError("视频张量应为4维 (帧, 高, 宽, 通道)")
@@ -7,6 +7,8 @@ import torch
 import torch.nn.functional as F
 import json
 
+from .frame_utils import to_unit_float
+
 class VideoSceneDetectNode:
     """分镜识别节点"""
     
@@ -70,9 +72,9 @@ class VideoSceneDetectNode:
         diffs = []  # 记录所有帧间差异，用于调试
         
         for i in range(1, batch_size):
-            # 方法1: 转换为灰度图计算差异（更鲁棒）
-            frame1 = images[i-1]
-            frame2 = images[i]
+            # 方法1: 转换为灰度图计算差异（更鲁棒）；阈值按 [0, 1] 范围设定，uint8 帧逐帧转换
+            frame1 = to_unit_float(images[i-1])
+            frame2 = to_unit_float(images[i])
             
             # 转换为灰度图 (H, W, C) -> (H, W)
             gray1 = 0.299 * frame1[:, :, 0] + 0.587 * frame1[:, :, 1] + 0.114 * frame1[:, :, 2]
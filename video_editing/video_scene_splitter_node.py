@@ -7,6 +7,8 @@ import torch
 import json
 from typing import Tuple, Optional
 
+from .lazy_video import LAZY_VIDEO_TYPE, resolve_frames
+
 class VideoSceneSplitterNode:
     """分镜转接节点 - 可选择输出多个场景片段"""
     
@@ -14,7 +16,6 @@ class VideoSceneSplitterNode:
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "images": ("IMAGE",),
                 "场景数据": ("STRING",),
                 "输出1场景序号": ("INT", {
                     "default": 1,
@@ -52,6 +53,12 @@ class VideoSceneSplitterNode:
                     "tooltip": "输出端口5的场景序号（从1开始，0表示不输出）"
                 }),
             },
+            "optional": {
+                "images": ("IMAGE",),
+                "延迟视频": (LAZY_VIDEO_TYPE, {
+                    "tooltip": "连接视频加载器的延迟视频输出时只解码被选中场景的帧（优先于 images）"
+                }),
+            },
         }
     
     RETURN_TYPES = ("IMAGE", "IMAGE", "IMAGE", "IMAGE", "IMAGE")
@@ -61,13 +68,14 @@ class VideoSceneSplitterNode:
     
     def split_scenes(
         self,
-        images: torch.Tensor,
         场景数据: str,
         输出1场景序号: int,
         输出2场景序号: int,
         输出3场景序号: int,
         输出4场景序号: int,
-        输出5场景序号: int
+        输出5场景序号: int,
+        images: Optional[torch.Tensor] = None,
+        延迟视频=None
     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
         """
         根据场景数据分割视频并输出指定场景
@@ -76,10 +84,12 @@ class VideoSceneSplitterNode:
             images: 输入视频，形状 (B, H, W, C)
             场景数据: JSON格式的场景数据字符串
             输出1场景序号 ~ 输出5场景序号: 要输出的场景序号（1开始，0表示不输出）
+            延迟视频: 可选的延迟解码视频，连接后只解码被选中场景的帧
             
         Returns:
             5个场景片段（如果序号为0或无效，返回空视频）
         """
+        images = resolve_frames(images, 延迟视频, "分镜转接")
         try:
             # 解析场景数据
             try:
@@ -92,7 +102,7 @@ class VideoSceneSplitterNode:
                 print(f"[分镜转接] 错误: 无法解析场景数据 - {str(e)}")
                 # 返回5个空视频（与输入视频尺寸一致的单帧黑色图像）
                 _, height, width, channels = images.shape
-                empty_video = torch.zeros((1, height, width, channels), device=images.device)
+                empty_video = torch.zeros((1, height, width, channels), dtype=images.dtype, device=images.device)
                 return (empty_video, empty_video, empty_video, empty_video, empty_video)
             
             batch_size = images.shape[0]
@@ -102,7 +112,7 @@ class VideoSceneSplitterNode:
             # 验证场景数据
             if scene_count == 0 or len(scene_changes) == 0:
                 print(f"[分镜转接] 警告: 未检测到场景，返回空视频")
-                empty_video = torch.zeros((1, height, width, channels), device=device)
+                empty_video = torch.zeros((1, height, width, channels), dtype=images.dtype, device=device)
                 return (empty_video, empty_video, empty_video, empty_video, empty_video)
             
             # 调试信息：打印场景切换点
@@ -136,7 +146,7 @@ class VideoSceneSplitterNode:
             for port_idx, scene_idx in enumerate(output_indices, 1):
                 if scene_idx == 0:
                     # 不输出，返回空视频（与输入视频尺寸一致的单帧黑色图像）
-                    empty_video = torch.zeros((1, height, width, channels), device=device)
+                    empty_video = torch.zeros((1, height, width, channels), dtype=images.dtype, device=device)
                     outputs.append(empty_video)
                     continue
                 
@@ -162,7 +172,7 @@ class VideoSceneSplitterNode:
                 # 调试信息：检查帧范围
                 if start_frame >= end_frame:
                     print(f"[分镜转接] 错误: 输出端口{port_idx}的场景{scene_idx}帧范围无效 (start={start_frame}, end={end_frame})")
-                    empty_video = torch.zeros((1, height, width, channels), device=device)
+                    empty_video = torch.zeros((1, height, width, channels), dtype=images.dtype, device=device)
                     outputs.append(empty_video)
                     continue
                 
@@ -174,7 +184,7 @@ class VideoSceneSplitterNode:
                 
                 if scene_clip.shape[0] == 0:
                     print(f"[分镜转接] 警告: 输出端口{port_idx}的场景{scene_idx}片段为空")
-                    empty_video = torch.zeros((1, height, width, channels), device=device)
+                    empty_video = torch.zeros((1, height, width, channels), dtype=images.dtype, device=device)
                     outputs.append(empty_video)
                 else:
                     outputs.append(scene_clip)
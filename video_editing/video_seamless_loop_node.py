@@ -5,6 +5,8 @@
 
 import torch
 
+from .frame_utils import from_unit_float, to_unit_float
+
 class VideoSeamlessLoopNode:
     """无限循环节点"""
     
@@ -53,13 +55,13 @@ class VideoSeamlessLoopNode:
             fade_curve = torch.linspace(0, 1, transition_frames, device=images.device)
             fade_curve = fade_curve.view(-1, 1, 1, 1)
             
-            # 修改结尾帧
-            end_frames = images[-transition_frames:].clone()
-            end_frames = end_frames * (1 - fade_curve)
+            # 修改结尾帧（过渡帧在 [0, 1] 浮点范围内计算，再转换回输入精度）
+            end_frames = to_unit_float(images[-transition_frames:])
+            end_frames = from_unit_float(end_frames * (1 - fade_curve), images.dtype)
             
             # 修改开头帧
-            start_frames = images[:transition_frames].clone()
-            start_frames = start_frames * fade_curve
+            start_frames = to_unit_float(images[:transition_frames])
+            start_frames = from_unit_float(start_frames * fade_curve, images.dtype)
             
             # 合成单次循环
             middle = images[transition_frames:-transition_frames]
@@ -71,11 +73,11 @@ class VideoSeamlessLoopNode:
             fade_curve = fade_curve.view(-1, 1, 1, 1)
             
             # 提取首尾帧
-            start_frames = images[:transition_frames]
-            end_frames = images[-transition_frames:]
+            start_frames = to_unit_float(images[:transition_frames])
+            end_frames = to_unit_float(images[-transition_frames:])
             
             # 交叉混合
-            blended = end_frames * (1 - fade_curve) + start_frames * fade_curve
+            blended = from_unit_float(end_frames * (1 - fade_curve) + start_frames * fade_curve, images.dtype)
             
             # 合成单次循环（移除原始的首尾过渡帧）
             middle = images[transition_frames:-transition_frames]
@@ -84,10 +86,10 @@ class VideoSeamlessLoopNode:
         elif 过渡模式 == "帧混合":
             # 帧混合：首尾帧直接混合
             blend_ratio = 0.5
-            start_frames = images[:transition_frames]
-            end_frames = images[-transition_frames:]
+            start_frames = to_unit_float(images[:transition_frames])
+            end_frames = to_unit_float(images[-transition_frames:])
             
-            blended = start_frames * blend_ratio + end_frames * (1 - blend_ratio)
+            blended = from_unit_float(start_frames * blend_ratio + end_frames * (1 - blend_ratio), images.dtype)
             
             middle = images[transition_frames:-transition_frames]
             loop_segment = torch.cat([blended, middle], dim=0)
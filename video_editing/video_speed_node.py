@@ -5,6 +5,8 @@
 
 import torch
 
+from .frame_utils import from_unit_float, to_unit_float
+
 class VideoSpeedNode:
     """视频变速节点"""
     
@@ -77,9 +79,10 @@ class VideoSpeedNode:
             indices_high = (indices_low + 1).clamp(max=batch_size - 1)
             weight = (original_indices - indices_low.float()).view(-1, 1, 1, 1)
             
-            frames_low = images[indices_low]
-            frames_high = images[indices_high]
-            result = frames_low * (1 - weight) + frames_high * weight
+            # 插值在 [0, 1] 浮点范围内进行，再转换回输入精度（兼容 uint8 帧）
+            frames_low = to_unit_float(images[indices_low])
+            frames_high = to_unit_float(images[indices_high])
+            result = from_unit_float(frames_low * (1 - weight) + frames_high * weight, images.dtype)
             
             print(f"[视频变速] {变速模式} {速度倍数}x: {batch_size}帧 → {target_frames}帧")
         else:
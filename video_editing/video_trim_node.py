@@ -5,6 +5,9 @@
 
 import torch
 
+from .lazy_video import LAZY_VIDEO_TYPE, resolve_frames
+from .source_lineage import narrow_lineage
+
 class VideoTrimNode:
     """视频时间裁剪节点"""
     
@@ -12,7 +15,6 @@ class VideoTrimNode:
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "images": ("IMAGE",),
                 "视频帧率": ("FLOAT", {
                     "default": 30.0,
                     "min": 1.0,
@@ -48,17 +50,22 @@ class VideoTrimNode:
                 }),
             },
             "optional": {
+                "images": ("IMAGE",),
                 "audio": ("AUDIO",),
+                "延迟视频": (LAZY_VIDEO_TYPE, {
+                    "tooltip": "连接视频加载器的延迟视频输出时只解码裁剪范围内的帧（优先于 images）"
+                }),
             }
         }
     
-    RETURN_TYPES = ("IMAGE", "AUDIO", "INT", "FLOAT")
-    RETURN_NAMES = ("视频", "音频", "输出帧数", "输出时长")
+    RETURN_TYPES = ("IMAGE", "AUDIO", "INT", "FLOAT", LAZY_VIDEO_TYPE)
+    RETURN_NAMES = ("视频", "音频", "输出帧数", "输出时长", "延迟视频")
     FUNCTION = "trim_video"
     CATEGORY = "HAIGC工具集/视频剪辑"
     
-    def trim_video(self, images, 视频帧率, 裁剪模式, 开始时间, 结束时间, 开始帧, 结束帧, audio=None):
+    def trim_video(self, 视频帧率, 裁剪模式, 开始时间, 结束时间, 开始帧, 结束帧, images=None, audio=None, 延迟视频=None):
         """视频时间裁剪"""
+        images = resolve_frames(images, 延迟视频, "视频裁剪")
         batch_size = images.shape[0]
         
         if 裁剪模式 == "按时间":
@@ -73,6 +80,12 @@ class VideoTrimNode:
         end_idx = max(start_idx + 1, min(end_idx, batch_size))
         
         result = images[start_idx:end_idx]
+        # 输入带有来源信息时（加载器输出的原始帧），裁剪结果仍对应源视频的连续帧范围
+        narrow_lineage(images, result, start_idx)
+        # 延迟视频输入时同时输出裁剪后的延迟视频，供下游继续按需解码
+        lazy_result = None
+        if 延迟视频 is not None:
+            lazy_result = narrow_lineage(延迟视频, 延迟视频.subrange(start_idx, end_idx), start_idx)
         output_frames = result.shape[0]
         output_duration = output_frames / 视频帧率
         
@@ -80,7 +93,7 @@ class VideoTrimNode:
         
         print(f"[视频裁剪] {batch_size}帧 → {output_frames}帧 (第{start_idx}-{end_idx}帧)")
         
-        return (result, trimmed_audio, output_frames, output_duration)
+        return (result, trimmed_audio, output_frames, output_duration, lazy_result)
 
     def _trim_audio(self, audio, start_idx, end_idx, fps):
         """根据帧区间裁剪音频"""
@@ -3,11 +3,15 @@
 将图像序列合并保存为视频文件,可选合并音频,并在前端显示预览
 """
 
+import contextlib
+import json
 import os
 import sys
 import shutil
 import subprocess
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -17,6 +21,20 @@ import torch
 
 import folder_paths
 
+from .ffmpeg_encode import (
+    DEFAULT_ENCODER_PROFILE,
+    ENCODER_PROFILES,
+    AudioInput,
+    encoder_profile_args,
+    pipe_frames_to_ffmpeg,
+    rawvideo_input_args,
+    run_ffmpeg,
+)
+from .encode_stats import EncodeStats, timed_iter
+from .frame_utils import iter_uint8_chunks, prefetch
+from .media_probe import get_stream_bitrate_kbps, get_video_stream_info, is_keyframe_at
+from .source_lineage import get_lineage
+
 def _cleanup_opencv_env():
     return
 
@@ -39,11 +57,36 @@ class VideoWriterNode:
     """视频保存节点"""
     
     QUALITY_PRESETS = {
-        "高": {"crf": "18", "vp9": "28"},
-        "中": {"crf": "23", "vp9": "32"},
-        "低": {"crf": "28", "vp9": "38"},
+        "高": {"crf": "18", "vp9": "28", "qscale": "2"},
+        "中": {"crf": "23", "vp9": "32", "qscale": "4"},
+        "低": {"crf": "28", "vp9": "38", "qscale": "6"},
+    }
+    
+    # 直接编码时“视频编码”选项对应的 ffmpeg 编码器（格式表中为 -c:v copy 的格式使用）
+    STREAM_ENCODERS = {
+        "H264": "libx264",
+        "H265": "libx265",
+        "VP9": "libvpx-vp9",
+        "XVID": "mpeg4",
+    }
+    
+    # “视频编码”选项对应的源视频流 codec_name（直接复制源视频流时要求一致）
+    SOURCE_CODEC_NAMES = {
+        "H264": "h264",
+        "H265": "hevc",
+        "VP9": "vp9",
+        "XVID": "mpeg4",
     }
     
+    # 支持分段并行编码的编码器与容器（分段可用 concat 分离器无损拼接）
+    SEGMENT_CODECS = {"libx264", "libx265", "libvpx-vp9"}
+    SEGMENT_EXTENSIONS = {".mp4", ".mov", ".webm"}
+    # 分段编码的 GOP 长度（秒），分段边界按 GOP 对齐
+    SEGMENT_GOP_SECONDS = 2.0
+    
+    # 输入为 rgb24 时需要显式指定 yuv420p 的编码器（否则会选用兼容性差的 4:4:4 / RGB 格式）
+    YUV420_CODECS = {"libx264", "libx265", "libvpx-vp9", "mpeg4"}
+    
     VIDEO_FORMATS = {
         "MP4 (H264)": {
             "extension": ".mp4",
@@ -125,6 +168,28 @@ class VideoWriterNode:
             "bitrate_codec": "libx264",
             "audio_codec": "aac",
         },
+        # 图像序列：输出路径作为目录，逐帧写出编号图片并附带 manifest.json（音频另存为 WAV）
+        "图像序列 (PNG)": {
+            "extension": "",
+            "mode": "image_sequence",
+            "supports_audio": True,
+            "image_format": "PNG",
+            "image_extension": ".png",
+        },
+        "图像序列 (WebP)": {
+            "extension": "",
+            "mode": "image_sequence",
+            "supports_audio": True,
+            "image_format": "WEBP",
+            "image_extension": ".webp",
+        },
+        "图像序列 (JPEG)": {
+            "extension": "",
+            "mode": "image_sequence",
+            "supports_audio": True,
+            "image_format": "JPEG",
+            "image_extension": ".jpg",
+        },
     }
     
     DEFAULT_FORMAT = "MP4 (H264)"
@@ -164,7 +229,7 @@ class VideoWriterNode:
                     "min": 0.0,
                     "max": 200000.0,
                     "step": 10.0,
-                    "tooltip": "0 表示使用预设质量; >0 时按填写的 Kbps 重新编码"
+                    "tooltip": "0 表示使用预设质量; >0 时按填写的 Kbps 重新编码（帧未经修改而直接复制源视频流时保持源比特率）"
                 }),
                 "音频比特率_Kbps": ("FLOAT", {
                     "default": 0.0,
@@ -173,6 +238,42 @@ class VideoWriterNode:
                     "step": 8.0,
                     "tooltip": "0 表示使用默认音频比特率"
                 }),
+                "GIF调色板": (["全局", "差异优先", "逐帧"], {
+                    "default": "全局",
+                    "tooltip": "高质量 GIF 的调色板统计方式：全局=整段共用调色板；差异优先=只统计帧间变化区域（stats_mode=diff），适合背景静止的画面；逐帧=每帧独立调色板，适合长片段与色彩变化大的画面（文件更大）"
+                }),
+                "分段并行数": ("INT", {
+                    "default": 1,
+                    "min": 0,
+                    "max": 64,
+                    "step": 1,
+                    "tooltip": "1 表示整段单进程编码；>1 时把帧序列按 GOP 对齐切成多段并行编码后无损拼接（MP4/MOV/WEBM），0 表示按 CPU 核数自动选择"
+                }),
+                "序列图像质量": ("INT", {
+                    "default": 95,
+                    "min": 1,
+                    "max": 100,
+                    "step": 1,
+                    "tooltip": "图像序列 JPEG / WebP 的质量（WebP 为 100 时使用无损压缩）"
+                }),
+                "序列PNG压缩等级": ("INT", {
+                    "default": 4,
+                    "min": 0,
+                    "max": 9,
+                    "step": 1,
+                    "tooltip": "图像序列 PNG 的压缩等级：0 最快、文件最大，9 文件最小、最慢"
+                }),
+                "编码档位": (list(ENCODER_PROFILES.keys()), {
+                    "default": DEFAULT_ENCODER_PROFILE,
+                    "tooltip": "实时：最快、体积最大；均衡：默认；归档：最慢、体积最小（对应 x264/x265 的 preset、VP9 的 cpu-used）"
+                }),
+                "编码线程数": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 64,
+                    "step": 1,
+                    "tooltip": "每个 ffmpeg 编码进程的线程数，0 表示自动；多个保存节点同时运行时可限制线程避免互相争抢"
+                }),
             },
         }
     
@@ -193,26 +294,34 @@ class VideoWriterNode:
         自动添加时间戳,
         音频: Optional[Dict[str, Any]] = None,
         自定义比特率_Kbps: float = 0.0,
-        音频比特率_Kbps: float = 0.0
+        音频比特率_Kbps: float = 0.0,
+        GIF调色板: str = "全局",
+        分段并行数: int = 1,
+        序列图像质量: int = 95,
+        序列PNG压缩等级: int = 4,
+        编码档位: str = DEFAULT_ENCODER_PROFILE,
+        编码线程数: int = 0
     ):
         """保存视频文件"""
         
-        # 检查 OpenCV 是否成功导入
-        if _cv2 is None:
+        ffmpeg_path = shutil.which("ffmpeg")
+        format_config = self.VIDEO_FORMATS.get(输出格式, self.VIDEO_FORMATS[self.DEFAULT_FORMAT])
+        # 有 ffmpeg 时原始帧直接通过管道送入 ffmpeg 单次编码
+        direct_encode = ffmpeg_path is not None
+        image_sequence = format_config.get("mode") == "image_sequence"
+        
+        # 中间文件路径需要 OpenCV，检查是否成功导入
+        if not direct_encode and not image_sequence and _cv2 is None:
             error_msg = f"错误：OpenCV 导入失败\n{_cv2_import_error or '未知错误'}\n\n解决方案:\n1. 卸载所有 OpenCV 版本: pip uninstall opencv-python opencv-contrib-python opencv-python-headless -y\n2. 重新安装: pip install opencv-python\n3. 重启 ComfyUI"
             print(f"[视频保存] {error_msg}")
             return {"result": (error_msg, 0, 0.0)}
         
-        # 使用模块级别导入的 cv2
-        cv2 = _cv2
-        
-        audio_temp_path: Optional[Path] = None
+        audio_pcm: Optional[Tuple[np.ndarray, int]] = None
         working_video_path: Optional[Path] = None
         
         try:
             batch_size, height, width, channels = images.shape
             
-            format_config = self.VIDEO_FORMATS.get(输出格式, self.VIDEO_FORMATS[self.DEFAULT_FORMAT])
             final_extension = format_config.get("extension", ".mp4")
             
             # 解析并规范输出路径
@@ -224,82 +333,129 @@ class VideoWriterNode:
                 自动添加时间戳 == "是"
             )
             
-            working_video_path = self._get_working_path(video_path)
-            
             video_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # 如果提供了音频，先导出临时wav文件
-            if 音频:
-                try:
-                    audio_temp_path = self._export_audio_temp(音频)
-                except Exception as audio_error:
-                    audio_temp_path = None
-                    print(f"[视频保存] 音频处理失败: {audio_error}")
-            
-            # 编码器映射
-            codec_map = {
-                "H264": "avc1",  # H.264
-                "H265": "hev1",  # H.265/HEVC
-                "VP9": "vp09",   # VP9
-                "XVID": "XVID"   # XVID
-            }
-            
-            # 如果编码器不支持，回退到mp4v
-            fourcc_str = codec_map.get(视频编码, "mp4v")
-            
-            try:
-                fourcc = cv2.VideoWriter_fourcc(*fourcc_str)
-            except:
-                print(f"[视频保存] 警告：编码器 {视频编码} 不可用，使用默认编码器")
-                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            
-            # 创建视频写入器
-            out = cv2.VideoWriter(str(working_video_path), fourcc, 视频帧率, (width, height))
-            
-            if not out.isOpened():
-                raise Exception("无法创建视频写入器")
-            
             print(f"[视频保存] 开始保存视频...")
             print(f"  文件: {video_path}")
             print(f"  帧数: {batch_size}, FPS: {视频帧率}, 分辨率: {width}x{height}")
-            print(f"  编码: {视频编码}, 质量: {视频质量}")
+            print(f"  编码: {视频编码}, 质量: {视频质量}, 档位: {编码档位}")
             
-            # 写入每一帧
-            for i in range(batch_size):
-                # 转换为numpy数组 [0, 1] -> [0, 255]
-                frame = images[i].cpu().numpy()
-                frame = (frame * 255).astype(np.uint8)
-                
-                # RGB转BGR（OpenCV需要）
-                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                
-                # 根据质量调整（可选的额外处理）
-                if 视频质量 == "低":
-                    # 可以添加额外的压缩或降采样
-                    pass
-                
-                out.write(frame_bgr)
-                
-                # 进度显示
-                if (i + 1) % 30 == 0 or i == batch_size - 1:
-                    progress = (i + 1) / batch_size * 100
-                    print(f"  进度: {progress:.1f}% ({i+1}/{batch_size})")
+            duration = batch_size / 视频帧率
+            stats = EncodeStats("视频保存", batch_size)
             
-            out.release()
+            # 如果提供了音频，按视频时长截断为 PCM，编码时经管道送入 ffmpeg
+            if 音频:
+                try:
+                    with stats.phase("音频准备"):
+                        audio_pcm = self._prepare_audio_pcm(音频, duration)
+                except Exception as audio_error:
+                    audio_pcm = None
+                    print(f"[视频保存] 音频处理失败: {audio_error}")
             
-            duration = batch_size / 视频帧率
+            if image_sequence:
+                return self._save_image_sequence(
+                    images=images,
+                    sequence_dir=video_path,
+                    output_root=output_root,
+                    format_config=format_config,
+                    format_label=输出格式,
+                    fps=视频帧率,
+                    audio_pcm=audio_pcm,
+                    ffmpeg_path=ffmpeg_path,
+                    quality=序列图像质量,
+                    png_compress_level=序列PNG压缩等级,
+                    stats=stats
+                )
             
-            audio_attached = self._transcode_video(
-                source_path=working_video_path,
-                target_path=video_path,
-                format_config=format_config,
-                audio_path=audio_temp_path,
-                视频质量=视频质量,
-                fps=视频帧率,
-                video_duration=duration,
-                bitrate_kbps=self._sanitize_bitrate(自定义比特率_Kbps),
-                audio_bitrate_kbps=self._sanitize_bitrate(音频比特率_Kbps)
-            )
+            segments = self._resolve_segment_count(分段并行数, batch_size, 视频帧率)
+            encode_start = time.perf_counter()
+            # 帧为未修改的源帧时直接复制源视频流，返回 None 表示不满足条件
+            copied_audio = None
+            if direct_encode:
+                with stats.phase("直接复制"):
+                    copied_audio = self._try_stream_copy(
+                        ffmpeg_path=ffmpeg_path,
+                        images=images,
+                        target_path=video_path,
+                        format_config=format_config,
+                        audio_pcm=audio_pcm,
+                        视频编码=视频编码,
+                        fps=视频帧率,
+                        audio_bitrate_kbps=self._sanitize_bitrate(音频比特率_Kbps)
+                    )
+            if copied_audio is not None:
+                audio_attached = copied_audio
+                stats.advance(batch_size)
+            elif direct_encode and format_config.get("mode") == "gif_palette":
+                if 音频:
+                    print("[视频保存] 提示：目标格式不支持音频，已忽略音频输入。")
+                audio_attached = self._create_palette_gif(
+                    ffmpeg_path=ffmpeg_path,
+                    images=images,
+                    target_path=video_path,
+                    palette_fps=format_config.get("palette_fps", 18),
+                    scale_expr=format_config.get("scale_expr", "scale=iw:-1:flags=lanczos"),
+                    dither_mode=format_config.get("dither", "bayer"),
+                    source_fps=视频帧率,
+                    palette_mode=GIF调色板,
+                    stats=stats
+                )
+            elif direct_encode and segments > 1 and self._supports_segmented(
+                format_config, 视频编码, 视频质量, width, height, 编码档位
+            ):
+                audio_attached = self._encode_segmented(
+                    ffmpeg_path=ffmpeg_path,
+                    images=images,
+                    target_path=video_path,
+                    format_config=format_config,
+                    audio_pcm=audio_pcm,
+                    视频编码=视频编码,
+                    视频质量=视频质量,
+                    fps=视频帧率,
+                    bitrate_kbps=self._sanitize_bitrate(自定义比特率_Kbps),
+                    audio_bitrate_kbps=self._sanitize_bitrate(音频比特率_Kbps),
+                    segments=segments,
+                    profile=编码档位,
+                    threads=编码线程数,
+                    stats=stats
+                )
+            elif direct_encode:
+                if segments > 1:
+                    print("[视频保存] 提示：当前格式不支持分段并行编码，使用单进程编码。")
+                audio_attached = self._encode_direct(
+                    ffmpeg_path=ffmpeg_path,
+                    images=images,
+                    target_path=video_path,
+                    format_config=format_config,
+                    audio_pcm=audio_pcm,
+                    视频编码=视频编码,
+                    视频质量=视频质量,
+                    fps=视频帧率,
+                    bitrate_kbps=self._sanitize_bitrate(自定义比特率_Kbps),
+                    audio_bitrate_kbps=self._sanitize_bitrate(音频比特率_Kbps),
+                    profile=编码档位,
+                    threads=编码线程数,
+                    stats=stats
+                )
+            else:
+                working_video_path = self._get_working_path(video_path)
+                with stats.phase("OpenCV写入"):
+                    self._write_opencv_intermediate(images, working_video_path, 视频编码, 视频帧率, stats)
+                if audio_pcm is not None:
+                    print("[视频保存] 警告：未安装 ffmpeg，无法合并音频。")
+                with stats.phase("转码"):
+                    self._transcode_video(
+                        source_path=working_video_path,
+                        target_path=video_path,
+                        format_config=format_config,
+                        视频质量=视频质量,
+                        fps=视频帧率,
+                        bitrate_kbps=self._sanitize_bitrate(自定义比特率_Kbps)
+                    )
+                audio_attached = False
+            
+            encode_seconds = time.perf_counter() - encode_start
+            encode_fps = batch_size / encode_seconds if encode_seconds > 0 else 0.0
             
             # 获取文件信息
             file_size = os.path.getsize(video_path) / (1024 * 1024)  # MB
@@ -307,6 +463,7 @@ class VideoWriterNode:
             print(f"[视频保存] ✅ 保存完成！")
             print(f"  文件大小: {file_size:.2f} MB")
             print(f"  视频时长: {duration:.2f} 秒")
+            print(f"  编码耗时: {encode_seconds:.2f} 秒, 编码速度: {encode_fps:.1f} 帧/秒")
             
             # 获取实际使用的比特率
             actual_video_bitrate = 0
@@ -319,7 +476,8 @@ class VideoWriterNode:
                 # 如果未指定，尝试从输出文件获取
                 if actual_video_bitrate == 0 or (actual_audio_bitrate == 0 and audio_attached):
                     try:
-                        output_bitrates = self._get_output_bitrates(video_path)
+                        with stats.phase("比特率探测"):
+                            output_bitrates = self._get_output_bitrates(video_path)
                         if actual_video_bitrate == 0:
                             actual_video_bitrate = output_bitrates.get("video", 0)
                         if actual_audio_bitrate == 0 and audio_attached:
@@ -342,7 +500,10 @@ class VideoWriterNode:
                     width=int(images.shape[2]),
                     height=int(images.shape[1]),
                     video_bitrate_kbps=actual_video_bitrate,
-                    audio_bitrate_kbps=actual_audio_bitrate
+                    audio_bitrate_kbps=actual_audio_bitrate,
+                    encoder_profile=编码档位,
+                    encode_fps=encode_fps,
+                    encode_seconds=encode_seconds
                 )
             except Exception as e:
                 print(f"[视频保存] 错误：构建预览信息失败: {str(e)}")
@@ -361,9 +522,17 @@ class VideoWriterNode:
                     width=int(images.shape[2]),
                     height=int(images.shape[1]),
                     video_bitrate_kbps=0,
-                    audio_bitrate_kbps=0
+                    audio_bitrate_kbps=0,
+                    encoder_profile=编码档位,
+                    encode_fps=encode_fps,
+                    encode_seconds=encode_seconds
                 )
             
+            # 分阶段耗时：写入结构化日志，并随预览信息返回给前端
+            timings = stats.log(output=str(video_path), format=输出格式, encoder_profile=编码档位)
+            for video_info in ui_info.get("videos", []):
+                video_info["timings"] = timings
+            
             return {
                 "ui": ui_info,
                 "result": (str(video_path), batch_size, duration)
@@ -374,11 +543,6 @@ class VideoWriterNode:
             print(f"[视频保存] {error_msg}")
             return {"result": (error_msg, 0, 0.0)}
         finally:
-            if audio_temp_path and audio_temp_path.exists():
-                try:
-                    audio_temp_path.unlink()
-                except OSError:
-                    pass
             if working_video_path and working_video_path.exists():
                 try:
                     working_video_path.unlink()
@@ -429,8 +593,17 @@ class VideoWriterNode:
                 return candidate
             counter += 1
     
-    def _export_audio_temp(self, audio_data: Dict[str, Any]) -> Optional[Path]:
-        """将音频张量导出为临时 wav 文件"""
+    def _prepare_audio_pcm(
+        self,
+        audio_data: Dict[str, Any],
+        video_duration: float
+    ) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        把音频张量转换为交错的 f32le PCM，并截断到视频时长
+        
+        Returns:
+            ((samples, channels) float32 数组, 采样率)；没有有效音频时返回 None
+        """
         waveform = audio_data.get("waveform")
         sample_rate = int(audio_data.get("sample_rate", 44100) or 44100)
         
@@ -440,7 +613,7 @@ class VideoWriterNode:
             return None
         
         # 统一为 2D (channels, samples)
-        waveform = waveform.detach().cpu()
+        waveform = waveform.detach()
         if waveform.dim() == 3:
             waveform = waveform[0]
         elif waveform.dim() == 1:
@@ -448,43 +621,14 @@ class VideoWriterNode:
         elif waveform.dim() != 2:
             waveform = waveform.reshape(1, -1)
         
-        # 尝试优先使用 torchaudio 保存
-        try:
-            import torchaudio
-            fd, temp_path = tempfile.mkstemp(prefix="haigc_audio_", suffix=".wav")
-            os.close(fd)
-            temp_path = Path(temp_path)
-            torchaudio.save(str(temp_path), waveform, sample_rate)
-            return temp_path
-        except ImportError:
-            # 回退到标准库 wave 保存
-            try:
-                import wave
-                import numpy as np
-                
-                # 限制到 [-1, 1] 并转换为 int16
-                wav = waveform.float().numpy()
-                wav = np.clip(wav, -1.0, 1.0)
-                wav_int16 = (wav * 32767.0).astype(np.int16)
-                
-                # 交错通道数据（wave 需要 interleaved）
-                channels, samples = wav_int16.shape
-                interleaved = wav_int16.T.reshape(samples * channels)
-                
-                fd, temp_path = tempfile.mkstemp(prefix="haigc_audio_", suffix=".wav")
-                os.close(fd)
-                temp_path = Path(temp_path)
-                
-                with wave.open(str(temp_path), 'wb') as wf:
-                    wf.setnchannels(channels)
-                    wf.setsampwidth(2)  # int16
-                    wf.setframerate(sample_rate)
-                    wf.writeframes(interleaved.tobytes())
-                
-                return temp_path
-            except Exception as e:
-                print(f"[视频保存] 警告：wave 回退保存失败: {e}")
-                return None
+        # 在张量上截断到视频时长，ffmpeg 无需再做 atrim
+        if video_duration and video_duration > 0:
+            waveform = waveform[:, :int(round(video_duration * sample_rate))]
+        if waveform.shape[-1] == 0:
+            return None
+        
+        samples = waveform.to("cpu", torch.float32).t().contiguous().numpy()
+        return samples, sample_rate
     
     def _build_video_args(
         self,
@@ -533,135 +677,598 @@ class VideoWriterNode:
         audio_args = format_config.get("audio_args")
         return list(audio_args) if audio_args else []
     
-    def _transcode_video(
+    def _write_opencv_intermediate(
         self,
-        source_path: Path,
+        images,
+        working_video_path: Path,
+        视频编码: str,
+        fps: float,
+        stats: EncodeStats
+    ):
+        """未安装 ffmpeg 或需要二次处理时，先用 OpenCV 写出中间视频文件"""
+        cv2 = _cv2
+        batch_size, height, width, _ = images.shape
+        
+        # 编码器映射
+        codec_map = {
+            "H264": "avc1",  # H.264
+            "H265": "hev1",  # H.265/HEVC
+            "VP9": "vp09",   # VP9
+            "XVID": "XVID"   # XVID
+        }
+        
+        # 如果编码器不支持，回退到mp4v
+        fourcc_str = codec_map.get(视频编码, "mp4v")
+        
+        try:
+            fourcc = cv2.VideoWriter_fourcc(*fourcc_str)
+        except:
+            print(f"[视频保存] 警告：编码器 {视频编码} 不可用，使用默认编码器")
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        
+        # 创建视频写入器
+        out = cv2.VideoWriter(str(working_video_path), fourcc, fps, (width, height))
+        
+        if not out.isOpened():
+            raise Exception("无法创建视频写入器")
+        
+        try:
+            # 后台线程按块转换为 BGR uint8（OpenCV需要），与写入并行
+            chunks = timed_iter(iter_uint8_chunks(images, bgr=True), lambda seconds: stats.add("帧转换", seconds))
+            for chunk in prefetch(chunks):
+                for frame_bgr in chunk:
+                    out.write(frame_bgr)
+                stats.advance(chunk.shape[0])
+        finally:
+            out.release()
+    
+    def _resolve_stream_video_args(
+        self,
+        format_config: Dict[str, Any],
+        视频编码: str,
+        视频质量: str,
+        bitrate_kbps: int,
+        width: int,
+        height: int,
+        profile: str = DEFAULT_ENCODER_PROFILE,
+        threads: int = 0
+    ) -> List[str]:
+        """
+        构建直接编码原始帧时的视频参数
+        
+        格式表中的 -c:v copy 原本用于复制 OpenCV 中间文件的视频流，直接编码时没有可复制的流，
+        改为按“视频编码”选项选择编码器，其余参数仍以 VIDEO_FORMATS 为准；
+        编码档位的速度参数与线程数追加在最后
+        """
+        args = self._build_video_args(format_config, 视频质量, bitrate_kbps)
+        codec = self._video_codec(args)
+        if codec == "copy":
+            codec = self.STREAM_ENCODERS.get(视频编码, "libx264")
+            preset = self.QUALITY_PRESETS.get(视频质量, self.QUALITY_PRESETS["中"])
+            if codec == "libvpx-vp9":
+                encoder_args = ["-c:v", codec, "-crf", preset["vp9"], "-b:v", "0"]
+            elif codec == "mpeg4":
+                encoder_args = ["-c:v", codec, "-q:v", preset["qscale"]]
+                if format_config.get("extension") == ".avi":
+                    # xvid FourCC 只用于 AVI；MP4 / MOV 复用器不接受该标签，使用默认的 mp4v
+                    encoder_args += ["-vtag", "xvid"]
+            else:
+                encoder_args = ["-c:v", codec, "-crf", preset["crf"]]
+                if codec == "libx265":
+                    # 让 Apple 播放器识别 HEVC
+                    encoder_args += ["-tag:v", "hvc1"]
+            copy_index = args.index("copy")
+            args = encoder_args + args[:copy_index - 1] + args[copy_index + 1:]
+        
+        args += encoder_profile_args(codec, profile, threads)
+        if codec in self.YUV420_CODECS and "-pix_fmt" not in args:
+            if width % 2 or height % 2:
+                # yuv420p 要求宽高为偶数，奇数尺寸补齐一行/一列
+                args = ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"] + args
+            args += ["-pix_fmt", "yuv420p"]
+        return args
+    
+    @staticmethod
+    def _video_codec(args: List[str]) -> Optional[str]:
+        """从参数列表中取出 -c:v 的值"""
+        for flag in ("-c:v", "-vcodec"):
+            if flag in args:
+                index = args.index(flag)
+                if index + 1 < len(args):
+                    return args[index + 1]
+        return None
+    
+    def _encode_direct(
+        self,
+        ffmpeg_path: str,
+        images,
         target_path: Path,
         format_config: Dict[str, Any],
-        audio_path: Optional[Path],
+        audio_pcm: Optional[Tuple[np.ndarray, int]],
+        视频编码: str,
         视频质量: str,
         fps: float,
-        video_duration: Optional[float],
         bitrate_kbps: int,
+        audio_bitrate_kbps: int,
+        profile: str = DEFAULT_ENCODER_PROFILE,
+        threads: int = 0,
+        stats: Optional[EncodeStats] = None
+    ) -> bool:
+        """把原始 RGB 帧通过 stdin 送入单个 ffmpeg 进程，视频编码与音频合并一次完成"""
+        stats = stats or EncodeStats("视频保存", images.shape[0])
+        _, height, width, _ = images.shape
+        
+        with self._open_audio_input(format_config, audio_pcm) as audio_input:
+            cmd = [ffmpeg_path, "-y", "-v", "error"] + rawvideo_input_args(width, height, fps)
+            cmd += self._audio_mapping_args(audio_input)
+            cmd += self._resolve_stream_video_args(
+                format_config, 视频编码, 视频质量, bitrate_kbps, width, height, profile, threads
+            )
+            if audio_input:
+                cmd += self._build_audio_args(format_config, audio_bitrate_kbps)
+            cmd.append(str(target_path))
+            
+            pipe_frames_to_ffmpeg(
+                cmd,
+                images,
+                on_progress=stats.progress_callback(),
+                audio_input=audio_input,
+                on_phase=stats.add
+            )
+            return audio_input is not None
+    
+    def _try_stream_copy(
+        self,
+        ffmpeg_path: str,
+        images,
+        target_path: Path,
+        format_config: Dict[str, Any],
+        audio_pcm: Optional[Tuple[np.ndarray, int]],
+        视频编码: str,
+        fps: float,
         audio_bitrate_kbps: int
+    ) -> Optional[bool]:
+        """
+        帧为源视频中未经修改的连续帧范围时，用 -c copy 直接复制源视频流（不解码、不重新编码）
+        
+        要求：格式表中视频参数为 -c:v copy、帧率与源一致、
+        源视频编码与“视频编码”选项一致，起始帧为关键帧（否则复制结果会多出前导帧），
+        且范围结束于关键帧之前或源视频末尾。-frames:v 按解码顺序计数数据包，
+        含 B 帧的源在 GOP 中间截断时会混入范围之后的重排帧或丢失末尾帧。
+        复制的视频流保持源比特率，自定义比特率不参与判断。
+        
+        Returns:
+            是否合并了音频；不满足条件或复制失败时返回 None（调用方改为正常编码）
+        """
+        lineage = get_lineage(images)
+        if lineage is None:
+            return None
+        format_args = list(format_config.get("video_args") or [])
+        if self._video_codec(format_args) != "copy":
+            return None
+        source_fps = lineage["source_fps"]
+        if abs(fps - source_fps) > 0.01:
+            return None
+        source_path = lineage["source_path"]
+        if get_video_stream_info(source_path).get("codec_name") != self.SOURCE_CODEC_NAMES.get(视频编码):
+            return None
+        start_frame = lineage["start_frame"]
+        start_time = start_frame / source_fps
+        if start_frame > 0 and not is_keyframe_at(source_path, start_time, 0.5 / source_fps):
+            print("[视频保存] 提示：起始帧不是关键帧，无法直接复制视频流，改为重新编码。")
+            return None
+        end_frame = start_frame + int(images.shape[0])
+        source_frames = get_video_stream_info(source_path).get("frame_count", 0)
+        ends_at_stream_end = source_frames > 0 and end_frame >= source_frames
+        if not ends_at_stream_end and not is_keyframe_at(source_path, end_frame / source_fps, 0.5 / source_fps):
+            print("[视频保存] 提示：结束位置不在关键帧边界，直接复制可能多出或缺少末尾帧，改为重新编码。")
+            return None
+        
+        copy_index = format_args.index("copy")
+        mux_args = format_args[:copy_index - 1] + format_args[copy_index + 1:]
+        if 视频编码 == "H265":
+            mux_args += ["-tag:v", "hvc1"]
+        
+        with self._open_audio_input(format_config, audio_pcm) as audio_input:
+            cmd = [ffmpeg_path, "-y", "-v", "error"]
+            if start_frame > 0:
+                # 向后偏移少许，确保定位到起始帧本身这个关键帧，而不是前一个关键帧
+                cmd += ["-ss", f"{start_time + 0.1 / source_fps:.6f}"]
+            cmd += ["-i", source_path]
+            cmd += self._audio_mapping_args(audio_input)
+            cmd += ["-c:v", "copy", "-frames:v", str(int(images.shape[0]))] + mux_args
+            if audio_input:
+                cmd += self._build_audio_args(format_config, audio_bitrate_kbps)
+            cmd += ["-avoid_negative_ts", "make_zero", str(target_path)]
+            
+            try:
+                run_ffmpeg(cmd, audio_input=audio_input)
+            except RuntimeError as e:
+                print(f"[视频保存] 警告：直接复制视频流失败，改为重新编码: {e}")
+                return None
+            print(f"[视频保存] ⚡ 帧未经修改，直接复制源视频流（第{start_frame}-{end_frame}帧，无需重新编码）")
+            return audio_input is not None
+    
+    def _open_audio_input(
+        self,
+        format_config: Dict[str, Any],
+        audio_pcm: Optional[Tuple[np.ndarray, int]]
+    ) -> contextlib.AbstractContextManager:
+        """为一次 ffmpeg 调用创建管道音频输入（上下文管理器）；没有音频或格式不支持音频时 with 得到 None"""
+        if audio_pcm is None:
+            return contextlib.nullcontext()
+        if not format_config.get("supports_audio", True):
+            print("[视频保存] 提示：目标格式不支持音频，已忽略音频输入。")
+            return contextlib.nullcontext()
+        return AudioInput(*audio_pcm)
+    
+    @staticmethod
+    def _audio_mapping_args(audio_input: Optional[AudioInput]) -> List[str]:
+        """音频输入参数与流映射（视频固定为第 0 路输入）"""
+        if audio_input is None:
+            return ["-map", "0:v:0"]
+        return audio_input.input_args + ["-map", "0:v:0", "-map", "1:a:0"]
+    
+    def _resolve_segment_count(self, requested: int, frame_count: int, fps: float) -> int:
+        """确定分段数（0 为自动），每段至少一个 GOP"""
+        if requested == 1:
+            return 1
+        if requested <= 0:
+            requested = max(1, (os.cpu_count() or 1) // 4)
+        gop = max(1, int(round(fps * self.SEGMENT_GOP_SECONDS)))
+        return max(1, min(requested, frame_count // gop))
+    
+    def _supports_segmented(
+        self,
+        format_config: Dict[str, Any],
+        视频编码: str,
+        视频质量: str,
+        width: int,
+        height: int,
+        profile: str = DEFAULT_ENCODER_PROFILE
     ) -> bool:
-        """使用 ffmpeg 进行最终格式转换并合并音频"""
+        """当前格式与编码器是否可以分段编码后用 -c copy 拼接"""
+        if format_config.get("mode") or format_config.get("extension") not in self.SEGMENT_EXTENSIONS:
+            return False
+        args = self._resolve_stream_video_args(format_config, 视频编码, 视频质量, 0, width, height, profile)
+        return self._video_codec(args) in self.SEGMENT_CODECS
+    
+    def _plan_segments(self, frame_count: int, segments: int, gop: int) -> List[Tuple[int, int]]:
+        """把 [0, frame_count) 切成不超过 segments 段，每段长度为 GOP 的整数倍（最后一段除外）"""
+        gop_count = -(-frame_count // gop)
+        segments = max(1, min(segments, gop_count))
+        segment_frames = -(-gop_count // segments) * gop
+        return [
+            (start, min(frame_count, start + segment_frames))
+            for start in range(0, frame_count, segment_frames)
+        ]
+    
+    @staticmethod
+    def _split_muxer_args(video_args: List[str]) -> Tuple[List[str], List[str]]:
+        """把容器相关参数（-movflags / -tag:v）与编码参数分开：前者只在最终封装时使用"""
+        encode_args, mux_args = [], []
+        i = 0
+        while i < len(video_args):
+            if video_args[i] in ("-movflags", "-tag:v") and i + 1 < len(video_args):
+                mux_args += video_args[i:i + 2]
+                i += 2
+            else:
+                encode_args.append(video_args[i])
+                i += 1
+        return encode_args, mux_args
+    
+    def _encode_segmented(
+        self,
+        ffmpeg_path: str,
+        images,
+        target_path: Path,
+        format_config: Dict[str, Any],
+        audio_pcm: Optional[Tuple[np.ndarray, int]],
+        视频编码: str,
+        视频质量: str,
+        fps: float,
+        bitrate_kbps: int,
+        audio_bitrate_kbps: int,
+        segments: int,
+        profile: str = DEFAULT_ENCODER_PROFILE,
+        threads: int = 0,
+        stats: Optional[EncodeStats] = None
+    ) -> bool:
+        """
+        分段并行编码
+        
+        帧序列按 GOP 对齐切成连续的若干段，以相同的编码参数并行编码为临时分段（Matroska 封装），
+        再用 concat 分离器 -c copy 拼接，音频只在最终封装时合并一次
+        """
+        frame_count, height, width, _ = images.shape
+        stats = stats or EncodeStats("视频保存", frame_count)
+        video_args = self._resolve_stream_video_args(
+            format_config, 视频编码, 视频质量, bitrate_kbps, width, height, profile
+        )
+        encode_args, mux_args = self._split_muxer_args(video_args)
+        gop = max(1, int(round(fps * self.SEGMENT_GOP_SECONDS)))
+        # 固定 GOP 长度，使各段的关键帧间隔与整段编码一致
+        encode_args += ["-g", str(gop)]
+        
+        bounds = self._plan_segments(frame_count, segments, gop)
+        # 未指定线程数时各段平分 CPU 核数
+        if threads <= 0:
+            threads = max(1, (os.cpu_count() or 1) // len(bounds))
+        print(f"  分段并行编码: {len(bounds)} 段, 每段约 {bounds[0][1] - bounds[0][0]} 帧, 每段编码线程: {threads}")
+        
+        segment_dir = Path(tempfile.mkdtemp(prefix="haigc_segments_", dir=str(target_path.parent)))
+        try:
+            segment_paths = [segment_dir / f"segment_{i:03d}.mkv" for i in range(len(bounds))]
+            
+            def encode_segment(index: int):
+                start, end = bounds[index]
+                cmd = [ffmpeg_path, "-y", "-v", "error"] + rawvideo_input_args(width, height, fps)
+                cmd += encode_args + ["-threads", str(threads), str(segment_paths[index])]
+                pipe_frames_to_ffmpeg(
+                    cmd,
+                    images[start:end],
+                    on_progress=stats.progress_callback(),
+                    error_label=f"第 {index + 1} 段编码失败",
+                    on_phase=stats.add
+                )
+                print(f"  分段 {index + 1}/{len(bounds)} 完成 (第{start}-{end}帧)")
+            
+            with ThreadPoolExecutor(max_workers=len(bounds), thread_name_prefix="haigc_segment_encode") as executor:
+                for future in [executor.submit(encode_segment, i) for i in range(len(bounds))]:
+                    future.result()
+            
+            # concat 分离器的文件列表（路径中的单引号需转义）
+            list_path = segment_dir / "segments.txt"
+            with open(list_path, "w", encoding="utf-8") as f:
+                for path in segment_paths:
+                    escaped = path.as_posix().replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            
+            with self._open_audio_input(format_config, audio_pcm) as audio_input:
+                cmd = [ffmpeg_path, "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", str(list_path)]
+                cmd += self._audio_mapping_args(audio_input)
+                cmd += ["-c:v", "copy"] + mux_args
+                if audio_input:
+                    cmd += self._build_audio_args(format_config, audio_bitrate_kbps)
+                cmd.append(str(target_path))
+                with stats.phase("分段拼接"):
+                    run_ffmpeg(cmd, audio_input=audio_input, error_label="分段拼接失败")
+                return audio_input is not None
+        finally:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+    
+    def _transcode_video(
+        self,
+        source_path: Path,
+        target_path: Path,
+        format_config: Dict[str, Any],
+        视频质量: str,
+        fps: float,
+        bitrate_kbps: int
+    ):
+        """
+        使用 ffmpeg 把 OpenCV 中间文件转换为最终格式
+
+        仅供 OpenCV 中间文件路径使用，不处理音频（有 ffmpeg 时音频随直接编码一次完成）
+        """
         ffmpeg_path = shutil.which("ffmpeg")
         requires_ffmpeg = format_config.get("requires_ffmpeg", True)
-        supports_audio = format_config.get("supports_audio", True)
-        mode = format_config.get("mode")
         
         enforce_ffmpeg = requires_ffmpeg or (bitrate_kbps and bitrate_kbps > 0)
         if ffmpeg_path is None:
             if enforce_ffmpeg:
                 raise RuntimeError("此输出格式需要安装 ffmpeg，请安装后重试。")
-            if audio_path:
-                print("[视频保存] 警告：未安装 ffmpeg，无法合并音频。")
             os.replace(source_path, target_path)
-            return False
-        
-        if mode == "gif_palette":
-            return self._create_palette_gif(
-                ffmpeg_path=ffmpeg_path,
-                source_path=source_path,
-                target_path=target_path,
-                palette_fps=format_config.get("palette_fps", 18),
-                scale_expr=format_config.get("scale_expr", "scale=iw:-1:flags=lanczos"),
-                dither_mode=format_config.get("dither", "bayer"),
-                source_fps=fps
-            )
+            return
         
-        cmd = [ffmpeg_path, "-y", "-i", str(source_path)]
-        if audio_path and supports_audio:
-            cmd += ["-i", str(audio_path)]
-        elif audio_path and not supports_audio:
-            print("[视频保存] 提示：目标格式不支持音频，已忽略音频输入。")
-        
-        cmd += ["-map", "0:v:0"]
-        if audio_path and supports_audio:
-            cmd += ["-map", "1:a:0"]
+        cmd = [ffmpeg_path, "-y", "-i", str(source_path), "-map", "0:v:0"]
         
         video_args = self._build_video_args(format_config, 视频质量, bitrate_kbps)
         if format_config.get("force_fps"):
             cmd += ["-r", str(fps)]
         cmd += video_args
-        
-        audio_attached = False
-        audio_args = self._build_audio_args(format_config, audio_bitrate_kbps)
-        if audio_path and supports_audio:
-            if video_duration and video_duration > 0:
-                duration_str = f"{video_duration:.6f}"
-                cmd += ["-filter:a", f"atrim=0:{duration_str},asetpts=N/SR/TB"]
-            if audio_args:
-                cmd += audio_args
-            audio_attached = True
-        
         cmd.append(str(target_path))
         
         result = subprocess.run(cmd, capture_output=True)
         if result.returncode != 0:
             stderr = result.stderr.decode(errors="ignore")
             raise RuntimeError(f"ffmpeg 转码失败: {stderr or '未知错误'}")
+    
+    def _image_save_options(self, image_format: str, quality: int, png_compress_level: int) -> Dict[str, Any]:
+        """PIL 保存参数"""
+        if image_format == "PNG":
+            return {"compress_level": max(0, min(9, int(png_compress_level)))}
+        quality = max(1, min(100, int(quality)))
+        if image_format == "WEBP":
+            return {"lossless": True} if quality >= 100 else {"quality": quality, "method": 4}
+        return {"quality": quality}
+    
+    def _save_image_sequence(
+        self,
+        images,
+        sequence_dir: Path,
+        output_root: Path,
+        format_config: Dict[str, Any],
+        format_label: str,
+        fps: float,
+        audio_pcm: Optional[Tuple[np.ndarray, int]],
+        ffmpeg_path: Optional[str],
+        quality: int,
+        png_compress_level: int,
+        stats: EncodeStats
+    ) -> Dict[str, Any]:
+        """
+        把帧写出为编号图片序列
+        
+        帧按块量化为 uint8，每帧的图片编码提交到线程池（PIL 编码时释放 GIL，可随核数扩展），
+        同时最多只保留两块帧在内存中；完成后写入 manifest.json（帧率、命名规则、音频路径等）
+        """
+        from PIL import Image
+        
+        frame_count, height, width, _ = images.shape
+        image_format = format_config.get("image_format", "PNG")
+        image_extension = format_config.get("image_extension", ".png")
+        save_options = self._image_save_options(image_format, quality, png_compress_level)
+        digits = max(6, len(str(frame_count - 1)))
+        stem = sequence_dir.name
+        frame_pattern = f"{stem}_%0{digits}d{image_extension}"
+        sequence_dir.mkdir(parents=True, exist_ok=True)
+        
+        def save_frame(frame: np.ndarray, index: int) -> int:
+            started = time.perf_counter()
+            path = sequence_dir / (frame_pattern % index)
+            Image.fromarray(frame).save(str(path), format=image_format, **save_options)
+            # 各线程的编码耗时累加，可能大于实际经过的时间
+            stats.add("图片编码", time.perf_counter() - started)
+            return path.stat().st_size
+        
+        workers = os.cpu_count() or 1
+        print(f"[视频保存] 图像序列: {image_format}, {workers} 线程并行编码 -> {sequence_dir}")
+        encode_start = time.perf_counter()
+        total_bytes = 0
+        written = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="haigc_image_sequence") as executor:
+            pending = []
+            chunks = timed_iter(iter_uint8_chunks(images), lambda seconds: stats.add("帧转换", seconds))
+            for chunk in prefetch(chunks):
+                # 上一块写完后再提交下一块，限制同时驻留内存的帧数
+                wait(pending)
+                total_bytes += sum(future.result() for future in pending)
+                stats.advance(len(pending))
+                pending = [
+                    executor.submit(save_frame, frame, written + offset)
+                    for offset, frame in enumerate(chunk)
+                ]
+                written += chunk.shape[0]
+            wait(pending)
+            total_bytes += sum(future.result() for future in pending)
+            stats.advance(len(pending))
+        encode_seconds = time.perf_counter() - encode_start
         
-        return audio_attached
+        duration = frame_count / fps
+        audio_name = None
+        if audio_pcm is not None:
+            audio_name = f"{stem}_audio.wav"
+            try:
+                with stats.phase("音频导出"):
+                    self._write_audio_wav(audio_pcm, sequence_dir / audio_name, ffmpeg_path)
+                total_bytes += (sequence_dir / audio_name).stat().st_size
+            except Exception as e:
+                print(f"[视频保存] 警告：音频导出失败: {e}")
+                audio_name = None
+        
+        manifest = {
+            "fps": float(fps),
+            "frame_count": int(frame_count),
+            "duration": round(duration, 6),
+            "width": int(width),
+            "height": int(height),
+            "image_format": image_format.lower(),
+            "frame_pattern": frame_pattern,
+            "start_number": 0,
+            "first_frame": frame_pattern % 0,
+            "last_frame": frame_pattern % (frame_count - 1),
+            "audio": audio_name,
+            "audio_sample_rate": int(audio_pcm[1]) if audio_name else None,
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(sequence_dir / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        
+        print(f"[视频保存] ✅ 图像序列保存完成！")
+        print(f"  帧数: {frame_count}, 总大小: {total_bytes / (1024 * 1024):.2f} MB")
+        if encode_seconds > 0:
+            print(f"  编码耗时: {encode_seconds:.2f} 秒, 编码速度: {frame_count / encode_seconds:.1f} 帧/秒")
+        
+        try:
+            relative = sequence_dir.resolve().relative_to(output_root)
+            subfolder = relative.as_posix()
+        except ValueError:
+            subfolder = ""
+        # 前端以图片形式预览第一帧
+        ui_info = {
+            "images": [{
+                "filename": manifest["first_frame"],
+                "subfolder": subfolder,
+                "type": "output",
+            }],
+            "timings": [stats.log(output=str(sequence_dir), format=format_label)],
+        }
+        return {
+            "ui": ui_info,
+            "result": (str(sequence_dir), frame_count, duration)
+        }
+    
+    def _write_audio_wav(self, audio_pcm: Tuple[np.ndarray, int], path: Path, ffmpeg_path: Optional[str]):
+        """把 PCM 写成 WAV：有 ffmpeg 时写 24-bit，否则用标准库 wave 写 16-bit"""
+        samples, sample_rate = audio_pcm
+        if ffmpeg_path:
+            with AudioInput(samples, sample_rate) as audio_input:
+                cmd = [ffmpeg_path, "-y", "-v", "error"] + audio_input.input_args
+                cmd += ["-c:a", "pcm_s24le", str(path)]
+                run_ffmpeg(cmd, audio_input=audio_input, error_label="音频导出失败")
+            return
+        
+        import wave
+        wav_int16 = (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16)
+        with wave.open(str(path), "wb") as wf:
+            wf.setnchannels(samples.shape[1])
+            wf.setsampwidth(2)  # int16
+            wf.setframerate(sample_rate)
+            wf.writeframes(wav_int16.tobytes())
+    
+    # GIF调色板选项 -> (palettegen 参数, paletteuse 附加参数)
+    GIF_PALETTE_MODES = {
+        "全局": ("stats_mode=full", ""),
+        "差异优先": ("stats_mode=diff", ":diff_mode=rectangle"),
+        "逐帧": ("stats_mode=single", ":new=1"),
+    }
     
     def _create_palette_gif(
         self,
         ffmpeg_path: str,
-        source_path: Path,
+        images,
         target_path: Path,
         palette_fps: Optional[int],
         scale_expr: str,
         dither_mode: str,
-        source_fps: float
+        source_fps: float,
+        palette_mode: str = "全局",
+        stats: Optional[EncodeStats] = None
     ) -> bool:
-        """使用 palettegen/paletteuse 流程生成高质量 GIF"""
-        palette_path = source_path.with_name(f"{source_path.stem}_palette.png")
-        try:
-            fps_value = (
-                palette_fps
-                if palette_fps is not None and palette_fps > 0
-                else max(1, int(round(source_fps)) or 1)
-            )
-            palette_cmd = [
-                ffmpeg_path,
-                "-y",
-                "-i", str(source_path),
-                "-vf", f"fps={fps_value},{scale_expr},palettegen",
-                str(palette_path)
-            ]
-            result = subprocess.run(palette_cmd, capture_output=True)
-            if result.returncode != 0:
-                stderr = result.stderr.decode(errors="ignore")
-                raise RuntimeError(f"GIF 调色板生成失败: {stderr or '未知错误'}")
-            
-            render_cmd = [
-                ffmpeg_path,
-                "-y",
-                "-i", str(source_path),
-                "-i", str(palette_path),
-                "-lavfi", f"fps={fps_value},{scale_expr}[x];[x][1:v]paletteuse=dither={dither_mode}",
-                "-loop", "0",
-                str(target_path)
-            ]
-            result = subprocess.run(render_cmd, capture_output=True)
-            if result.returncode != 0:
-                stderr = result.stderr.decode(errors="ignore")
-                raise RuntimeError(f"GIF 渲染失败: {stderr or '未知错误'}")
-            
-            return False  # GIF 无音频
-        finally:
-            if palette_path.exists():
-                try:
-                    palette_path.unlink()
-                except OSError:
-                    pass
+        """
+        使用 palettegen/paletteuse 生成高质量 GIF
+        
+        原始帧经 stdin 输入，split 把同一路画面分别送入 palettegen 与 paletteuse，
+        调色板生成与渲染在同一次 ffmpeg 调用中完成，无需中间视频和调色板 PNG
+        """
+        _, height, width, _ = images.shape
+        palettegen_args, paletteuse_args = self.GIF_PALETTE_MODES.get(
+            palette_mode, self.GIF_PALETTE_MODES["全局"]
+        )
+        # palette_fps 为 None 时保持源帧率
+        prefix = f"fps={palette_fps}," if palette_fps is not None and palette_fps > 0 else ""
+        filter_graph = (
+            f"{prefix}{scale_expr},split[a][b];"
+            f"[a]palettegen={palettegen_args}[p];"
+            f"[b][p]paletteuse=dither={dither_mode}{paletteuse_args}"
+        )
+        cmd = [ffmpeg_path, "-y", "-v", "error"] + rawvideo_input_args(width, height, source_fps)
+        cmd += ["-filter_complex", filter_graph, "-loop", "0", str(target_path)]
+        stats = stats or EncodeStats("视频保存", images.shape[0])
+        pipe_frames_to_ffmpeg(
+            cmd,
+            images,
+            on_progress=stats.progress_callback(),
+            error_label="GIF 生成失败",
+            on_phase=stats.add
+        )
+        return False  # GIF 无音频
     
     def _get_output_bitrates(self, video_path: Path) -> Dict[str, int]:
         """从输出文件获取比特率"""
         result = {"video": 0, "audio": 0}
         try:
-            import subprocess
             import time
             
             # 确保文件存在且可读
@@ -677,45 +1284,8 @@ class VideoWriterNode:
                     pass
                 time.sleep(0.1)
             
-            ffprobe_path = shutil.which("ffprobe")
-            if ffprobe_path is None:
-                return result
-            
-            # 获取视频比特率
-            try:
-                cmd = [
-                    ffprobe_path,
-                    "-v", "error",
-                    "-select_streams", "v:0",
-                    "-show_entries", "stream=bit_rate",
-                    "-of", "default=noprint_wrappers=1:nokey=1",
-                    str(video_path)
-                ]
-                proc = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-                if proc.returncode == 0 and proc.stdout.strip():
-                    bitrate_str = proc.stdout.strip()
-                    if bitrate_str and bitrate_str != "N/A":
-                        result["video"] = int(bitrate_str) // 1000
-            except (ValueError, subprocess.TimeoutExpired, Exception) as e:
-                pass
-            
-            # 获取音频比特率
-            try:
-                cmd = [
-                    ffprobe_path,
-                    "-v", "error",
-                    "-select_streams", "a:0",
-                    "-show_entries", "stream=bit_rate",
-                    "-of", "default=noprint_wrappers=1:nokey=1",
-                    str(video_path)
-                ]
-                proc = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-                if proc.returncode == 0 and proc.stdout.strip():
-                    bitrate_str = proc.stdout.strip()
-                    if bitrate_str and bitrate_str != "N/A":
-                        result["audio"] = int(bitrate_str) // 1000
-            except (ValueError, subprocess.TimeoutExpired, Exception) as e:
-                pass
+            result["video"] = get_stream_bitrate_kbps(video_path, "video")
+            result["audio"] = get_stream_bitrate_kbps(video_path, "audio")
         except Exception as e:
             # 静默失败，不影响预览显示
             pass
@@ -734,7 +1304,10 @@ class VideoWriterNode:
         width: Optional[int],
         height: Optional[int],
         video_bitrate_kbps: int = 0,
-        audio_bitrate_kbps: int = 0
+        audio_bitrate_kbps: int = 0,
+        encoder_profile: Optional[str] = None,
+        encode_fps: float = 0.0,
+        encode_seconds: float = 0.0
     ) -> Dict[str, Any]:
         """构建前端UI所需的视频预览信息"""
         try:
@@ -761,6 +1334,9 @@ class VideoWriterNode:
             "height": height,
             "video_bitrate_kbps": video_bitrate_kbps,
             "audio_bitrate_kbps": audio_bitrate_kbps,
+            "encoder_profile": encoder_profile,
+            "encode_fps": round(float(encode_fps), 2),
+            "encode_seconds": round(float(encode_seconds), 3),
         }
         
         return {"videos": [video_info]}
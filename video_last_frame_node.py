@@ -6,6 +6,8 @@
 import torch
 import numpy as np
 
+from .video_editing.lazy_video import LAZY_VIDEO_TYPE, resolve_frames
+
 class VideoLastFrameNode:
     """获取视频尾帧节点"""
     
@@ -16,7 +18,6 @@ class VideoLastFrameNode:
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "images": ("IMAGE",),  # 输入图片序列/视频帧
                 "提取模式": (["最后一帧", "最后N帧", "倒数第N帧"], {
                     "default": "最后一帧"
                 }),
@@ -36,9 +37,13 @@ class VideoLastFrameNode:
                 }),
             },
             "optional": {
+                "images": ("IMAGE",),  # 输入图片序列/视频帧
                 "输出帧信息": ("BOOLEAN", {
                     "default": True
                 }),
+                "延迟视频": (LAZY_VIDEO_TYPE, {
+                    "tooltip": "连接视频加载器的延迟视频输出时只解码末尾用到的帧（优先于 images）"
+                }),
             }
         }
     
@@ -47,10 +52,11 @@ class VideoLastFrameNode:
     FUNCTION = "get_last_frame"
     CATEGORY = "HAIGC工具集/视频处理"
     
-    def get_last_frame(self, images, 提取模式="最后一帧", 帧数N=1, 
-                      重复输出次数=1, 输出帧信息=True):
+    def get_last_frame(self, images=None, 提取模式="最后一帧", 帧数N=1, 
+                      重复输出次数=1, 输出帧信息=True, 延迟视频=None):
         """提取视频尾帧"""
         
+        images = resolve_frames(images, 延迟视频, "视频尾帧")
         batch_size = images.shape[0]
         
         if batch_size == 0:
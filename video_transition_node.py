@@ -9,6 +9,8 @@ from PIL import Image
 import torch.nn.functional as F
 import math
 
+from .video_editing.frame_utils import common_frame_dtype, from_unit_float, to_unit_float
+
 class VideoTransitionNode:
     """视频拼接平滑过渡节点"""
     
@@ -166,6 +168,11 @@ class VideoTransitionNode:
         
         print(f"[视频拼接节点] 纯粹拼接模式（已移除所有色彩调整）")
         
+        # 过渡在 [0, 1] 浮点范围内计算，输出转换回输入的公共精度（兼容 uint8 帧）
+        output_dtype = common_frame_dtype(视频A, 视频B)
+        视频A = to_unit_float(视频A)
+        视频B = to_unit_float(视频B)
+        
         batch_a = 视频A.shape[0]
         batch_b = 视频B.shape[0]
         height = 视频A.shape[1]
@@ -195,7 +202,7 @@ class VideoTransitionNode:
             print(f"  - 视频B帧数: {batch_b}")
             print(f"  - 总输出帧数: {total_frames}")
             
-            return (final_output, total_frames)
+            return (from_unit_float(final_output, output_dtype), total_frames)
         
         # 确保两个视频尺寸一致
         if 视频B.shape[1] != height or 视频B.shape[2] != width:
@@ -459,5 +466,5 @@ class VideoTransitionNode:
         print(f"  - 过渡帧数: {actual_transition_frames}")
         print(f"  - 总输出帧数: {total_frames}")
         
-        return (final_output, total_frames)
+        return (from_unit_float(final_output, output_dtype), total_frames)
 